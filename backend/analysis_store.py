@@ -0,0 +1,213 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from cache import create_cache
+from analysis_utils import build_visualizations
+from viz_utils import VISUALIZATION_FIELDS, find_mind_map_node, prune_mind_map
+from mind_map_layout import layout_mind_map, render_mind_map_svg
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when the visualization output changes, so clients holding an ETag
+# from an older build get the new output instead of a 304
+VISUALIZATION_VERSION = 4
+
+_ANALYSIS_ID = re.compile(r'^[0-9a-f]{24}$')
+
+def analysis_id(raw_analysis, structured_data):
+    """
+    Get the content-addressed ID of an analysis.
+
+    Args:
+        raw_analysis (str): Raw LLM output
+        structured_data (dict): Parsed analysis sections
+
+    Returns:
+        str: First 24 hex digits of the SHA-256 of the analysis
+    """
+    content = json.dumps([raw_analysis, structured_data], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:24]
+
+class AnalysisStore:
+    """
+    Finished analyses by content-addressed ID, with their visualizations built on demand.
+
+    Entries live in a cache of their own, apart from the LLM results, and
+    shared between workers by default, so an ID handed out by one worker
+    can be fetched from any other. As an ID names immutable content,
+    each visualization is built at most once per ID and its ETag never goes
+    stale.
+    """
+
+    def __init__(self, cache, ttl=86400):
+        """
+        Initialize the store.
+
+        Args:
+            cache: Cache backend (see cache.create_cache)
+            ttl (float): Lifetime of stored analyses in seconds
+        """
+        self.cache = cache
+        self.ttl = ttl
+
+    def save(self, raw_analysis, structured_data, model=None):
+        """
+        Store an analysis.
+
+        Args:
+            raw_analysis (str): Raw LLM output
+            structured_data (dict): Parsed analysis sections
+            model (str): Model that produced the analysis
+
+        Returns:
+            str: The analysis ID
+        """
+        key = analysis_id(raw_analysis, structured_data)
+        self.cache.set(f"analysis:{key}", [raw_analysis, structured_data, model], ttl=self.ttl)
+        return key
+
+    def get(self, key):
+        """
+        Get a stored analysis.
+
+        Args:
+            key (str): The analysis ID
+
+        Returns:
+            tuple: (raw_analysis, structured_data, model), or None if unknown
+        """
+        if not _ANALYSIS_ID.match(key):
+            return None
+        entry = self.cache.get(f"analysis:{key}")
+        return tuple(entry) if entry is not None else None
+
+    def contains(self, key):
+        """
+        Check that an analysis is stored, without reading it.
+
+        Args:
+            key (str): The analysis ID
+
+        Returns:
+            bool: True if the analysis is known
+        """
+        return bool(_ANALYSIS_ID.match(key)) and self.cache.contains(f"analysis:{key}")
+
+    def visualization(self, key, fmt):
+        """
+        Get one visualization of a stored analysis, building it on first use.
+
+        Args:
+            key (str): The analysis ID
+            fmt (str): Visualization format (mind_map, cards or timeline)
+
+        Returns:
+            dict: The visualization, or None if the analysis is unknown
+        """
+        memo_key = f"analysis:{key}:{fmt}:v{VISUALIZATION_VERSION}"
+        visualization = self.cache.get(memo_key)
+        if visualization is not None:
+            return visualization
+
+        analysis = self.get(key)
+        if analysis is None:
+            return None
+        logger.info(f"Building {fmt} for analysis {key}")
+        visualization = build_visualizations(analysis[1], [fmt])[VISUALIZATION_FIELDS[fmt]]
+        if fmt == "mind_map":
+            # Clients draw stored mind maps at these positions instead of
+            # running a force simulation on every render
+            visualization["layout"] = layout_mind_map(visualization)
+        self.cache.set(memo_key, visualization, ttl=self.ttl)
+        return visualization
+
+    def mind_map(self, key, path="", depth=None, max_children=None, expand=()):
+        """
+        Get part of the mind map of a stored analysis, laid out.
+
+        Only the full mind map is kept; limited views and subtrees of it are
+        cheap to cut and lay out per request.
+
+        Args:
+            key (str): The analysis ID
+            path (str): Path of the subtree's root ("" for the whole mind map)
+            depth (int): Levels below that node to include, or None for all
+            max_children (int): Children to include per node, or None for all
+            expand (iterable): Paths of nodes to include all children of
+
+        Returns:
+            dict: The (sub)tree with its "layout", or None if the analysis or
+            node is unknown
+        """
+        mind_map = self.visualization(key, "mind_map")
+        if mind_map is None:
+            return None
+        node = find_mind_map_node(mind_map, path)
+        if node is None:
+            return None
+        if not path and depth is None and max_children is None:
+            return mind_map
+
+        subtree = prune_mind_map(node, depth, max_children, path, expand)
+        subtree["layout"] = layout_mind_map(subtree, path)
+        return subtree
+
+    def mind_map_svg(self, key):
+        """
+        Get the mind map of a stored analysis drawn as SVG, drawing it on first use.
+
+        Args:
+            key (str): The analysis ID
+
+        Returns:
+            str: The SVG document, or None if the analysis is unknown
+        """
+        memo_key = f"analysis:{key}:mind_map.svg:v{VISUALIZATION_VERSION}"
+        svg = self.cache.get(memo_key)
+        if svg is not None:
+            return svg
+
+        mind_map = self.visualization(key, "mind_map")
+        if mind_map is None:
+            return None
+        svg = render_mind_map_svg(mind_map["layout"])
+        self.cache.set(memo_key, svg, ttl=self.ttl)
+        return svg
+
+    @staticmethod
+    def etag(key, fmt):
+        """
+        Get the entity tag of a visualization.
+
+        Args:
+            key (str): The analysis ID
+            fmt (str): Visualization format, or mind_map.svg
+
+        Returns:
+            str: The (unquoted) entity tag
+        """
+        return f"{key}-{fmt}-v{VISUALIZATION_VERSION}"
+
+def create_analysis_store():
+    """
+    Create the analysis store configured in the environment.
+
+    The store's cache is set up by the ANALYSIS_STORE_* settings (see
+    cache.create_cache), with a smaller in-memory tier than the LLM cache.
+
+    Returns:
+        AnalysisStore: The store
+    """
+    ttl = int(os.getenv('ANALYSIS_TTL', 86400))
+    cache = create_cache(
+        ttl=ttl,
+        prefix='ANALYSIS_STORE',
+        db_name='brainstormer_analyses.sqlite3',
+        max_entries=256,
+        max_bytes=32 * 1024 * 1024
+    )
+    return AnalysisStore(cache, ttl=ttl)
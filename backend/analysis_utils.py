@@ -0,0 +1,135 @@
+import logging
+from viz_utils import format_visualizations, generate_colors, VISUALIZATION_FIELDS
+from response_encoding import dumps
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def normalize_formats(formats):
+    """
+    Normalize the requested visualization formats to a list.
+
+    Args:
+        formats (str or list): A single format name or a list of names
+
+    Returns:
+        list: List of format names
+    """
+    if isinstance(formats, str):
+        return [formats]
+    return list(formats or [])
+
+def extract_title(structured_data):
+    """
+    Extract a title for the analysis from its structured data.
+
+    Args:
+        structured_data (dict): Parsed analysis sections
+
+    Returns:
+        str: The analysis title
+    """
+    title = "Idea Analysis"
+    for section_name in ["Project Title", "Title"]:
+        if section_name in structured_data:
+            content = structured_data[section_name]
+            if isinstance(content, str):
+                title = content
+            elif isinstance(content, dict) and "content" in content:
+                title = content["content"]
+            elif isinstance(content, list) and len(content) > 0:
+                title = content[0]
+    return title
+
+def build_visualizations(structured_data, formats):
+    """
+    Generate the requested visualizations for an analysis.
+
+    Args:
+        structured_data (dict): Parsed analysis sections
+        formats (list): Requested formats (mind_map, cards, timeline or all)
+
+    Returns:
+        dict: Visualizations keyed by their response field name
+    """
+    if 'all' in formats:
+        formats = list(VISUALIZATION_FIELDS)
+    return format_visualizations(structured_data, formats)
+
+def build_analysis_response(idea, raw_analysis, structured_data, formats, processing_time, model=None,
+                            analysis_id=None):
+    """
+    Build the response body returned for a finished analysis.
+
+    Args:
+        idea (str): The analyzed idea
+        raw_analysis (str): Raw LLM output
+        structured_data (dict): Parsed analysis sections
+        formats (list): Requested visualization formats
+        processing_time (float): Seconds spent on the request
+        model (str): Model that produced the analysis
+        analysis_id (str): ID to fetch further visualizations with
+
+    Returns:
+        dict: The analysis response
+    """
+    return {
+        "title": extract_title(structured_data),
+        "idea": idea,
+        "analysisId": analysis_id,
+        "rawAnalysis": raw_analysis,
+        "structuredData": structured_data,
+        "visualizations": build_visualizations(structured_data, formats),
+        "model": model,
+        "processingTime": f"{processing_time:.2f} seconds"
+    }
+
+def build_section_fragments(index, section_name, section_content, formats):
+    """
+    Generate visualization fragments for a single finished section.
+
+    Fragments let streaming clients render a section as soon as it is
+    complete. The mind map node and card match what the full visualization
+    will contain; timeline events are numbered relative to the section.
+
+    Args:
+        index (int): Zero-based position of the section in the analysis
+        section_name (str): Name of the section
+        section_content: Parsed content of the section
+        formats (list): Requested formats (mind_map, cards, timeline or all)
+
+    Returns:
+        dict: Fragments keyed by their response field name
+    """
+    if 'all' in formats:
+        formats = list(VISUALIZATION_FIELDS)
+    visualizations = format_visualizations({section_name: section_content}, formats)
+    fragments = {}
+
+    if 'mindMap' in visualizations:
+        fragments['mindMap'] = visualizations['mindMap']["children"][0]
+
+    if 'cards' in visualizations:
+        card = visualizations['cards']["cards"][0]
+        card["id"] = index + 1
+        card["color"] = generate_colors(index + 1)[index]
+        fragments['card'] = card
+
+    if 'timeline' in visualizations:
+        fragments['timeline'] = visualizations['timeline']["events"]
+
+    return fragments
+
+def format_sse(event, data):
+    """
+    Encode a Server-Sent Events message.
+
+    Args:
+        event (str): Event name
+        data: JSON serializable payload
+
+    Returns:
+        str: The encoded event
+    """
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
@@ -1,13 +1,23 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
+import re
 import json
+import math
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from llm_processor import LLMProcessor
 from viz_utils import format_for_mindmap, format_for_cards, format_for_timeline
+from analysis_utils import normalize_formats, build_analysis_response, build_section_fragments, format_sse
 from templates import get_template, list_templates
+from rate_limiter import BATCH
+from model_router import UnknownModelError
+from resilience import LLMError
+from analysis_store import create_analysis_store, VISUALIZATION_FIELDS
+from response_encoding import dumps, encode_json, parse_fields, select_fields, wants_field
+from response_cache import create_response_cache, response_variant
 
 # Load environment variables
 load_dotenv()
@@ -22,11 +32,111 @@ CORS(app)
 
 llm_processor = LLMProcessor()
 
+# Finished analyses by ID, for fetching visualizations on demand
+analysis_store = create_analysis_store()
+
+# Encoded /api/analyze responses of cached analyses (RESPONSE_CACHE)
+response_cache = (
+    create_response_cache([llm_processor.cache, analysis_store.cache]) if llm_processor.cache_enabled else None
+)
+
+# Node paths in mind map requests: child positions separated by "/"
+MIND_MAP_PATH = re.compile(r'^(\d+(/\d+)*)?$')
+
+# Batch analysis limits
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 4))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 16))
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 100))
+
+def json_response(payload, status=200, headers=None):
+    """
+    Build a JSON response with the fast serializer, compressed if the client accepts it.
+    
+    Args:
+        payload: JSON serializable value
+        status (int): HTTP status code
+        headers (dict): Extra response headers
+    
+    Returns:
+        Response: The response
+    """
+    body, encoding_headers = encode_json(payload, request.headers.get('Accept-Encoding'))
+    response = Response(body, status=status, mimetype='application/json', headers=encoding_headers)
+    if headers:
+        response.headers.update(headers)
+    return response
+
+def cached_analysis_response(cache_key, idea, formats, fields, accept_encoding):
+    """
+    Get the response bytes built last time for a repeat /api/analyze request.
+    
+    Args:
+        cache_key (str): Cache key the request was routed to
+        idea (str): The analyzed idea
+        formats (list): Requested visualization formats
+        fields (list): Selected top-level fields, or None for all
+        accept_encoding (str): The request's Accept-Encoding header
+    
+    Returns:
+        tuple: (body, headers), or None when there is no cached response
+    """
+    if response_cache is None:
+        return None
+    return response_cache.get(cache_key, response_variant(formats, fields, idea), accept_encoding)
+
+def encode_analysis_response(idea, analysis, formats, fields, start_time, accept_encoding,
+                             cache_key=None, fresh_for=0):
+    """
+    Build and encode the /api/analyze response of a finished analysis.
+    
+    Stores the analysis when its ID is selected, builds the requested
+    visualizations and keeps only the selected fields. The bytes of
+    responses to cached analyses are kept in the response cache; their
+    processing time is that of a cache hit, so it holds for the repeats too.
+    Shared by the Flask and ASGI endpoints; the ASGI one runs it in a thread.
+    
+    Args:
+        idea (str): The analyzed idea
+        analysis (tuple): (raw_analysis, structured_data, model)
+        formats (list): Requested visualization formats
+        fields (list): Selected top-level fields, or None for all
+        start_time (float): When the request started
+        accept_encoding (str): The request's Accept-Encoding header
+        cache_key (str): Cache key of the analysis, if it came from the cache
+        fresh_for (float): Seconds the cached analysis stays fresh
+    
+    Returns:
+        tuple: (body, headers)
+    """
+    raw_analysis, structured_data, model = analysis
+    
+    # Store the analysis so its visualizations can be fetched by ID
+    analysis_id = None
+    if wants_field(fields, "analysisId"):
+        analysis_id = analysis_store.save(raw_analysis, structured_data, model)
+    
+    processing_time = time.time() - start_time
+    logger.info(f"Analysis completed in {processing_time:.2f} seconds")
+    response = select_fields(build_analysis_response(
+        idea, raw_analysis, structured_data, formats, processing_time, model, analysis_id
+    ), fields)
+    
+    if response_cache is not None and cache_key is not None:
+        return response_cache.set(
+            cache_key, response_variant(formats, fields, idea), dumps(response), accept_encoding,
+            dependencies=[f"analysis:{analysis_id}"] if analysis_id else (), ttl=fresh_for
+        )
+    return encode_json(response, accept_encoding)
+
 # Create analysis endpoint
 @app.route('/api/analyze', methods=['POST'])
 def analyze_idea():
     """
     Analyze an idea using the LLM and return structured results with visualizations.
+    
+    A fields list (query string "fields=a,b" or body "fields") limits the
+    response to those top-level fields; visualizations are not built
+    unless selected.
     """
     try:
         # Get request data
@@ -37,68 +147,342 @@ def analyze_idea():
         
         idea = data.get('idea')
         template_name = data.get('template', 'business_idea')
-        formats = data.get('formats', ['mind_map'])
-        
-        # If formats is a string, convert to list
-        if isinstance(formats, str):
-            formats = [formats]
+        formats = normalize_formats(data.get('formats', ['mind_map']))
+        fields = parse_fields(request.args.get('fields') or data.get('fields'))
+        if not wants_field(fields, "visualizations"):
+            formats = []
         
         # Get the template
         template = get_template(template_name)
         if not template:
             return jsonify({"error": f"Unknown template: {template_name}"}), 404
         
+        # Resolve the requested model or tier, if any
+        try:
+            model = llm_processor.router.resolve(data['model']) if data.get('model') else None
+        except UnknownModelError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Route once, so every lookup below names the same model
+        route = llm_processor.route(idea, template, model)
+        
+        # Repeat analyses are answered with the response bytes built last time
+        accept_encoding = request.headers.get('Accept-Encoding')
+        cached_response = cached_analysis_response(route[2], idea, formats, fields, accept_encoding)
+        if cached_response is not None:
+            logger.info("Using cached response")
+            body, headers = cached_response
+            return Response(body, mimetype='application/json', headers=headers)
+        
         # Track processing time
         start_time = time.time()
         
         # Process the idea
         logger.info(f"Analyzing idea using template: {template_name}")
-        raw_analysis, structured_data = llm_processor.process_idea(idea, template)
-        
-        # Extract a title
-        title = "Idea Analysis"
-        for section_name in ["Project Title", "Title"]:
-            if section_name in structured_data:
-                content = structured_data[section_name]
-                if isinstance(content, str):
-                    title = content
-                elif isinstance(content, dict) and "content" in content:
-                    title = content["content"]
-                elif isinstance(content, list) and len(content) > 0:
-                    title = content[0]
-        
-        # Generate visualizations
-        visualizations = {}
-        
-        if 'mind_map' in formats or 'all' in formats:
-            visualizations['mindMap'] = format_for_mindmap(structured_data)
-        
-        if 'cards' in formats or 'all' in formats:
-            visualizations['cards'] = format_for_cards(structured_data)
-        
-        if 'timeline' in formats or 'all' in formats:
-            visualizations['timeline'] = format_for_timeline(structured_data)
-        
-        # Calculate processing time
-        processing_time = time.time() - start_time
-        logger.info(f"Analysis completed in {processing_time:.2f} seconds")
-        
-        # Create response
-        response = {
-            "title": title,
-            "idea": idea,
-            "rawAnalysis": raw_analysis,
-            "structuredData": structured_data,
-            "visualizations": visualizations,
-            "processingTime": f"{processing_time:.2f} seconds"
-        }
-        
-        return jsonify(response)
+        cached, fresh_for = llm_processor.get_cached_entry(idea, template, model, route)
+        analysis = cached or llm_processor.process_idea(idea, template, model=model, route=route)
+        
+        # Build the response, keeping its bytes if the analysis was cached
+        body, headers = encode_analysis_response(
+            idea, analysis, formats, fields, start_time, accept_encoding,
+            route[2] if cached is not None else None, fresh_for
+        )
+        return Response(body, mimetype='application/json', headers=headers)
     
+    except LLMError as e:
+        logger.warning(f"LLM failure in analyze_idea: {str(e)}")
+        return jsonify(e.to_dict()), e.status_code, e.headers()
     except Exception as e:
         logger.error(f"Error in analyze_idea: {str(e)}", exc_info=True)
         return jsonify({"error": "Failed to analyze idea", "message": str(e)}), 500
 
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_idea_stream():
+    """
+    Analyze an idea, streaming each finished section as a Server-Sent Event.
+    
+    Emits a "section" event per completed section carrying its structured
+    data and visualization fragments, then a "done" event with the same
+    payload /api/analyze returns. Failures after the stream has started are
+    reported as an "error" event.
+    """
+    data = request.json
+    
+    if not data or 'idea' not in data:
+        return jsonify({"error": "Missing required 'idea' field"}), 400
+    
+    idea = data.get('idea')
+    template_name = data.get('template', 'business_idea')
+    formats = normalize_formats(data.get('formats', ['mind_map']))
+    
+    template = get_template(template_name)
+    if not template:
+        return jsonify({"error": f"Unknown template: {template_name}"}), 404
+    
+    try:
+        model = llm_processor.router.resolve(data['model']) if data.get('model') else None
+    except UnknownModelError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def generate():
+        start_time = time.time()
+        index = 0
+        try:
+            logger.info(f"Streaming analysis using template: {template_name}")
+            for event in llm_processor.stream_idea(idea, template, model=model):
+                if event[0] == "section":
+                    _, section_name, section_content = event
+                    payload = {
+                        "index": index,
+                        "name": section_name,
+                        "data": section_content,
+                        "elapsed": round(time.time() - start_time, 2)
+                    }
+                    payload.update(build_section_fragments(index, section_name, section_content, formats))
+                    index += 1
+                    yield format_sse("section", payload)
+                else:
+                    _, raw_analysis, structured_data, model_used = event
+                    processing_time = time.time() - start_time
+                    logger.info(f"Streamed analysis completed in {processing_time:.2f} seconds")
+                    analysis_id = analysis_store.save(raw_analysis, structured_data, model_used)
+                    yield format_sse("done", build_analysis_response(
+                        idea, raw_analysis, structured_data, formats, processing_time, model_used, analysis_id
+                    ))
+        except LLMError as e:
+            logger.warning(f"LLM failure in analyze_idea_stream: {str(e)}")
+            yield format_sse("error", dict(e.to_dict(), status=e.status_code, retryAfter=e.retry_after))
+        except Exception as e:
+            logger.error(f"Error in analyze_idea_stream: {str(e)}", exc_info=True)
+            yield format_sse("error", {"error": "Failed to analyze idea", "message": str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze a list of ideas, streaming results back as NDJSON.
+    
+    Accepts {"items": [{"idea", "template", "formats", "model"}, ...], "concurrency": n}.
+    Each output line carries the item's index and either its analysis result
+    or its error; a failing item never fails the batch. Cached analyses are
+    returned first, then the rest in completion order.
+    """
+    data = request.json
+    
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing required 'items' list"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Too many items (maximum is {BATCH_MAX_ITEMS})"}), 400
+    
+    concurrency = BATCH_CONCURRENCY
+    if isinstance(data, dict) and 'concurrency' in data:
+        try:
+            concurrency = int(data['concurrency'])
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid 'concurrency' value"}), 400
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    
+    def error_line(index, error, message=None, retry_after=None):
+        line = {"index": index, "status": "error", "error": error}
+        if message is not None:
+            line["message"] = message
+        if retry_after is not None:
+            line["retryAfter"] = math.ceil(retry_after)
+        return dumps(line).decode('utf-8') + "\n"
+    
+    def result_line(index, idea, raw_analysis, structured_data, model, formats, processing_time):
+        analysis_id = analysis_store.save(raw_analysis, structured_data, model)
+        result = build_analysis_response(
+            idea, raw_analysis, structured_data, formats, processing_time, model, analysis_id
+        )
+        return dumps({"index": index, "status": "ok", "result": result}).decode('utf-8') + "\n"
+    
+    def analyze_item(index, idea, template, model, formats, route):
+        start_time = time.time()
+        raw_analysis, structured_data, model = llm_processor.process_idea(
+            idea, template, lane=BATCH, model=model, route=route
+        )
+        return result_line(index, idea, raw_analysis, structured_data, model, formats, time.time() - start_time)
+    
+    def generate():
+        start_time = time.time()
+        pending = []
+        
+        # Validate items and serve cache hits immediately
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or 'idea' not in item:
+                yield error_line(index, "Missing required 'idea' field")
+                continue
+            
+            idea = item.get('idea')
+            template_name = item.get('template', 'business_idea')
+            template = get_template(template_name)
+            if not template:
+                yield error_line(index, f"Unknown template: {template_name}")
+                continue
+            
+            try:
+                model = llm_processor.router.resolve(item['model']) if item.get('model') else None
+            except UnknownModelError as e:
+                yield error_line(index, str(e))
+                continue
+            
+            formats = normalize_formats(item.get('formats', ['mind_map']))
+            route = llm_processor.route(idea, template, model)
+            try:
+                cached = llm_processor.get_cached(idea, template, model, route)
+                if cached is not None:
+                    yield result_line(index, idea, *cached, formats, 0)
+                    continue
+            except Exception as e:
+                logger.error(f"Cache lookup failed for batch item {index}: {str(e)}")
+            pending.append((index, idea, template, model, formats, route))
+        
+        if not pending:
+            return
+        
+        # Fan the misses out with bounded concurrency
+        logger.info(f"Analyzing {len(pending)} batch items with concurrency {concurrency}")
+        executor = ThreadPoolExecutor(max_workers=min(concurrency, len(pending)))
+        try:
+            futures = {executor.submit(analyze_item, *args): args[0] for args in pending}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield future.result()
+                except LLMError as e:
+                    logger.warning(f"LLM failure in batch item {index}: {str(e)}")
+                    yield error_line(index, e.error, str(e), e.retry_after)
+                except Exception as e:
+                    logger.error(f"Error in batch item {index}: {str(e)}", exc_info=True)
+                    yield error_line(index, "Failed to analyze idea", str(e))
+        finally:
+            # Stop queued work if the client goes away
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.info(f"Batch of {len(items)} items completed in {time.time() - start_time:.2f} seconds")
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/analysis/<analysis_id>/<fmt>', methods=['GET'])
+def get_analysis_visualization(analysis_id, fmt):
+    """
+    Get one visualization of a stored analysis, building it on first request.
+    
+    The response carries an ETag; a request whose If-None-Match matches it
+    gets a 304 without the visualization being read or rebuilt, as long as
+    the analysis is still stored (otherwise a 404).
+    """
+    try:
+        if fmt not in VISUALIZATION_FIELDS:
+            return jsonify({"error": f"Unknown visualization type: {fmt}"}), 400
+        
+        etag = analysis_store.etag(analysis_id, fmt)
+        headers = {"Cache-Control": "no-cache"}
+        # The ETag only names the ID, so check the analysis is still stored
+        # before telling the client its copy is current
+        if request.if_none_match.contains(etag) and analysis_store.contains(analysis_id):
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+        
+        visualization = analysis_store.visualization(analysis_id, fmt)
+        if visualization is None:
+            return jsonify({"error": f"Unknown analysis: {analysis_id}"}), 404
+        
+        response = json_response({
+            "type": fmt,
+            "analysisId": analysis_id,
+            "visualization": visualization
+        }, headers=headers)
+        response.set_etag(etag)
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error in get_analysis_visualization: {str(e)}", exc_info=True)
+        return jsonify({"error": "Failed to visualize analysis", "message": str(e)}), 500
+
+@app.route('/api/analysis/<analysis_id>/mindmap', methods=['GET'])
+@app.route('/api/analysis/<analysis_id>/mindmap/<path:node_path>', methods=['GET'])
+def get_analysis_mind_map(analysis_id, node_path=""):
+    """
+    Get the mind map of a stored analysis, or the subtree at a node path, laid out.
+    
+    Query parameters limit what is returned: depth (levels below the node),
+    maxChildren (children per node) and expand (comma separated paths of
+    nodes to show all children of). Nodes with children left out carry
+    their "path" and "childCount", so clients can load the top levels first
+    and fetch a node's subtree when it is expanded. A node path is the
+    child positions from the root separated by "/", e.g. "3/0".
+    """
+    try:
+        node_path = node_path.strip("/")
+        expand = [path.strip("/") for path in request.args.get('expand', '').split(',') if path.strip("/")]
+        if not all(MIND_MAP_PATH.match(path) for path in [node_path] + expand):
+            return jsonify({"error": "Mind map paths are child positions separated by '/'"}), 400
+        depth = request.args.get('depth', type=int)
+        max_children = request.args.get('maxChildren', type=int)
+        if (depth is not None and depth < 0) or (max_children is not None and max_children < 1):
+            return jsonify({"error": "depth must be 0 or more and maxChildren 1 or more"}), 400
+        
+        etag = analysis_store.etag(
+            analysis_id, f"mindmap/{node_path}?depth={depth}&maxChildren={max_children}&expand={','.join(expand)}"
+        )
+        headers = {"Cache-Control": "no-cache"}
+        if request.if_none_match.contains(etag) and analysis_store.contains(analysis_id):
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+        
+        mind_map = analysis_store.mind_map(analysis_id, node_path, depth, max_children, expand)
+        if mind_map is None:
+            return jsonify({"error": f"Unknown analysis or mind map node: {analysis_id}/{node_path}"}), 404
+        
+        response = json_response({
+            "type": "mind_map",
+            "analysisId": analysis_id,
+            "path": node_path,
+            "visualization": mind_map
+        }, headers=headers)
+        response.set_etag(etag)
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error in get_analysis_mind_map: {str(e)}", exc_info=True)
+        return jsonify({"error": "Failed to visualize analysis", "message": str(e)}), 500
+
+@app.route('/api/analysis/<analysis_id>/mind_map.svg', methods=['GET'])
+def get_analysis_mind_map_svg(analysis_id):
+    """
+    Get the mind map of a stored analysis as an SVG image, with an ETag like
+    the other visualizations.
+    """
+    try:
+        etag = analysis_store.etag(analysis_id, "mind_map.svg")
+        headers = {"Cache-Control": "no-cache"}
+        if request.if_none_match.contains(etag) and analysis_store.contains(analysis_id):
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+        
+        svg = analysis_store.mind_map_svg(analysis_id)
+        if svg is None:
+            return jsonify({"error": f"Unknown analysis: {analysis_id}"}), 404
+        
+        response = Response(svg, mimetype='image/svg+xml', headers=headers)
+        response.set_etag(etag)
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error in get_analysis_mind_map_svg: {str(e)}", exc_info=True)
+        return jsonify({"error": "Failed to draw mind map", "message": str(e)}), 500
+
 @app.route('/api/templates', methods=['GET'])
 def get_templates():
     """Get the list of available templates."""
@@ -168,10 +552,38 @@ def get_settings():
     return jsonify({
         "model": llm_processor.model_name,
         "temperature": llm_processor.temperature,
-        "max_tokens": llm_processor.max_tokens
+        "max_tokens": llm_processor.max_tokens,
+        "http": llm_processor.http_settings
     })
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get response cache statistics."""
+    stats = llm_processor.cache_stats()
+    stats["analyses"] = analysis_store.cache.stats()
+    if response_cache is not None:
+        stats["responses"] = response_cache.stats()
+    return jsonify(stats)
+
+@app.route('/api/ratelimit/stats', methods=['GET'])
+def get_rate_limit_stats():
+    """Get provider rate limiter statistics."""
+    return jsonify(llm_processor.rate_limit_stats())
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    """Get model routing settings and live per-model latency."""
+    return jsonify(llm_processor.model_stats())
+
+@app.route('/api/resilience/stats', methods=['GET'])
+def get_resilience_stats():
+    """Get deadline, retry, hedging and circuit breaker counters."""
+    return jsonify(llm_processor.resilience_stats())
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    # Open provider connections up front (GROQ_WARMUP_CONNECTIONS); under
+    # uvicorn asgi:app only the async client is warmed, by its lifespan
+    llm_processor.warm_up()
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+from app import (app as flask_app, llm_processor, analysis_store, cached_analysis_response,
+                 encode_analysis_response)
+from analysis_utils import normalize_formats, build_analysis_response, build_section_fragments, format_sse
+from templates import get_template
+from resilience import LLMError
+from model_router import UnknownModelError
+from response_encoding import parse_fields, wants_field
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# ASGI entry point (run with: uvicorn asgi:app)
+#
+# The slow, LLM-bound endpoints are served natively with asyncio so a single
+# process can keep many Groq calls in flight. Every other route is handed to
+# the Flask app unchanged, so both entry points expose the same API.
+
+async def analyze_idea(request):
+    """
+    Analyze an idea using the LLM and return structured results with visualizations.
+    """
+    try:
+        # Get request data
+        data = await request.json()
+
+        if not data or 'idea' not in data:
+            return JSONResponse({"error": "Missing required 'idea' field"}, status_code=400)
+
+        idea = data.get('idea')
+        template_name = data.get('template', 'business_idea')
+        formats = normalize_formats(data.get('formats', ['mind_map']))
+        fields = parse_fields(request.query_params.get('fields') or data.get('fields'))
+        if not wants_field(fields, "visualizations"):
+            formats = []
+
+        # Get the template
+        template = get_template(template_name)
+        if not template:
+            return JSONResponse({"error": f"Unknown template: {template_name}"}, status_code=404)
+
+        # Resolve the requested model or tier, if any
+        try:
+            model = llm_processor.router.resolve(data['model']) if data.get('model') else None
+        except UnknownModelError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        # Route once, so every lookup below names the same model
+        route = llm_processor.route(idea, template, model)
+
+        # Repeat analyses are answered with the response bytes built last time
+        accept_encoding = request.headers.get('accept-encoding')
+        cached_response = cached_analysis_response(route[2], idea, formats, fields, accept_encoding)
+        if cached_response is not None:
+            logger.info("Using cached response")
+            body, headers = cached_response
+            return Response(body, media_type="application/json", headers=headers)
+
+        # Track processing time
+        start_time = time.time()
+
+        # Process the idea
+        logger.info(f"Analyzing idea using template: {template_name}")
+        cached, fresh_for = await asyncio.to_thread(llm_processor.get_cached_entry, idea, template, model, route)
+        analysis = cached or await llm_processor.aprocess_idea(idea, template, model=model, route=route)
+
+        # Store the analysis and build the response off the event loop
+        body, headers = await asyncio.to_thread(
+            encode_analysis_response, idea, analysis, formats, fields, start_time, accept_encoding,
+            route[2] if cached is not None else None, fresh_for
+        )
+        return Response(body, media_type="application/json", headers=headers)
+
+    except LLMError as e:
+        logger.warning(f"LLM failure in analyze_idea: {str(e)}")
+        return JSONResponse(e.to_dict(), status_code=e.status_code, headers=e.headers())
+    except Exception as e:
+        logger.error(f"Error in analyze_idea: {str(e)}", exc_info=True)
+        return JSONResponse({"error": "Failed to analyze idea", "message": str(e)}, status_code=500)
+
+async def analyze_idea_stream(request):
+    """
+    Analyze an idea, streaming each finished section as a Server-Sent Event.
+    """
+    try:
+        data = await request.json()
+    except ValueError as e:
+        return JSONResponse({"error": "Failed to analyze idea", "message": str(e)}, status_code=400)
+
+    if not data or 'idea' not in data:
+        return JSONResponse({"error": "Missing required 'idea' field"}, status_code=400)
+
+    idea = data.get('idea')
+    template_name = data.get('template', 'business_idea')
+    formats = normalize_formats(data.get('formats', ['mind_map']))
+
+    template = get_template(template_name)
+    if not template:
+        return JSONResponse({"error": f"Unknown template: {template_name}"}, status_code=404)
+
+    try:
+        model = llm_processor.router.resolve(data['model']) if data.get('model') else None
+    except UnknownModelError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    async def generate():
+        start_time = time.time()
+        index = 0
+        try:
+            logger.info(f"Streaming analysis using template: {template_name}")
+            async for event in llm_processor.astream_idea(idea, template, model=model):
+                if event[0] == "section":
+                    _, section_name, section_content = event
+                    payload = {
+                        "index": index,
+                        "name": section_name,
+                        "data": section_content,
+                        "elapsed": round(time.time() - start_time, 2)
+                    }
+                    payload.update(await asyncio.to_thread(
+                        build_section_fragments, index, section_name, section_content, formats
+                    ))
+                    index += 1
+                    yield format_sse("section", payload)
+                else:
+                    _, raw_analysis, structured_data, model_used = event
+                    processing_time = time.time() - start_time
+                    logger.info(f"Streamed analysis completed in {processing_time:.2f} seconds")
+                    analysis_id = await asyncio.to_thread(
+                        analysis_store.save, raw_analysis, structured_data, model_used
+                    )
+                    yield format_sse("done", await asyncio.to_thread(
+                        build_analysis_response, idea, raw_analysis, structured_data, formats,
+                        processing_time, model_used, analysis_id
+                    ))
+        except LLMError as e:
+            logger.warning(f"LLM failure in analyze_idea_stream: {str(e)}")
+            yield format_sse("error", dict(e.to_dict(), status=e.status_code, retryAfter=e.retry_after))
+        except Exception as e:
+            logger.error(f"Error in analyze_idea_stream: {str(e)}", exc_info=True)
+            yield format_sse("error", {"error": "Failed to analyze idea", "message": str(e)})
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@asynccontextmanager
+async def lifespan(app):
+    """Open pooled async provider connections on the serving event loop."""
+    await llm_processor.awarm_up()
+    yield
+
+app = Starlette(
+    lifespan=lifespan,
+    routes=[
+        Route('/api/analyze', analyze_idea, methods=['POST']),
+        Route('/api/analyze/stream', analyze_idea_stream, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app))
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ]
+)
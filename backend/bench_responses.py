@@ -0,0 +1,89 @@
+import argparse
+import time
+from flask import Flask
+from analysis_utils import build_analysis_response
+from fake_llm import synthesize_response
+from response_encoding import dumps, compress, select_fields, brotli
+from section_parser import SectionParser
+from templates import get_template
+
+# Payload size and serialization time of /api/analyze responses, before
+# (jsonify, uncompressed, every field) and after (orjson, field selection,
+# gzip/brotli). Uses a synthesized analysis, so no backend or API key is
+# needed:
+#
+#     python bench_responses.py --template business_idea --repeat 200
+
+# Fields the Streamlit client asks for, fetching visualizations by ID
+CLIENT_FIELDS = {"title", "analysisId", "rawAnalysis", "processingTime"}
+
+def build_payload(template_name, idea):
+    """
+    Build a full analysis response with every visualization.
+
+    Args:
+        template_name (str): Template to synthesize an answer for
+        idea (str): The idea
+
+    Returns:
+        dict: The response /api/analyze would return
+    """
+    raw_analysis = synthesize_response(get_template(template_name).replace("{idea}", idea))
+    structured_data = SectionParser().parse(raw_analysis)
+    return build_analysis_response(
+        idea, raw_analysis, structured_data, ["all"], 1.0, "llama3-70b-8192", "0" * 24
+    )
+
+def measure(encode, repeat):
+    """
+    Time an encoder.
+
+    Args:
+        encode (callable): Function returning the encoded body
+        repeat (int): Number of runs
+
+    Returns:
+        tuple: (body size in bytes, mean microseconds per run)
+    """
+    body = encode()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    return len(body), (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis response encoding")
+    parser.add_argument("--template", default="business_idea", help="Template to synthesize an analysis for")
+    parser.add_argument("--idea", default="A marketplace connecting local farmers with nearby restaurants")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    args = parser.parse_args()
+
+    payload = build_payload(args.template, args.idea)
+    client_payload = select_fields(payload, CLIENT_FIELDS)
+    flask_app = Flask(__name__)
+
+    def jsonify(value):
+        with flask_app.app_context():
+            return flask_app.json.response(value).get_data()
+
+    cases = [
+        ("before: jsonify, all fields", lambda: jsonify(payload)),
+        ("orjson, all fields", lambda: dumps(payload)),
+        ("orjson + gzip, all fields", lambda: compress(dumps(payload), "gzip")),
+        ("orjson, client fields", lambda: dumps(client_payload)),
+        ("orjson + gzip, client fields", lambda: compress(dumps(client_payload), "gzip")),
+    ]
+    if brotli is not None:
+        cases.insert(3, ("orjson + brotli, all fields", lambda: compress(dumps(payload), "br")))
+        cases.append(("orjson + brotli, client fields", lambda: compress(dumps(client_payload), "br")))
+
+    baseline_size, baseline_time = measure(cases[0][1], args.repeat)
+    print(f"{'encoding':<34}{'bytes':>10}{'size':>8}{'us/op':>10}{'time':>8}")
+    for name, encode in cases:
+        size, micros = measure(encode, args.repeat)
+        print(f"{name:<34}{size:>10}{size / baseline_size:>8.0%}{micros:>10.1f}{micros / baseline_time:>8.0%}")
+    if brotli is None:
+        print("(brotli not installed: pip install brotli to include it)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import random
+import time
+import bench_viz_baseline as baseline
+from viz_utils import format_visualizations
+
+# Time to build every visualization of large synthetic analyses with the
+# frozen per-format implementation (bench_viz_baseline) and in a single pass:
+#
+#     python bench_visualizations.py --sections 200 --items 20 --repeat 50
+
+SECTION_NAMES = [
+    "Project Goals", "Key Tasks", "Stakeholders", "Risks", "Tools & Technologies",
+    "Business Model", "Market Opportunity", "Top Competitors", "Revenue Streams",
+    "Go-to-Market Strategy", "Future Features / Roadmap", "Implementation Phase",
+    "Customer Segments", "Partnerships", "Open Questions"
+]
+
+WORDS = ["market", "users", "platform", "pricing", "pilot", "growth", "data", "retention",
+         "channel", "partners", "launch", "quality", "support", "trust", "cost"]
+
+def sentence(rng, words=10):
+    """Make up a sentence of random words."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def synthesize_analysis(sections, items, seed=0):
+    """
+    Build structured data shaped like parsed LLM output.
+
+    Args:
+        sections (int): Number of sections
+        items (int): Bullet points per list section
+        seed (int): Random seed
+
+    Returns:
+        dict: Sections mixing lists, long text and emoji-wrapped content
+    """
+    rng = random.Random(seed)
+    data = {}
+    for index in range(sections):
+        name = f"{SECTION_NAMES[index % len(SECTION_NAMES)]} {index + 1}"
+        kind = index % 3
+        if kind == 0:
+            data[name] = [sentence(rng) for _ in range(items)]
+        elif kind == 1:
+            data[name] = " ".join(sentence(rng) for _ in range(items // 2 + 1))
+        else:
+            data[name] = {"emoji": "📌", "content": [sentence(rng) for _ in range(items)]}
+    return data
+
+def measure(build, repeat):
+    """
+    Time a visualization builder.
+
+    Args:
+        build (callable): Function building the visualizations
+        repeat (int): Number of runs
+
+    Returns:
+        float: Mean milliseconds per run
+    """
+    build()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark visualization building")
+    parser.add_argument("--sections", type=int, nargs="+", default=[14, 100, 500], help="Section counts to try")
+    parser.add_argument("--items", type=int, default=12, help="Bullet points per list section")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'sections':>8}{'baseline ms':>16}{'single pass ms':>16}{'speedup':>9}")
+    for sections in args.sections:
+        data = synthesize_analysis(sections, args.items)
+        separate = measure(lambda: (baseline.format_for_mindmap(data), baseline.format_for_cards(data),
+                                    baseline.format_for_timeline(data)),
+                           args.repeat)
+        single = measure(lambda: format_visualizations(data, ["mind_map", "cards", "timeline"]), args.repeat)
+        print(f"{sections:>8}{separate:>16.3f}{single:>16.3f}{separate / single:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
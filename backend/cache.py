@@ -0,0 +1,933 @@
+import threading
+import time
+import sys
+import os
+import json
+import sqlite3
+import hashlib
+import tempfile
+import logging
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+def normalize_idea(idea):
+    """
+    Normalize an idea so trivially different submissions share a cache entry.
+
+    Args:
+        idea (str): The raw idea text
+
+    Returns:
+        str: Lower-cased idea with collapsed whitespace
+    """
+    return " ".join(str(idea).split()).lower()
+
+def make_cache_key(idea, template, model=None):
+    """
+    Build a content-hash cache key for an analysis.
+
+    Args:
+        idea (str): The idea to analyze
+        template (str): The template text (or a template fingerprint)
+        model (str): The model that produced the analysis
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized idea, template and model
+    """
+    digest = hashlib.sha256()
+    digest.update(normalize_idea(idea).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(template.encode('utf-8'))
+    if model:
+        digest.update(b'\0')
+        digest.update(model.encode('utf-8'))
+    return digest.hexdigest()
+
+def estimate_size(value):
+    """
+    Roughly estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: The value to measure (str, list, dict, tuple or scalar)
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+def _split(total, parts):
+    """Split a budget into parts that add up to it, the first ones taking the remainder."""
+    share, remainder = divmod(max(parts, int(total)), parts)
+    return [share + (1 if index < remainder else 0) for index in range(parts)]
+
+class _CacheShard:
+    """One lock-protected LRU segment of an LRUCache."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with per-entry TTL.
+
+    Keys are spread over lock-striped shards so concurrent requests for
+    different keys rarely contend. Each shard enforces its share of the
+    entry and byte budget and evicts least recently used entries first.
+    Expired entries are dropped lazily on access and by a background sweeper.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024, ttl=3600,
+                 num_shards=8, sweep_interval=60):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries across all shards
+            max_bytes (int): Maximum estimated size of all values in bytes
+            ttl (float): Seconds an entry stays valid after it is stored
+            num_shards (int): Number of independently locked shards
+            sweep_interval (float): Seconds between background expiry sweeps
+        """
+        # Every shard holds at least one entry, so small caches get fewer shards
+        num_shards = max(1, min(int(num_shards), max_entries, max_bytes))
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._shards = [
+            _CacheShard(entries, size)
+            for entries, size in zip(_split(max_entries, num_shards), _split(max_bytes, num_shards))
+        ]
+
+        # Counters
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        # The sweeper is started lazily so it survives gunicorn's fork
+        self._sweeper = None
+        self._sweeper_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        # Called with the key of every entry that is evicted, expires, is
+        # replaced or is deleted
+        self._listeners = []
+
+    def _shard_for(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def add_eviction_listener(self, callback):
+        """
+        Register a callback invoked as callback(key) whenever an entry is
+        evicted, expires, is replaced or is deleted.
+
+        Args:
+            callback (callable): The callback
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, keys):
+        for key in keys:
+            for listener in self._listeners:
+                try:
+                    listener(key)
+                except Exception as e:
+                    logger.error(f"Cache eviction listener failed: {str(e)}")
+
+    def _count(self, hits=0, misses=0, evictions=0, expirations=0):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expirations += expirations
+
+    def get(self, key, default=None):
+        """
+        Get a value from the cache.
+
+        Args:
+            key: The cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        shard = self._shard_for(key)
+        expired = False
+        with shard.lock:
+            entry = shard.entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, size, value = entry
+                if expires_at > time.time():
+                    shard.entries.move_to_end(key)
+                    self._count(hits=1)
+                    return value
+                del shard.entries[key]
+                shard.bytes -= size
+                expired = True
+        self._count(misses=1, expirations=1 if expired else 0)
+        if expired and self._listeners:
+            self._notify([key])
+        return default
+
+    def contains(self, key):
+        """
+        Check that a key is cached and not expired, without counting a hit or miss.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bool: True if the key is present
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting least recently used entries to stay in budget.
+
+        Args:
+            key: The cache key
+            value: The value to store
+            ttl (float): Optional per-entry TTL overriding the cache default
+        """
+        self._ensure_sweeper()
+        size = estimate_size(value)
+        shard = self._shard_for(key)
+        if size > shard.max_bytes:
+            logger.warning(f"Not caching value of {size} bytes (shard budget is {shard.max_bytes} bytes)")
+            return
+
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        removed = []
+        with shard.lock:
+            old = shard.entries.pop(key, None)
+            if old is not None:
+                shard.bytes -= old[1]
+                removed.append(key)
+            shard.entries[key] = (expires_at, size, value)
+            shard.bytes += size
+
+            while len(shard.entries) > shard.max_entries or shard.bytes > shard.max_bytes:
+                old_key, (_, old_size, _) = shard.entries.popitem(last=False)
+                shard.bytes -= old_size
+                removed.append(old_key)
+
+        evicted = len(removed) - (old is not None)
+        if evicted:
+            self._count(evictions=evicted)
+        if removed and self._listeners:
+            self._notify(removed)
+
+    def delete(self, key):
+        """
+        Remove a key from the cache.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bool: True if the key was present
+        """
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.pop(key, None)
+            if entry is None:
+                return False
+            shard.bytes -= entry[1]
+        if self._listeners:
+            self._notify([key])
+        return True
+
+    def clear(self):
+        """Remove all entries."""
+        for shard in self._shards:
+            with shard.lock:
+                keys = list(shard.entries) if self._listeners else []
+                shard.entries.clear()
+                shard.bytes = 0
+            self._notify(keys)
+
+    def expire(self):
+        """
+        Drop all expired entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                stale = [key for key, (expires_at, _, _) in shard.entries.items() if expires_at <= now]
+                for key in stale:
+                    shard.bytes -= shard.entries.pop(key)[1]
+            removed += len(stale)
+            if stale and self._listeners:
+                self._notify(stale)
+        if removed:
+            self._count(expirations=removed)
+        return removed
+
+    def _ensure_sweeper(self):
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        if not self.sweep_interval or self.sweep_interval <= 0:
+            return
+        with self._sweeper_lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="cache-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._closed.wait(self.sweep_interval):
+            try:
+                removed = self.expire()
+                if removed:
+                    logger.debug(f"Cache sweeper removed {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {str(e)}")
+
+    def acquire_lease(self, key, ttl):
+        """
+        Claim the right to compute a key across processes.
+
+        A process-local cache has no other processes to coordinate with,
+        so the lease is always granted.
+
+        Args:
+            key: The cache key
+            ttl (float): Seconds before the lease lapses
+
+        Returns:
+            bool: Always True
+        """
+        return True
+
+    def release_lease(self, key):
+        """Release a lease taken with acquire_lease (no-op)."""
+
+    def wait_for(self, key, timeout, poll_interval=0.5):
+        """
+        Wait for another process to fill a key (nothing to wait for here).
+
+        Returns:
+            None
+        """
+        return None
+
+    def close(self):
+        """Stop the background sweeper."""
+        self._closed.set()
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self):
+        """
+        Get cache counters and current usage.
+
+        Returns:
+            dict: Hit/miss/eviction counters and size information
+        """
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            evictions, expirations = self._evictions, self._expirations
+        lookups = hits + misses
+        return {
+            "backend": "memory",
+            "entries": len(self),
+            "bytes": sum(shard.bytes for shard in self._shards),
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions,
+            "expirations": expirations
+        }
+
+class SQLiteCache:
+    """
+    Persistent cache stored in a local SQLite file.
+
+    Every gunicorn worker on a host can open the same file, so an analysis
+    computed by one worker is a hit for all of them and survives restarts.
+    Values must be JSON serializable.
+    """
+
+    def __init__(self, path, ttl=3600, max_entries=10000, sweep_every=100):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Path of the SQLite database file
+            ttl (float): Seconds an entry stays valid after it is stored
+            max_entries (int): Maximum number of rows kept in the file
+            sweep_every (int): Number of writes between expiry/trim passes
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_every = max(1, sweep_every)
+        self._local = threading.local()
+        self._writes = 0
+        self._listeners = []
+
+        # Counters
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "key TEXT PRIMARY KEY, owner INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections cannot be shared between threads, and must not
+        # be inherited across a fork, so keep one per thread and process.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, hits=0, misses=0, evictions=0, expirations=0):
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expirations += expirations
+
+    def add_eviction_listener(self, callback):
+        """
+        Register a callback invoked as callback(key) whenever this process
+        deletes an entry or sweeps it out.
+
+        Args:
+            callback (callable): The callback
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, keys):
+        for key in keys:
+            for listener in self._listeners:
+                try:
+                    listener(key)
+                except Exception as e:
+                    logger.error(f"Cache eviction listener failed: {str(e)}")
+
+    def get(self, key, default=None):
+        """
+        Get a value from the cache.
+
+        Args:
+            key (str): The cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        entry = self.get_with_expiry(key)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def get_with_expiry(self, key):
+        """
+        Get a value together with its expiry time.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            tuple: (expires_at, value) or None if missing or expired
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache read failed: {str(e)}")
+            self._count(misses=1)
+            return None
+
+        if row is None or row[1] <= time.time():
+            self._count(misses=1)
+            return None
+        value = self._decode(key, row[0])
+        if value is _MISSING:
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        return row[1], value
+
+    def _decode(self, key, data):
+        """Decode a stored value, or drop a truncated or corrupt row and return _MISSING."""
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            logger.error(f"SQLite cache entry {key} is corrupt, discarding it: {str(e)}")
+            self.delete(key)
+            return _MISSING
+
+    def contains(self, key):
+        """
+        Check that a key is stored and not expired, without reading its value.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            bool: True if the key is present
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT 1 FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache read failed: {str(e)}")
+            return False
+        return row is not None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value.
+
+        Args:
+            key (str): The cache key
+            value: JSON serializable value to store
+            ttl (float): Optional per-entry TTL overriding the cache default
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"SQLite cache write failed: {str(e)}")
+            return
+
+        with self._stats_lock:
+            self._writes += 1
+            sweep = self._writes % self.sweep_every == 0
+        if sweep:
+            self.expire()
+
+    def delete(self, key):
+        """
+        Remove a key from the cache.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            bool: True if the key was present
+        """
+        try:
+            deleted = self._connect().execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache delete failed: {str(e)}")
+            return False
+        if deleted and self._listeners:
+            self._notify([key])
+        return deleted
+
+    def clear(self):
+        """Remove all entries."""
+        try:
+            conn = self._connect()
+            keys = [row[0] for row in conn.execute("SELECT key FROM cache")] if self._listeners else []
+            conn.execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache clear failed: {str(e)}")
+            return
+        self._notify(keys)
+
+    def expire(self):
+        """
+        Drop expired rows and trim the file to its entry budget.
+
+        Returns:
+            int: Number of rows removed
+        """
+        now = time.time()
+        keys = []
+        try:
+            conn = self._connect()
+            if self._listeners:
+                keys = [row[0] for row in conn.execute(
+                    "SELECT key FROM cache WHERE expires_at <= ? UNION "
+                    "SELECT key FROM (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (now, self.max_entries)
+                )]
+            expired = conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+            evicted = conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache sweep failed: {str(e)}")
+            return 0
+        self._count(evictions=evicted, expirations=expired)
+        self._notify(keys)
+        return expired + evicted
+
+    def acquire_lease(self, key, ttl):
+        """
+        Claim the right to compute a key across all workers on the host.
+
+        Args:
+            key (str): The cache key
+            ttl (float): Seconds before the lease lapses if never released
+
+        Returns:
+            bool: True if this process now holds the lease
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, os.getpid(), now + ttl)
+            )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            # Without coordination every worker simply computes on its own
+            logger.error(f"SQLite lease acquisition failed: {str(e)}")
+            return True
+
+    def release_lease(self, key):
+        """
+        Release a lease held by this process.
+
+        Args:
+            key (str): The cache key
+        """
+        try:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, os.getpid()))
+        except sqlite3.Error as e:
+            logger.error(f"SQLite lease release failed: {str(e)}")
+
+    def wait_for(self, key, timeout, poll_interval=0.5):
+        """
+        Wait for another worker holding the lease on key to store its result.
+
+        Args:
+            key (str): The cache key
+            timeout (float): Maximum seconds to wait
+            poll_interval (float): Seconds between checks
+
+        Returns:
+            The value, or None if the lease holder gave up or the timeout elapsed
+        """
+        entry = self.wait_for_entry(key, timeout, poll_interval)
+        return None if entry is None else entry[1]
+
+    def wait_for_entry(self, key, timeout, poll_interval=0.5):
+        """
+        Like wait_for, but also return the entry's expiry time.
+
+        Returns:
+            tuple: (expires_at, value) or None
+        """
+        deadline = time.time() + timeout
+        conn = self._connect()
+        while time.time() < deadline:
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+                if row is not None:
+                    value = self._decode(key, row[0])
+                    if value is _MISSING:
+                        self._count(misses=1)
+                        return None
+                    self._count(hits=1)
+                    return row[1], value
+                lease = conn.execute(
+                    "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?", (key, time.time())
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"SQLite cache wait failed: {str(e)}")
+                return None
+            if lease is None:
+                return None
+            time.sleep(poll_interval)
+        return None
+
+    def __len__(self):
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache count failed: {str(e)}")
+            return 0
+
+    def stats(self):
+        """
+        Get cache counters and current usage.
+
+        Returns:
+            dict: Hit/miss/eviction counters and size information
+        """
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            evictions, expirations = self._evictions, self._expirations
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": len(self),
+            "maxEntries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions,
+            "expirations": expirations
+        }
+
+class TieredCache:
+    """
+    Two-tier cache: a fast in-process L1 in front of a shared L2.
+
+    Reads check L1 first and promote L2 hits into L1 for their remaining
+    lifetime. Writes go to both tiers.
+    """
+
+    def __init__(self, l1, l2):
+        """
+        Initialize the cache.
+
+        Args:
+            l1 (LRUCache): In-process tier
+            l2 (SQLiteCache): Shared tier
+        """
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl = l1.ttl
+
+    def add_eviction_listener(self, callback):
+        """
+        Register a callback invoked as callback(key) when either tier drops an entry.
+
+        Args:
+            callback (callable): The callback
+        """
+        self.l1.add_eviction_listener(callback)
+        self.l2.add_eviction_listener(callback)
+
+    def get(self, key, default=None):
+        """
+        Get a value from L1, falling back to L2.
+
+        Args:
+            key (str): The cache key
+            default: Value returned when neither tier has the key
+
+        Returns:
+            The cached value or default
+        """
+        value = self.l1.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        entry = self.l2.get_with_expiry(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        self.l1.set(key, value, ttl=max(0, expires_at - time.time()))
+        return value
+
+    def contains(self, key):
+        """
+        Check that either tier holds a key.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            bool: True if the key is present
+        """
+        return self.l1.contains(key) or self.l2.contains(key)
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value in both tiers.
+
+        Args:
+            key (str): The cache key
+            value: JSON serializable value to store
+            ttl (float): Optional per-entry TTL overriding the cache default
+        """
+        self.l1.set(key, value, ttl=ttl)
+        self.l2.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        """
+        Remove a key from both tiers.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            bool: True if either tier held the key
+        """
+        in_l1 = self.l1.delete(key)
+        in_l2 = self.l2.delete(key)
+        return in_l1 or in_l2
+
+    def acquire_lease(self, key, ttl):
+        """
+        Claim the right to compute a key across workers (see SQLiteCache).
+
+        Args:
+            key (str): The cache key
+            ttl (float): Seconds before the lease lapses
+
+        Returns:
+            bool: True if this process now holds the lease
+        """
+        return self.l2.acquire_lease(key, ttl)
+
+    def release_lease(self, key):
+        """
+        Release a lease held by this process.
+
+        Args:
+            key (str): The cache key
+        """
+        self.l2.release_lease(key)
+
+    def wait_for(self, key, timeout, poll_interval=0.5):
+        """
+        Wait for another worker to store key in L2 and promote it to L1.
+
+        Args:
+            key (str): The cache key
+            timeout (float): Maximum seconds to wait
+            poll_interval (float): Seconds between checks
+
+        Returns:
+            The value, or None if it did not appear
+        """
+        entry = self.l2.wait_for_entry(key, timeout, poll_interval)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        self.l1.set(key, value, ttl=max(0, expires_at - time.time()))
+        return value
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        self.l1.clear()
+        self.l2.clear()
+
+    def expire(self):
+        """
+        Drop expired entries from both tiers.
+
+        Returns:
+            int: Number of entries removed
+        """
+        return self.l1.expire() + self.l2.expire()
+
+    def stats(self):
+        """
+        Get statistics for both tiers.
+
+        Returns:
+            dict: L1 and L2 statistics
+        """
+        return {"backend": "tiered", "l1": self.l1.stats(), "l2": self.l2.stats()}
+
+def create_cache(ttl=3600, prefix='CACHE', db_name='brainstormer_cache.sqlite3',
+                 max_entries=512, max_bytes=64 * 1024 * 1024):
+    """
+    Create a cache backend configured in the environment.
+
+    <PREFIX>_BACKEND selects "memory" (per-process LRU), "sqlite" (shared file
+    only) or "tiered" (LRU in front of the shared file, the default); other
+    settings are read under the same prefix (<PREFIX>_MAX_ENTRIES,
+    <PREFIX>_DB_PATH, ...). Caches created under other prefixes follow
+    CACHE_BACKEND unless their own backend is set.
+
+    Args:
+        ttl (float): Default entry lifetime in seconds
+        prefix (str): Prefix of the environment settings
+        db_name (str): File name of the shared file, in the temp directory
+        max_entries (int): Default entry budget of the in-memory tier
+        max_bytes (int): Default byte budget of the in-memory tier
+
+    Returns:
+        LRUCache, SQLiteCache or TieredCache: The cache backend
+    """
+    backend = os.getenv(f'{prefix}_BACKEND', os.getenv('CACHE_BACKEND', 'tiered')).lower()
+
+    def memory_cache():
+        return LRUCache(
+            max_entries=int(os.getenv(f'{prefix}_MAX_ENTRIES', max_entries)),
+            max_bytes=int(os.getenv(f'{prefix}_MAX_BYTES', max_bytes)),
+            ttl=ttl,
+            num_shards=int(os.getenv(f'{prefix}_SHARDS', 8)),
+            sweep_interval=int(os.getenv(f'{prefix}_SWEEP_INTERVAL', 60))
+        )
+
+    def sqlite_cache():
+        return SQLiteCache(
+            os.getenv(f'{prefix}_DB_PATH', os.path.join(tempfile.gettempdir(), db_name)),
+            ttl=ttl,
+            max_entries=int(os.getenv(f'{prefix}_L2_MAX_ENTRIES', 10000))
+        )
+
+    if backend == 'memory':
+        return memory_cache()
+
+    try:
+        if backend == 'sqlite':
+            return sqlite_cache()
+        if backend != 'tiered':
+            logger.warning(f"Unknown {prefix}_BACKEND '{backend}', using tiered cache")
+        return TieredCache(memory_cache(), sqlite_cache())
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Failed to open shared cache, falling back to in-memory cache: {str(e)}")
+        return memory_cache()
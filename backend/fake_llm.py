@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from templates import parse_template_sections, END_MARKER
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Deterministic local stand-in for the Groq API, for offline load and latency
+# testing. Use FakeChatModel in-process (LLM_PROVIDER=fake), or run this module
+# as an OpenAI/Groq-compatible HTTP server and point GROQ_BASE_URL at it:
+#
+#     python fake_llm.py --port 8090 --ttft 0.4 --tps 250 --error-rate 0.01
+#     GROQ_BASE_URL=http://localhost:8090 python app.py
+
+_WORDS = (
+    "scalable platform users market growth pricing partners community data "
+    "mobile launch pilot retention analytics onboarding subscription channel "
+    "integration feedback automation support brand revenue cost quality trust"
+).split()
+
+_TOKEN = re.compile(r'\s*\S+|\s+')
+
+class FakeProviderError(Exception):
+    """Simulated provider failure, shaped like an HTTP error from the API."""
+
+    def __init__(self, status_code=503, retry_after=None):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f"Simulated provider error (HTTP {status_code})")
+
+def synthesize_response(prompt, seed=0):
+    """
+    Build a template-shaped analysis for a formatted prompt.
+
+    The same prompt and seed always give the same response.
+
+    Args:
+        prompt (str): The formatted template sent to the model
+        seed (int): Extra seed mixed into the prompt hash
+
+    Returns:
+        str: A response with one header and body per template section
+    """
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode('utf-8')).hexdigest()
+    rng = random.Random(int(digest[:16], 16))
+
+    def sentence():
+        words = rng.sample(_WORDS, rng.randint(6, 12))
+        return " ".join(words).capitalize() + "."
+
+    parts = []
+    for section in parse_template_sections(prompt):
+        number = f"{section['number']}. " if section['number'] else ""
+        parts.append(f"{section['emoji']} {number}**{section['title']}**")
+
+        hint = section['hint'].lower()
+        if section['title'].lower().endswith('title'):
+            parts.append(" ".join(rng.sample(_WORDS, 2)).title())
+        elif any(word in hint for word in ("list", "identify", "suggest", "outline")):
+            parts.extend(f"- {sentence()}" for _ in range(rng.randint(3, 6)))
+        else:
+            parts.append(" ".join(sentence() for _ in range(rng.randint(2, 3))))
+        parts.append("")
+
+    if not parts:
+        parts = [" ".join(sentence() for _ in range(4))]
+    text = "\n".join(parts).strip() + "\n"
+    if END_MARKER in prompt:
+        # Like a real model, follow the marker with chatter that the stop
+        # sequence is there to cut off
+        text += f"{END_MARKER}\n{sentence()} {sentence()}\n"
+    return text
+
+def tokenize(text):
+    """
+    Split text into word-sized pseudo tokens that concatenate back to it.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: Token strings
+    """
+    return _TOKEN.findall(text)
+
+def apply_limits(tokens, max_tokens=None, stop=None):
+    """
+    Truncate tokens at max_tokens or before the first stop sequence.
+
+    Args:
+        tokens (list): Token strings
+        max_tokens (int): Maximum number of tokens to keep
+        stop (list): Stop sequences
+
+    Returns:
+        tuple: (tokens, finish_reason)
+    """
+    finish_reason = "stop"
+    if max_tokens is not None and len(tokens) > max_tokens:
+        tokens = tokens[:max_tokens]
+        finish_reason = "length"
+    if stop:
+        text = "".join(tokens)
+        cut = min((text.find(s) for s in stop if s and s in text), default=-1)
+        if cut != -1:
+            tokens = tokenize(text[:cut])
+            finish_reason = "stop"
+    return tokens, finish_reason
+
+class LatencyProfile:
+    """Timing and failure behaviour of the fake provider."""
+
+    def __init__(self, ttft=0.3, tokens_per_sec=250.0, error_rate=0.0, jitter=0.1, seed=0):
+        """
+        Initialize the profile.
+
+        Args:
+            ttft (float): Seconds until the first token
+            tokens_per_sec (float): Generation speed after the first token
+            error_rate (float): Probability in [0, 1] that a request fails
+            jitter (float): Relative random variation applied to all delays
+            seed (int): Seed for response content
+        """
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _scale(self, delay):
+        with self._lock:
+            factor = self._rng.uniform(1 - self.jitter, 1 + self.jitter) if self.jitter else 1.0
+        return max(0.0, delay * factor)
+
+    def first_token_delay(self):
+        return self._scale(self.ttft)
+
+    def token_delay(self):
+        return self._scale(1.0 / self.tokens_per_sec) if self.tokens_per_sec > 0 else 0.0
+
+    def maybe_fail(self):
+        """Raise FakeProviderError with the configured probability."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            # Mix rate limiting and server errors like a real provider would
+            if roll < self.error_rate / 2:
+                raise FakeProviderError(429, retry_after=1)
+            raise FakeProviderError(503)
+
+def _prompt_text(messages):
+    return "\n".join(str(message.content) for message in messages)
+
+class FakeChatModel(BaseChatModel):
+    """
+    In-process LangChain chat model returning synthesized template answers.
+
+    Supports invoke/stream and their async variants with realistic timing,
+    so it can stand in for ChatGroq anywhere in the backend.
+    """
+
+    model_name: str = "fake-llm"
+    max_tokens: Optional[int] = None
+    ttft: float = 0.3
+    tokens_per_sec: float = 250.0
+    error_rate: float = 0.0
+    jitter: float = 0.1
+    seed: int = 0
+    profile: Any = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.profile = LatencyProfile(self.ttft, self.tokens_per_sec, self.error_rate, self.jitter, self.seed)
+
+    @property
+    def _llm_type(self):
+        return "fake-groq"
+
+    def _tokens(self, messages, stop, kwargs):
+        self.profile.maybe_fail()
+        prompt = _prompt_text(messages)
+        tokens = tokenize(synthesize_response(prompt, self.seed))
+        tokens, finish_reason = apply_limits(tokens, kwargs.get('max_tokens', self.max_tokens), stop)
+        usage = {
+            "input_tokens": len(tokenize(prompt)),
+            "output_tokens": len(tokens),
+            "total_tokens": len(tokenize(prompt)) + len(tokens)
+        }
+        return tokens, usage, finish_reason
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        tokens, usage, finish_reason = self._tokens(messages, stop, kwargs)
+        delay = self.profile.first_token_delay() + sum(self.profile.token_delay() for _ in tokens[1:])
+        timeout = kwargs.get('timeout')
+        if timeout is not None and delay > timeout:
+            # Like a real client, stop waiting for a response at the request timeout
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"Fake LLM request timed out after {timeout:.2f} seconds")
+        time.sleep(delay)
+        message = AIMessage(content="".join(tokens), usage_metadata=usage,
+                            response_metadata={"model_name": self.model_name, "finish_reason": finish_reason})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        tokens, usage, finish_reason = self._tokens(messages, stop, kwargs)
+        delay = self.profile.first_token_delay() + sum(self.profile.token_delay() for _ in tokens[1:])
+        timeout = kwargs.get('timeout')
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(max(0.0, timeout))
+            raise TimeoutError(f"Fake LLM request timed out after {timeout:.2f} seconds")
+        await asyncio.sleep(delay)
+        message = AIMessage(content="".join(tokens), usage_metadata=usage,
+                            response_metadata={"model_name": self.model_name, "finish_reason": finish_reason})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        tokens, usage, finish_reason = self._tokens(messages, stop, kwargs)
+        time.sleep(self.profile.first_token_delay())
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.profile.token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage),
+                                  generation_info={"finish_reason": finish_reason})
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        tokens, usage, finish_reason = self._tokens(messages, stop, kwargs)
+        await asyncio.sleep(self.profile.first_token_delay())
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(self.profile.token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage),
+                                  generation_info={"finish_reason": finish_reason})
+
+class _FakeGroqHandler(BaseHTTPRequestHandler):
+    """Handles the subset of the Groq/OpenAI REST API used by ChatGroq."""
+
+    protocol_version = "HTTP/1.1"
+    profile = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake-llm", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "fake-llm")
+
+        try:
+            self.profile.maybe_fail()
+        except FakeProviderError as e:
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+            error_type = "rate_limit_exceeded" if e.status_code == 429 else "server_error"
+            self._send_json(e.status_code, {"error": {"message": str(e), "type": error_type}}, headers)
+            return
+
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        stop = request.get("stop")
+        if isinstance(stop, str):
+            stop = [stop]
+        tokens = tokenize(synthesize_response(prompt, self.profile.seed))
+        tokens, finish_reason = apply_limits(tokens, request.get("max_tokens"), stop)
+        usage = {
+            "prompt_tokens": len(tokenize(prompt)),
+            "completion_tokens": len(tokens),
+            "total_tokens": len(tokenize(prompt)) + len(tokens)
+        }
+        completion_id = "chatcmpl-" + hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:24]
+        created = int(time.time())
+
+        time.sleep(self.profile.first_token_delay())
+
+        if not request.get("stream"):
+            time.sleep(sum(self.profile.token_delay() for _ in tokens[1:]))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason
+                }],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_chunk(payload):
+            data = f"data: {payload}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def delta_chunk(delta, finish=None, extra=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+            }
+            if extra:
+                chunk.update(extra)
+            return json.dumps(chunk)
+
+        send_chunk(delta_chunk({"role": "assistant", "content": ""}))
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.profile.token_delay())
+            send_chunk(delta_chunk({"content": token}))
+        send_chunk(delta_chunk({}, finish_reason, {"x_groq": {"usage": usage}}))
+        send_chunk("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+def create_server(host="127.0.0.1", port=8090, profile=None):
+    """
+    Create the fake Groq HTTP server.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        profile (LatencyProfile): Timing and failure behaviour
+
+    Returns:
+        ThreadingHTTPServer: The server (call serve_forever to run it)
+    """
+    handler = type("FakeGroqHandler", (_FakeGroqHandler,), {"profile": profile or LatencyProfile()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a fake Groq-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds to first token")
+    parser.add_argument("--tps", type=float, default=250.0, help="tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of failed requests")
+    parser.add_argument("--jitter", type=float, default=0.1, help="relative delay variation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, LatencyProfile(
+        args.ttft, args.tps, args.error_rate, args.jitter, args.seed
+    ))
+    logger.info(f"Fake Groq server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
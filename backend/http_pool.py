@@ -0,0 +1,156 @@
+import os
+import asyncio
+import importlib.util
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.groq.com"
+
+def http_settings_from_env():
+    """
+    Read the Groq HTTP transport settings from the environment.
+
+    Returns:
+        dict: Pool, keep-alive, HTTP/2, timeout and warm-up settings
+    """
+    pool_size = int(os.getenv('GROQ_POOL_SIZE', 20))
+    return {
+        "base_url": os.getenv('GROQ_BASE_URL') or DEFAULT_BASE_URL,
+        "pool_size": pool_size,
+        "keepalive_connections": int(os.getenv('GROQ_KEEPALIVE_CONNECTIONS', pool_size)),
+        "keepalive_expiry": float(os.getenv('GROQ_KEEPALIVE_EXPIRY', 60)),
+        "http2": os.getenv('GROQ_HTTP2', 'False').lower() in ('true', '1', 't'),
+        "connect_timeout": float(os.getenv('GROQ_CONNECT_TIMEOUT', 5)),
+        "read_timeout": float(os.getenv('GROQ_READ_TIMEOUT', 120)),
+        "write_timeout": float(os.getenv('GROQ_WRITE_TIMEOUT', 10)),
+        "pool_timeout": float(os.getenv('GROQ_POOL_TIMEOUT', 10)),
+        "max_retries": int(os.getenv('GROQ_MAX_RETRIES', 2)),
+        "warmup_connections": int(os.getenv('GROQ_WARMUP_CONNECTIONS', 0))
+    }
+
+def build_timeout(settings):
+    """
+    Build the httpx timeout for the configured settings.
+
+    Args:
+        settings (dict): Settings from http_settings_from_env
+
+    Returns:
+        httpx.Timeout: Connect/read/write/pool timeouts
+    """
+    return httpx.Timeout(
+        connect=settings["connect_timeout"],
+        read=settings["read_timeout"],
+        write=settings["write_timeout"],
+        pool=settings["pool_timeout"]
+    )
+
+def create_http_clients(settings):
+    """
+    Create pooled keep-alive HTTP clients for the Groq API.
+
+    HTTP/2 needs the optional h2 package; without it the clients fall back
+    to HTTP/1.1.
+
+    Args:
+        settings (dict): Settings from http_settings_from_env
+
+    Returns:
+        tuple: (httpx.Client, httpx.AsyncClient)
+    """
+    http2 = settings["http2"]
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("GROQ_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings["pool_size"],
+        max_keepalive_connections=settings["keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"]
+    )
+    timeout = build_timeout(settings)
+    logger.info(
+        f"Groq HTTP pool: {settings['pool_size']} connections, "
+        f"keep-alive {settings['keepalive_expiry']}s, HTTP/2 {'on' if http2 else 'off'}"
+    )
+    return (
+        httpx.Client(limits=limits, timeout=timeout, http2=http2),
+        httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+    )
+
+def _warm_up_url(settings):
+    return settings["base_url"].rstrip('/') + "/openai/v1/models"
+
+def warm_up(client, settings, api_key=None):
+    """
+    Open connections ahead of the first user request.
+
+    Issues cheap concurrent GET requests so the TCP and TLS handshakes are
+    paid at startup and the connections stay in the keep-alive pool.
+
+    Args:
+        client (httpx.Client): The pooled client
+        settings (dict): Settings from http_settings_from_env
+        api_key (str): API key sent with the warm-up requests
+
+    Returns:
+        int: Number of connections that were opened successfully
+    """
+    count = min(settings["warmup_connections"], settings["pool_size"])
+    if count <= 0:
+        return 0
+
+    url = _warm_up_url(settings)
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def ping(_):
+        try:
+            client.get(url, headers=headers).close()
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Connection warm-up failed: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        opened = sum(executor.map(ping, range(count)))
+    logger.info(f"Warmed up {opened} connection(s) to {settings['base_url']}")
+    return opened
+
+async def awarm_up(client, settings, api_key=None):
+    """
+    Async counterpart of warm_up for the AsyncClient.
+
+    Must run on the event loop that will later use the client.
+
+    Args:
+        client (httpx.AsyncClient): The pooled async client
+        settings (dict): Settings from http_settings_from_env
+        api_key (str): API key sent with the warm-up requests
+
+    Returns:
+        int: Number of connections that were opened successfully
+    """
+    count = min(settings["warmup_connections"], settings["pool_size"])
+    if count <= 0:
+        return 0
+
+    url = _warm_up_url(settings)
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    async def ping():
+        try:
+            response = await client.get(url, headers=headers)
+            await response.aclose()
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Connection warm-up failed: {str(e)}")
+            return False
+
+    opened = sum(await asyncio.gather(*(ping() for _ in range(count))))
+    logger.info(f"Warmed up {opened} async connection(s) to {settings['base_url']}")
+    return opened
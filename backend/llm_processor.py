@@ -1,12 +1,22 @@
-from langchain_groq import ChatGroq
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
 import os
 from dotenv import load_dotenv
 import logging
-import re
 import json
 import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from cache import create_cache, make_cache_key
+from singleflight import SingleFlight, AsyncSingleFlight
+from section_parser import SectionParser
+from providers import create_llm
+from http_pool import http_settings_from_env, create_http_clients, build_timeout, warm_up, awarm_up
+from prompt_registry import PromptRegistry
+from rate_limiter import create_rate_limiter, is_rate_limit_error, INTERACTIVE
+from resilience import create_resilient_caller, is_retryable, LLMError, DeadlineExceeded
+from model_router import create_model_router
+from token_budget import create_token_budget, completion_usage
+from templates import get_templates, on_template_added
 
 # Load environment variables
 load_dotenv()
@@ -20,83 +30,953 @@ class LLMProcessor:
     
     def __init__(self):
         """Initialize the LLM processor."""
+        self.provider = os.getenv('LLM_PROVIDER', 'groq').lower()
         self.api_key = os.getenv('GROQ_API_KEY')
         self.model_name = os.getenv('MODEL_NAME', 'llama3-70b-8192')
         self.temperature = float(os.getenv('TEMPERATURE', 0.7))
         self.max_tokens = int(os.getenv('MAX_TOKENS', 4096))
         
         # Check if API key is available
-        if not self.api_key:
+        if not self.api_key and self.provider == 'groq':
             logger.warning("No GROQ_API_KEY found in environment variables. LLM functionality will not work.")
-            
-        # Initialize LLM
-        self._init_llm()
         
-        # Simple response cache
-        self.cache = {}
+        # Pooled keep-alive transport for the Groq API
+        self.http_settings = http_settings_from_env()
+        self.http_client = None
+        self.http_async_client = None
+        if self.provider == 'groq':
+            self.http_client, self.http_async_client = create_http_clients(self.http_settings)
+        
+        # Route templates and requests between the quality and fast tiers
+        self.router = create_model_router(self.model_name)
+        
+        # Initialize one LLM per routable model; they share the HTTP pool
+        self.llms = {model: self._init_llm(model) for model in self.router.models}
+        self.llm = self.llms[self.model_name]
+        
+        # Compile every known template once per model; templates added later
+        # are compiled as they are registered
+        self.prompts = {model: PromptRegistry(llm) for model, llm in self.llms.items()}
+        for registry in self.prompts.values():
+            registry.warm(get_templates())
+        on_template_added(self._compile_template)
+        
+        # Response cache (in-process L1, optionally backed by a shared L2)
         self.cache_enabled = os.getenv('ENABLE_CACHE', 'True').lower() in ('true', '1', 't')
-        self.cache_timeout = 3600  # 1 hour
+        self.cache_timeout = int(os.getenv('CACHE_TTL', 3600))  # 1 hour
+        # Expired analyses are kept this much longer, to be served when the
+        # provider is down
+        self.stale_ttl = int(os.getenv('CACHE_STALE_TTL', 86400))
+        self.cache = create_cache(ttl=self.cache_timeout + self.stale_ttl)
+        
+        # Coalesce identical in-flight requests (across threads, and across
+        # workers through leases on the shared cache)
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        self.lease_timeout = int(os.getenv('SINGLE_FLIGHT_LEASE_TTL', 120))
+        
+        # Keep provider calls under the RPM/TPM quota (GROQ_RPM, GROQ_TPM)
+        self.rate_limiter = create_rate_limiter(self.max_tokens)
+        
+        # Deadlines, retries, hedging and circuit breaking around provider
+        # calls, with a breaker and latency history per model
+        self.callers = {
+            model: create_resilient_caller(self.http_settings["max_retries"]) for model in self.router.models
+        }
+        
+        # Completion limits learned per template and model, up to MAX_TOKENS
+        self.token_budget = create_token_budget(self.max_tokens)
+        
+        # Ask again for just the sections an analysis is missing
+        self.section_reask = os.getenv('SECTION_REASK', 'True').lower() in ('true', '1', 't')
+        
+        # Section groups of section-parallel templates are requested at once
+        self.section_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('SECTION_GROUP_THREADS', 32)), thread_name_prefix='section-group'
+        )
     
-    def _init_llm(self):
-        """Initialize the LLM with current settings."""
+    def _init_llm(self, model_name):
+        """
+        Initialize an LLM with current settings.
+        
+        Args:
+            model_name (str): Model to use
+        
+        Returns:
+            BaseChatModel: The chat model
+        """
         try:
-            self.llm = ChatGroq(
+            llm = create_llm(
+                self.provider,
                 api_key=self.api_key,
-                model_name=self.model_name,
+                model_name=model_name,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+                request_timeout=build_timeout(self.http_settings),
+                # Retries are done by the resilience layer, within the deadline
+                max_retries=0
             )
-            logger.info(f"LLM initialized with model: {self.model_name}")
+            logger.info(f"LLM initialized with provider {self.provider} and model: {model_name}")
+            return llm
         except Exception as e:
             logger.error(f"Failed to initialize LLM: {str(e)}")
             raise
     
-    def process_idea(self, idea, template):
+    def _compile_template(self, name, template):
+        """Compile a newly registered template for every model."""
+        for registry in self.prompts.values():
+            registry.compile(template, name)
+    
+    def warm_up(self):
+        """
+        Open pooled connections to the provider before the first request.
+        
+        Returns:
+            int: Number of connections opened (0 if warm-up is disabled)
+        """
+        if self.http_client is None:
+            return 0
+        return warm_up(self.http_client, self.http_settings, self.api_key)
+    
+    async def awarm_up(self):
+        """
+        Async counterpart of warm_up; run it on the serving event loop.
+        
+        Returns:
+            int: Number of connections opened (0 if warm-up is disabled)
+        """
+        if self.http_async_client is None:
+            return 0
+        return await awarm_up(self.http_async_client, self.http_settings, self.api_key)
+    
+    def route(self, idea, template, model=None):
+        """
+        Pick the models for an analysis.
+        
+        A request routes once and passes the result on, so its cache lookups,
+        single-flight key and stored entry all name the same model. The key
+        names the model the request or template asked for, not the one the
+        latency SLO moved it to, so repeats find the analysis either way.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model asked for by the request, if any
+        
+        Returns:
+            tuple: (compiled_template, models, cache_key) where models are
+            in the order to try them and cache_key belongs to the preferred one
+        """
+        compiled = self.prompts[self.model_name].get(template)
+        models = self.router.route(compiled, model, make_cache_key(idea, compiled.fingerprint))
+        preferred = self.router.preferred(compiled, model)
+        return compiled, models, make_cache_key(idea, compiled.fingerprint, preferred)
+    
+    def process_idea(self, idea, template, lane=INTERACTIVE, model=None, route=None):
         """
         Process an idea using the specified template.
         
         Args:
             idea (str): The idea to analyze
             template (str): The template to use
-            
+            lane (str): Rate limiter priority lane (interactive or batch)
+            model (str): Tier or model to use instead of the template's default
+            route (tuple): Result of route for this request, if already routed
+        
         Returns:
-            tuple: (raw_analysis, structured_data)
+            tuple: (raw_analysis, structured_data, model)
         """
+        compiled, models, cache_key = route or self.route(idea, template, model)
+        
         # Check cache first
-        cache_key = (idea, template)
-        if self.cache_enabled and cache_key in self.cache:
-            timestamp, raw_analysis, structured_data = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_timeout:
+        if self.cache_enabled:
+            cached = self._lookup(cache_key, models[0])
+            if cached is not None:
                 logger.info("Using cached analysis")
-                return raw_analysis, structured_data
+                return cached
         
-        # Create the prompt
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=["idea"]
-        )
+        try:
+            raw_analysis, structured_data, model = self.single_flight.do(
+                cache_key, lambda: self._run_analysis(idea, template, models, cache_key, lane)
+            )[0]
+        except LLMError as e:
+            stale = self._get_stale(idea, compiled, models, e)
+            if stale is None:
+                raise
+            raw_analysis, structured_data, model = stale
+        return raw_analysis, structured_data, model
+    
+    def cache_key(self, idea, template, model=None):
+        """
+        Get the cache key an analysis is stored under, without looking it up.
         
-        # Create the chain
-        chain = LLMChain(llm=self.llm, prompt=prompt)
+        Requests that go on to look up or run the analysis should call route
+        instead and pass its result along.
         
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model asked for by the request, if any
+        
+        Returns:
+            str: The cache key
+        """
+        return self.route(idea, template, model)[2]
+    
+    def get_cached(self, idea, template, model=None, route=None):
+        """
+        Look up a finished analysis without calling the LLM.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model asked for by the request, if any
+            route (tuple): Result of route for this request, if already routed
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model), or None on a cache miss
+        """
+        return self.get_cached_entry(idea, template, model, route)[0]
+    
+    def get_cached_entry(self, idea, template, model=None, route=None):
+        """
+        Look up a finished analysis along with how long it stays fresh.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model asked for by the request, if any
+            route (tuple): Result of route for this request, if already routed
+        
+        Returns:
+            tuple: (analysis, fresh_for) where analysis is (raw_analysis,
+            structured_data, model) or None on a cache miss, and fresh_for
+            is the number of seconds it stays fresh
+        """
+        if not self.cache_enabled:
+            return None, 0
+        _, models, cache_key = route or self.route(idea, template, model)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None, 0
+        # Entries are [raw, structured, fresh_until, model]
+        fresh_for = cached[2] - time.time() if len(cached) > 2 else self.cache_timeout
+        if fresh_for <= 0:
+            return None, 0
+        logger.info("Using cached analysis")
+        return (cached[0], cached[1], self._entry_model(cached, models[0])), fresh_for
+    
+    @staticmethod
+    def _entry_model(cached, model):
+        """Get the model that wrote a cache entry, or model for entries that do not say."""
+        return cached[3] if len(cached) > 3 and cached[3] else model
+    
+    def _lookup(self, cache_key, model, allow_stale=False):
+        """
+        Read an analysis from the cache.
+        
+        Args:
+            cache_key (str): Cache key of the analysis
+            model (str): Model the key was made for
+            allow_stale (bool): Whether to return entries past CACHE_TTL
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model) with the model that
+            answered, or None on a miss
+        """
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        # Entries are [raw, structured, fresh_until, model]
+        if not allow_stale and len(cached) > 2 and cached[2] < time.time():
+            return None
+        return cached[0], cached[1], self._entry_model(cached, model)
+    
+    def _store(self, cache_key, idea, compiled, model, raw_analysis, structured_data):
+        """
+        Write an analysis to the cache, fresh for CACHE_TTL and stale for CACHE_STALE_TTL after that.
+        
+        It is stored under the key the request was routed to, so the next
+        identical request finds it even when a fallback model answered, and
+        under the key of the model that answered.
+        
+        Args:
+            cache_key (str): Cache key the request was routed to
+            idea (str): The analyzed idea
+            compiled (CompiledTemplate): The template compiled for the model
+            model (str): The model that answered
+            raw_analysis (str): The raw LLM response
+            structured_data (dict): The parsed sections
+        """
+        entry = [raw_analysis, structured_data, time.time() + self.cache_timeout, model]
+        self.cache.set(cache_key, entry)
+        model_key = make_cache_key(idea, compiled.fingerprint, model)
+        if model_key != cache_key:
+            self.cache.set(model_key, entry)
+    
+    def _get_stale(self, idea, compiled, models, error):
+        """
+        Find an expired analysis from any of the models to serve when the LLM call failed.
+        
+        Args:
+            idea (str): The idea to analyze
+            compiled (CompiledTemplate): The compiled template
+            models (list): Models the analysis was routed to
+            error (LLMError): Why the LLM call failed
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model), or None if there is none
+        """
+        if not self.cache_enabled or self.stale_ttl <= 0:
+            return None
+        for model in models:
+            stale = self._lookup(make_cache_key(idea, compiled.fingerprint, model), model, allow_stale=True)
+            if stale is not None:
+                logger.warning(f"Serving stale analysis from {stale[2]}: {str(error)}")
+                self.callers[model].record_stale()
+                return stale
+        return None
+    
+    def _replay(self, raw_analysis, structured_data, model):
+        """Yield the stream events of an already finished analysis."""
+        if isinstance(structured_data, dict):
+            for section_name, section_content in structured_data.items():
+                yield ("section", section_name, section_content)
+        yield ("done", raw_analysis, structured_data, model)
+    
+    def _invoke(self, compiled, idea, model, timeout):
+        """Make one provider request (retried and hedged by the resilience layer)."""
+        budget_key = f"{model}:{compiled.key}"
         try:
-            # Run the chain
-            logger.info("Requesting LLM analysis...")
-            raw_analysis = chain.run(idea=idea)
-            
-            # Parse the response
-            logger.info("Parsing LLM response...")
-            raw_analysis, structured_data = self.parse_response(raw_analysis)
-            
-            # Update cache
-            if self.cache_enabled:
-                self.cache[cache_key] = (time.time(), raw_analysis, structured_data)
+            message = compiled.invoke(idea, self.token_budget.limit(budget_key), timeout)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.rate_limiter.drain(model)
+            raise
+        self.token_budget.record(budget_key, *completion_usage(
+            message.content, message.usage_metadata, message.response_metadata.get('finish_reason')
+        ))
+        return message.content
+    
+    async def _ainvoke(self, compiled, idea, model, timeout):
+        """Async counterpart of _invoke."""
+        budget_key = f"{model}:{compiled.key}"
+        try:
+            message = await compiled.ainvoke(idea, self.token_budget.limit(budget_key), timeout)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.rate_limiter.drain(model)
+            raise
+        self.token_budget.record(budget_key, *completion_usage(
+            message.content, message.usage_metadata, message.response_metadata.get('finish_reason')
+        ))
+        return message.content
+    
+    def _generate(self, compiled, idea, lane, model):
+        """
+        Run a template on one model through the resilience layer.
+        
+        Section-parallel templates make one call per section group, all at
+        once, and join the answers in section order, so they parse into the
+        same sections a single completion would.
+        
+        Args:
+            compiled (CompiledTemplate): The template compiled for the model
+            idea (str): The idea to analyze
+            lane (str): Rate limiter priority lane
+            model (str): The model to call
+        
+        Returns:
+            str: The raw LLM response
+        """
+        caller = self.callers[model]
+        deadline = caller.deadline_for(compiled.name)
+        if not compiled.parts:
+            return self._call(caller, compiled, idea, lane, model, deadline)
+        
+        futures = [
+            self.section_executor.submit(self._call, caller, part, idea, lane, model, deadline)
+            for part in compiled.parts
+        ]
+        try:
+            return '\n\n'.join(future.result() for future in futures)
+        finally:
+            # Groups not yet started when another one failed are not needed
+            for future in futures:
+                future.cancel()
+    
+    def _quota_wait(self, lane, deadline):
+        """
+        Get the longest a call may wait for quota, or None for the lane's own limit.
+        
+        Interactive callers are waiting on the answer, so their quota wait
+        comes out of the deadline. Batch calls wait up to their lane's
+        limit and then get the whole deadline for the call.
+        """
+        return deadline if lane == INTERACTIVE else None
+    
+    def _call(self, caller, compiled, idea, lane, model, deadline):
+        """
+        Make one deadline-bound call, once it fits under the provider quota.
+        
+        Quota is waited for before the resilience layer starts: running out
+        of it raises RateLimitExceeded (429) and is not a provider failure,
+        so it never counts against the circuit breaker.
+        """
+        tokens = self.rate_limiter.estimate(compiled.template, idea, remember=compiled.parent is None)
+        waited = self.rate_limiter.acquire(tokens, lane, model, self._quota_wait(lane, deadline))
+        if lane == INTERACTIVE:
+            deadline -= waited
+        return caller.call(partial(self._invoke, compiled, idea, model), compiled.key, deadline)
+    
+    async def _agenerate(self, compiled, idea, lane, model):
+        """Async counterpart of _generate."""
+        caller = self.callers[model]
+        deadline = caller.deadline_for(compiled.name)
+        if not compiled.parts:
+            return await self._acall(caller, compiled, idea, lane, model, deadline)
+        
+        tasks = [
+            asyncio.ensure_future(self._acall(caller, part, idea, lane, model, deadline))
+            for part in compiled.parts
+        ]
+        try:
+            return '\n\n'.join(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _acall(self, caller, compiled, idea, lane, model, deadline):
+        """Async counterpart of _call."""
+        tokens = self.rate_limiter.estimate(compiled.template, idea, remember=compiled.parent is None)
+        waited = await self.rate_limiter.aacquire(tokens, lane, model, self._quota_wait(lane, deadline))
+        if lane == INTERACTIVE:
+            deadline -= waited
+        return await caller.acall(partial(self._ainvoke, compiled, idea, model), compiled.key, deadline)
+    
+    def _complete_sections(self, compiled, idea, raw_analysis, structured_data, lane, model):
+        """
+        Re-ask for the sections an analysis is missing and splice them in.
+        
+        Only the missing sections are asked for, in one follow-up call. When
+        every section is missing the answer is not in the template's format
+        and is returned as it is, as it is when the follow-up fails.
+        
+        Args:
+            compiled (CompiledTemplate): The template compiled for the model
+            idea (str): The idea to analyze
+            raw_analysis (str): The raw LLM response
+            structured_data (dict): The parsed sections
+            lane (str): Rate limiter priority lane
+            model (str): The model that answered
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, filled) where filled are
+            the titles of the sections that were added
+        """
+        missing = self._missing_sections(compiled, structured_data)
+        if not missing:
+            return raw_analysis, structured_data, []
+        
+        followup = self.prompts[model].followup(compiled, compiled.schema.followup_template(missing))
+        caller = self.callers[model]
+        try:
+            answer = self._call(caller, followup, idea, lane, model, caller.deadline_for(compiled.name))
+        except Exception as e:
+            logger.warning(f"Could not re-ask for the missing sections: {str(e)}")
+            return raw_analysis, structured_data, []
+        return self._splice_sections(compiled, raw_analysis, structured_data, answer)
+    
+    async def _acomplete_sections(self, compiled, idea, raw_analysis, structured_data, lane, model):
+        """Async counterpart of _complete_sections."""
+        missing = self._missing_sections(compiled, structured_data)
+        if not missing:
+            return raw_analysis, structured_data, []
+        
+        followup = self.prompts[model].followup(compiled, compiled.schema.followup_template(missing))
+        caller = self.callers[model]
+        try:
+            answer = await self._acall(caller, followup, idea, lane, model, caller.deadline_for(compiled.name))
+        except Exception as e:
+            logger.warning(f"Could not re-ask for the missing sections: {str(e)}")
+            return raw_analysis, structured_data, []
+        return await asyncio.to_thread(self._splice_sections, compiled, raw_analysis, structured_data, answer)
+    
+    def _missing_sections(self, compiled, structured_data):
+        """Get the positions of the sections worth re-asking for, if any."""
+        if not self.section_reask or not isinstance(structured_data, dict):
+            return []
+        missing = compiled.schema.missing(structured_data)
+        if len(missing) == len(compiled.schema.titles):
+            return []
+        if missing:
+            titles = ', '.join(compiled.schema.titles[index] for index in missing)
+            logger.warning(f"Analysis is missing {len(missing)} section(s), re-asking for: {titles}")
+        return missing
+    
+    def _splice_sections(self, compiled, raw_analysis, structured_data, answer):
+        """Parse a follow-up answer and add its sections to the analysis."""
+        _, answers = self.parse_response(answer)
+        if not isinstance(answers, dict):
+            return raw_analysis, structured_data, []
+        structured_data, filled = compiled.schema.splice(structured_data, answers)
+        logger.info(f"Re-asked sections filled in: {', '.join(filled) or 'none'}")
+        return raw_analysis.rstrip('\n') + '\n\n' + answer, structured_data, filled
+    
+    def _run_analysis(self, idea, template, models, cache_key, lane=INTERACTIVE):
+        """
+        Run the LLM for a cache miss, coordinating with other workers.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            models (list): Models to try, in order
+            cache_key (str): Cache key of the analysis with the first model
+            lane (str): Rate limiter priority lane
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model)
+        """
+        leased = False
+        if self.cache_enabled:
+            leased = self.cache.acquire_lease(cache_key, self.lease_timeout)
+            if not leased:
+                # Another worker is already running this analysis
+                logger.info("Waiting for another worker's in-flight analysis")
+                cached = self.cache.wait_for(cache_key, self.lease_timeout)
+                if cached is not None:
+                    self.single_flight.record_remote()
+                    return cached[0], cached[1], self._entry_model(cached, models[0])
+        
+        try:
+            for attempt, model in enumerate(models):
+                compiled = self.prompts[model].get(template)
+                start_time = time.time()
+                try:
+                    # Run the prebuilt pipeline, under the provider quota and
+                    # the template's deadline
+                    logger.info(f"Requesting LLM analysis from {model}...")
+                    raw_analysis = self._generate(compiled, idea, lane, model)
+                except LLMError as e:
+                    if attempt + 1 < len(models):
+                        logger.warning(f"{model} failed ({str(e)}), falling back to {models[attempt + 1]}")
+                        continue
+                    raise
+                self.router.record(model, time.time() - start_time)
+                
+                # Parse the response
+                logger.info("Parsing LLM response...")
+                raw_analysis, structured_data = self.parse_response(raw_analysis)
+                raw_analysis, structured_data, _ = self._complete_sections(
+                    compiled, idea, raw_analysis, structured_data, lane, model
+                )
+                
+                # Update cache
+                if self.cache_enabled:
+                    self._store(cache_key, idea, compiled, model, raw_analysis, structured_data)
+                
+                return raw_analysis, structured_data, model
+        
+        except Exception as e:
+            logger.error(f"Error in process_idea: {str(e)}")
+            raise
+        finally:
+            if leased:
+                self.cache.release_lease(cache_key)
+    
+    def _open_stream(self, idea, compiled, models):
+        """
+        Pick the first model that can take a streamed call right now.
+        
+        Args:
+            idea (str): The idea to analyze
+            compiled (CompiledTemplate): The compiled template
+            models (list): Models to try, in order
+        
+        Returns:
+            str: The model to stream from
+        
+        Raises:
+            LLMError: The last model's error if none can take the call
+        """
+        tokens = self.rate_limiter.estimate(compiled.template, idea)
+        for attempt, model in enumerate(models):
+            caller = self.callers[model]
+            try:
+                caller.guard_stream()
+                try:
+                    self.rate_limiter.acquire(tokens, INTERACTIVE, model)
+                except LLMError as e:
+                    caller.stream_failed(e)
+                    raise
+                return model
+            except LLMError as e:
+                if attempt + 1 == len(models):
+                    raise
+                logger.warning(f"{model} unavailable ({str(e)}), falling back to {models[attempt + 1]}")
+    
+    async def _aopen_stream(self, idea, compiled, models):
+        """Async counterpart of _open_stream."""
+        tokens = self.rate_limiter.estimate(compiled.template, idea)
+        for attempt, model in enumerate(models):
+            caller = self.callers[model]
+            try:
+                caller.guard_stream()
+                try:
+                    await self.rate_limiter.aacquire(tokens, INTERACTIVE, model)
+                except LLMError as e:
+                    caller.stream_failed(e)
+                    raise
+                return model
+            except LLMError as e:
+                if attempt + 1 == len(models):
+                    raise
+                logger.warning(f"{model} unavailable ({str(e)}), falling back to {models[attempt + 1]}")
+    
+    def stream_idea(self, idea, template, model=None):
+        """
+        Process an idea, yielding each section as soon as it is complete.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model to use instead of the template's default
+        
+        Yields:
+            tuple: ("section", section_name, section_content) for each
+            finished section, then ("done", raw_analysis, structured_data, model)
+        """
+        # Cache hits are replayed section by section
+        compiled, models, cache_key = self.route(idea, template, model)
+        if self.cache_enabled:
+            cached = self._lookup(cache_key, models[0])
+            if cached is not None:
+                logger.info("Using cached analysis")
+                yield from self._replay(*cached)
+                return
+        
+        # Section-parallel templates finish all their groups in about the
+        # time of one, so their sections are sent when the analysis is done
+        if compiled.parts:
+            yield from self._replay(*self.process_idea(idea, template, model=model))
+            return
+        
+        # Streams are not retried or hedged once content is flowing, but fall
+        # back to the next model when one fails before its first chunk, or to
+        # a stale analysis when no model can take the call
+        while True:
+            try:
+                model = self._open_stream(idea, compiled, models)
+            except LLMError as e:
+                stale = self._get_stale(idea, compiled, models, e)
+                if stale is None:
+                    raise
+                yield from self._replay(*stale)
+                return
             
-            return raw_analysis, structured_data
+            fallbacks = models[models.index(model) + 1:]
+            compiled = self.prompts[model].get(template)
+            caller = self.callers[model]
+            chunks = []
+            parser = SectionParser()
+            start_time = time.time()
+            deadline = caller.deadline_for(compiled.name)
+            budget_key = f"{model}:{compiled.key}"
+            usage = finish_reason = None
             
+            try:
+                logger.info(f"Streaming LLM analysis from {model}...")
+                runnable = compiled.bind(self.token_budget.limit(budget_key))
+                for chunk in runnable.stream({"idea": idea}):
+                    if time.time() - start_time > deadline:
+                        raise DeadlineExceeded(f"The LLM did not finish within {deadline:.0f} seconds")
+                    # Usage and finish reason arrive on the last chunks
+                    usage = chunk.usage_metadata or usage
+                    finish_reason = chunk.response_metadata.get('finish_reason') or finish_reason
+                    text = chunk.content
+                    if not text:
+                        continue
+                    chunks.append(text)
+                    for section_name, section_content in parser.feed(text):
+                        yield ("section", section_name, section_content)
+                
+                raw_analysis = ''.join(chunks)
+                try:
+                    structured_data = json.loads(raw_analysis)
+                except json.JSONDecodeError:
+                    for section_name, section_content in parser.close():
+                        yield ("section", section_name, section_content)
+                    structured_data = parser.sections
+            except Exception as e:
+                logger.error(f"Error in stream_idea: {str(e)}")
+                caller.stream_failed(e)
+                if is_rate_limit_error(e):
+                    self.rate_limiter.drain(model)
+                if not chunks and fallbacks and is_retryable(e):
+                    logger.warning(f"Falling back to {fallbacks[0]}")
+                    models = fallbacks
+                    continue
+                raise
+            break
+        caller.stream_succeeded(compiled.key, time.time() - start_time)
+        self.token_budget.record(budget_key, *completion_usage(raw_analysis, usage, finish_reason))
+        self.router.record(model, time.time() - start_time)
+        
+        raw_analysis, structured_data, filled = self._complete_sections(
+            compiled, idea, raw_analysis, structured_data, INTERACTIVE, model
+        )
+        for section_name in filled:
+            yield ("section", section_name, structured_data[section_name])
+        
+        if self.cache_enabled:
+            self._store(cache_key, idea, compiled, model, raw_analysis, structured_data)
+        
+        yield ("done", raw_analysis, structured_data, model)
+    
+    async def aprocess_idea(self, idea, template, model=None, route=None):
+        """
+        Process an idea without blocking the event loop.
+        
+        The LLM pipeline is awaited with ainvoke, and cache access and
+        response parsing run in worker threads.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model to use instead of the template's default
+            route (tuple): Result of route for this request, if already routed
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model)
+        """
+        compiled, models, cache_key = route or self.route(idea, template, model)
+        
+        # Check cache first
+        if self.cache_enabled:
+            cached = await asyncio.to_thread(self._lookup, cache_key, models[0])
+            if cached is not None:
+                logger.info("Using cached analysis")
+                return cached
+        
+        try:
+            result, _ = await self.async_single_flight.do(
+                cache_key, lambda: self._arun_analysis(idea, template, models, cache_key)
+            )
+        except LLMError as e:
+            result = await asyncio.to_thread(self._get_stale, idea, compiled, models, e)
+            if result is None:
+                raise
+        raw_analysis, structured_data, model = result
+        return raw_analysis, structured_data, model
+    
+    async def _arun_analysis(self, idea, template, models, cache_key):
+        """
+        Async counterpart of _run_analysis.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            models (list): Models to try, in order
+            cache_key (str): Cache key of the analysis with the first model
+        
+        Returns:
+            tuple: (raw_analysis, structured_data, model)
+        """
+        leased = False
+        if self.cache_enabled:
+            leased = await asyncio.to_thread(self.cache.acquire_lease, cache_key, self.lease_timeout)
+            if not leased:
+                # Another worker is already running this analysis
+                logger.info("Waiting for another worker's in-flight analysis")
+                cached = await asyncio.to_thread(self.cache.wait_for, cache_key, self.lease_timeout)
+                if cached is not None:
+                    self.single_flight.record_remote()
+                    return cached[0], cached[1], self._entry_model(cached, models[0])
+        
+        try:
+            for attempt, model in enumerate(models):
+                compiled = self.prompts[model].get(template)
+                start_time = time.time()
+                try:
+                    logger.info(f"Requesting LLM analysis from {model}...")
+                    raw_analysis = await self._agenerate(compiled, idea, INTERACTIVE, model)
+                except LLMError as e:
+                    if attempt + 1 < len(models):
+                        logger.warning(f"{model} failed ({str(e)}), falling back to {models[attempt + 1]}")
+                        continue
+                    raise
+                self.router.record(model, time.time() - start_time)
+                
+                logger.info("Parsing LLM response...")
+                raw_analysis, structured_data = await asyncio.to_thread(self.parse_response, raw_analysis)
+                raw_analysis, structured_data, _ = await self._acomplete_sections(
+                    compiled, idea, raw_analysis, structured_data, INTERACTIVE, model
+                )
+                
+                if self.cache_enabled:
+                    await asyncio.to_thread(
+                        self._store, cache_key, idea, compiled, model, raw_analysis, structured_data
+                    )
+                
+                return raw_analysis, structured_data, model
+        
         except Exception as e:
-            logger.error(f"Error in process_idea: {str(e)}")
+            logger.error(f"Error in aprocess_idea: {str(e)}")
             raise
+        finally:
+            if leased:
+                await asyncio.to_thread(self.cache.release_lease, cache_key)
+    
+    async def astream_idea(self, idea, template, model=None):
+        """
+        Async counterpart of stream_idea, streaming through the pipeline's astream.
+        
+        Args:
+            idea (str): The idea to analyze
+            template (str): The template to use
+            model (str): Tier or model to use instead of the template's default
+        
+        Yields:
+            tuple: ("section", section_name, section_content) for each
+            finished section, then ("done", raw_analysis, structured_data, model)
+        """
+        # Cache hits are replayed section by section
+        compiled, models, cache_key = self.route(idea, template, model)
+        if self.cache_enabled:
+            cached = await asyncio.to_thread(self._lookup, cache_key, models[0])
+            if cached is not None:
+                logger.info("Using cached analysis")
+                for event in self._replay(*cached):
+                    yield event
+                return
+        
+        if compiled.parts:
+            for event in self._replay(*await self.aprocess_idea(idea, template, model=model)):
+                yield event
+            return
+        
+        # Streams are not retried or hedged once content is flowing, but fall
+        # back to the next model when one fails before its first chunk, or to
+        # a stale analysis when no model can take the call
+        while True:
+            try:
+                model = await self._aopen_stream(idea, compiled, models)
+            except LLMError as e:
+                stale = await asyncio.to_thread(self._get_stale, idea, compiled, models, e)
+                if stale is None:
+                    raise
+                for event in self._replay(*stale):
+                    yield event
+                return
+            
+            fallbacks = models[models.index(model) + 1:]
+            compiled = self.prompts[model].get(template)
+            caller = self.callers[model]
+            chunks = []
+            parser = SectionParser()
+            start_time = time.time()
+            deadline = caller.deadline_for(compiled.name)
+            budget_key = f"{model}:{compiled.key}"
+            usage = finish_reason = None
+            
+            try:
+                logger.info(f"Streaming LLM analysis from {model}...")
+                runnable = compiled.bind(self.token_budget.limit(budget_key))
+                async for chunk in runnable.astream({"idea": idea}):
+                    if time.time() - start_time > deadline:
+                        raise DeadlineExceeded(f"The LLM did not finish within {deadline:.0f} seconds")
+                    # Usage and finish reason arrive on the last chunks
+                    usage = chunk.usage_metadata or usage
+                    finish_reason = chunk.response_metadata.get('finish_reason') or finish_reason
+                    text = chunk.content
+                    if not text:
+                        continue
+                    chunks.append(text)
+                    # Feeding is linear in the chunk size, cheap enough to stay on the loop
+                    for section_name, section_content in parser.feed(text):
+                        yield ("section", section_name, section_content)
+                
+                raw_analysis = ''.join(chunks)
+                try:
+                    structured_data = json.loads(raw_analysis)
+                except json.JSONDecodeError:
+                    for section_name, section_content in parser.close():
+                        yield ("section", section_name, section_content)
+                    structured_data = parser.sections
+            except Exception as e:
+                logger.error(f"Error in astream_idea: {str(e)}")
+                caller.stream_failed(e)
+                if is_rate_limit_error(e):
+                    self.rate_limiter.drain(model)
+                if not chunks and fallbacks and is_retryable(e):
+                    logger.warning(f"Falling back to {fallbacks[0]}")
+                    models = fallbacks
+                    continue
+                raise
+            break
+        caller.stream_succeeded(compiled.key, time.time() - start_time)
+        self.token_budget.record(budget_key, *completion_usage(raw_analysis, usage, finish_reason))
+        self.router.record(model, time.time() - start_time)
+        
+        raw_analysis, structured_data, filled = await self._acomplete_sections(
+            compiled, idea, raw_analysis, structured_data, INTERACTIVE, model
+        )
+        for section_name in filled:
+            yield ("section", section_name, structured_data[section_name])
+        
+        if self.cache_enabled:
+            await asyncio.to_thread(
+                self._store, cache_key, idea, compiled, model, raw_analysis, structured_data
+            )
+        
+        yield ("done", raw_analysis, structured_data, model)
+    
+    def cache_stats(self):
+        """
+        Get statistics for the response cache.
+        
+        Returns:
+            dict: Cache counters and usage
+        """
+        stats = self.cache.stats()
+        stats["enabled"] = self.cache_enabled
+        stats["singleFlight"] = self.single_flight.stats()
+        stats["asyncSingleFlight"] = self.async_single_flight.stats()
+        return stats
+    
+    def rate_limit_stats(self):
+        """
+        Get statistics for the provider rate limiter.
+        
+        Returns:
+            dict: Quotas and per-lane counters
+        """
+        return self.rate_limiter.stats()
+    
+    def resilience_stats(self):
+        """
+        Get deadline, retry, hedging and circuit breaker counters.
+        
+        Returns:
+            dict: Resilience counters per model
+        """
+        return {"models": {model: caller.stats() for model, caller in self.callers.items()}}
+    
+    def model_stats(self):
+        """
+        Get model routing settings and per-model latency.
+        
+        Returns:
+            dict: Tiers, SLO, p50/p95 and circuit state per model, and
+            the learned completion limits
+        """
+        stats = self.router.stats()
+        for model, model_stats in stats["models"].items():
+            model_stats["circuit"] = self.callers[model].breaker.state
+        stats["tokenBudget"] = self.token_budget.stats()
+        return stats
     
     def parse_response(self, raw_content):
         """
@@ -104,7 +984,7 @@ class LLMProcessor:
         
         Args:
             raw_content (str): The raw LLM response
-            
+        
         Returns:
             tuple: (cleaned_content, structured_data)
         """
@@ -125,91 +1005,8 @@ class LLMProcessor:
         
         Args:
             content (str): The content to parse
-            
+        
         Returns:
             dict: Extracted sections
         """
-        # Handle emoji section headers
-        emoji_pattern = r'([\u2600-\u27BF\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U0001F800-\U0001F8FF\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]).*?\*\*(.*?)\*\*'
-        section_pattern = r'(\d+)\.\s+\*\*(.*?)\*\*'
-        
-        sections = {}
-        current_section = None
-        current_content = []
-        
-        # Process line by line
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check for emoji section headers
-            emoji_match = re.search(emoji_pattern, line)
-            if emoji_match:
-                emoji, section_name = emoji_match.groups()
-                if current_section and current_content:
-                    sections[current_section] = self._process_section_content('\n'.join(current_content))
-                    current_content = []
-                
-                current_section = section_name.strip()
-                sections[current_section] = {"emoji": emoji}
-                continue
-                
-            # Check for numbered section headers
-            section_match = re.search(section_pattern, line)
-            if section_match:
-                if current_section and current_content:
-                    if isinstance(sections[current_section], dict):
-                        sections[current_section]["content"] = self._process_section_content('\n'.join(current_content))
-                    else:
-                        sections[current_section] = self._process_section_content('\n'.join(current_content))
-                    current_content = []
-                
-                current_section = section_match.group(2).strip()
-                sections[current_section] = {}
-                continue
-            
-            # If not a header, add content to current section
-            if current_section:
-                current_content.append(line)
-        
-        # Don't forget the last section
-        if current_section and current_content:
-            if isinstance(sections[current_section], dict):
-                sections[current_section]["content"] = self._process_section_content('\n'.join(current_content))
-            else:
-                sections[current_section] = self._process_section_content('\n'.join(current_content))
-        
-        return sections
-    
-    def _process_section_content(self, content):
-        """
-        Process the content of a section to extract structured data.
-        
-        Args:
-            content (str): The content of a section
-            
-        Returns:
-            str or list or dict: Processed content
-        """
-        # Check if content is a list
-        if re.search(r'^\s*[-*•]\s', content, re.MULTILINE):
-            items = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if re.match(r'^\s*[-*•]\s', line):
-                    items.append(line.split(maxsplit=1)[1] if len(line.split(maxsplit=1)) > 1 else "")
-            return items
-        
-        # Check if content has key-value pairs
-        if ': ' in content and '\n' in content:
-            pairs = {}
-            for line in content.split('\n'):
-                if ': ' in line:
-                    key, value = line.split(': ', 1)
-                    pairs[key.strip()] = value.strip()
-            if pairs:
-                return pairs
-        
-        # Otherwise return as plain text
-        return content.strip()
+        return SectionParser().parse(content)
@@ -0,0 +1,105 @@
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# Simple throughput and tail-latency test for the backend.
+#
+# Start the backend against the fake provider, then run for example:
+#
+#     LLM_PROVIDER=fake CACHE_BACKEND=memory uvicorn asgi:app --port 5000
+#     python loadtest.py --requests 500 --concurrency 100 --unique 0.8
+
+def percentile(values, pct):
+    """
+    Get a percentile of a list of numbers (nearest-rank).
+
+    Args:
+        values (list): The numbers
+        pct (float): Percentile in [0, 100]
+
+    Returns:
+        float: The percentile, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def run_request(session, base_url, endpoint, idea, template):
+    """
+    Issue one analysis request.
+
+    Returns:
+        tuple: (ok, total_seconds, first_content_seconds)
+    """
+    start = time.time()
+    payload = {"idea": idea, "template": template, "formats": ["mind_map", "cards", "timeline"]}
+
+    if endpoint == "stream":
+        first = None
+        with session.post(f"{base_url}/api/analyze/stream", json=payload, stream=True, timeout=300) as response:
+            ok = response.status_code == 200
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: section") and first is None:
+                    first = time.time() - start
+                elif line.startswith("event: error"):
+                    ok = False
+        total = time.time() - start
+        return ok, total, first if first is not None else total
+
+    response = session.post(f"{base_url}/api/analyze", json=payload, timeout=300)
+    total = time.time() - start
+    return response.status_code == 200, total, total
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analysis backend")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--endpoint", choices=["analyze", "stream"], default="analyze")
+    parser.add_argument("--template", default="business_idea")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--unique", type=float, default=1.0, help="fraction of requests with a unique idea")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool_size = max(1, int(args.requests * args.unique))
+    ideas = [f"Load test idea #{rng.randrange(pool_size)}" for _ in range(args.requests)]
+
+    local = threading.local()
+
+    def worker(idea):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        try:
+            return run_request(local.session, args.url, args.endpoint, idea, args.template)
+        except requests.RequestException:
+            return False, 0.0, 0.0
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(worker, ideas))
+    elapsed = time.time() - start
+
+    totals = [total for ok, total, _ in results if ok]
+    firsts = [first for ok, _, first in results if ok]
+    errors = sum(1 for ok, _, _ in results if not ok)
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "elapsedSeconds": round(elapsed, 2),
+        "throughputRps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency": {f"p{p}": round(percentile(totals, p), 3) for p in (50, 90, 95, 99)},
+        "firstContent": {f"p{p}": round(percentile(firsts, p), 3) for p in (50, 95)}
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import math
+import logging
+from xml.sax.saxutils import escape
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Distance between rings, and the least arc length between two leaves
+RING_SPACING = 180
+LEAF_SPACING = 36
+
+# Room left around the outer ring for leaf labels
+LABEL_MARGIN = 220
+
+# Node colors by depth, as the Streamlit mind map draws them
+LEVEL_COLORS = ["#4F46E5", "#10B981", "#F59E0B", "#EC4899", "#6366F1"]
+
+# Longest label drawn in full in the SVG
+SVG_LABEL_LENGTH = 40
+
+def node_id(path):
+    """
+    Get the graph ID of a mind map node.
+
+    The Streamlit mind map names nodes the same way when it has no layout
+    to draw from.
+
+    Args:
+        path (str): Path of the node (see viz_utils.find_mind_map_node)
+
+    Returns:
+        str: "node" for the root, "node_2_0" for path "2/0"
+    """
+    return "_".join(["node"] + [part for part in path.split("/") if part])
+
+def layout_mind_map(tree, path=""):
+    """
+    Compute a radial tree layout for a mind map.
+
+    The root sits in the center and each level on a ring around it. Every
+    subtree gets a slice of its parent's angle in proportion to its number
+    of leaves, so subtrees never cross. The outer ring grows with the number
+    of leaves to keep them apart. The layout depends only on the tree, so
+    it can be computed once and cached.
+
+    Args:
+        tree (dict): Mind map with "name" and "children" (see format_for_mindmap)
+        path (str): Path of the tree's root, when laying out a subtree
+
+    Returns:
+        dict: "width" and "height" of the drawing, and "nodes" in depth-first
+        order, each with "id" (unique across subtrees), "path", "label",
+        "level", "parent" (None for the root) and "x"/"y" coordinates, plus
+        "childCount" for nodes whose children were left out
+    """
+    nodes = []
+    leaves = []
+    children = []
+
+    # Number the nodes depth-first and count leaves
+    stack = [(tree, None, 0, path)]
+    while stack:
+        node, parent, level, node_path = stack.pop()
+        index = len(nodes)
+        entry = {
+            "id": node_id(node_path),
+            "path": node_path,
+            "label": str(node.get("name", "")),
+            "level": level,
+            "parent": nodes[parent]["id"] if parent is not None else None
+        }
+        if "childCount" in node:
+            entry["childCount"] = node["childCount"]
+        nodes.append(entry)
+        leaves.append(0)
+        children.append([])
+        if parent is not None:
+            children[parent].append(index)
+        node_children = node.get("children") or []
+        for position in range(len(node_children) - 1, -1, -1):
+            child_path = f"{node_path}/{position}" if node_path else str(position)
+            stack.append((node_children[position], index, level + 1, child_path))
+    for index in range(len(nodes) - 1, -1, -1):
+        if not children[index]:
+            leaves[index] = 1
+        else:
+            leaves[index] = sum(leaves[child] for child in children[index])
+
+    depth = max(node["level"] for node in nodes)
+    ring = max(RING_SPACING, leaves[0] * LEAF_SPACING / (2 * math.pi) / max(depth, 1))
+    size = 2 * (depth * ring + LABEL_MARGIN)
+    center = size / 2
+
+    # Split each node's angle among its children by leaf count
+    spans = {0: (-math.pi / 2, 3 * math.pi / 2)}
+    for index in range(len(nodes)):
+        start, end = spans[index]
+        angle = (start + end) / 2
+        radius = nodes[index]["level"] * ring
+        nodes[index]["x"] = round(center + radius * math.cos(angle), 1)
+        nodes[index]["y"] = round(center + radius * math.sin(angle), 1)
+        width = end - start
+        for child in children[index]:
+            share = width * leaves[child] / leaves[index]
+            spans[child] = (start, start + share)
+            start += share
+
+    return {"width": round(size), "height": round(size), "nodes": nodes}
+
+def render_mind_map_svg(layout):
+    """
+    Draw a laid out mind map as SVG.
+
+    Args:
+        layout (dict): Result of layout_mind_map
+
+    Returns:
+        str: The SVG document
+    """
+    positions = {node["id"]: node for node in layout["nodes"]}
+    center = layout["width"] / 2
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout["width"]}" height="{layout["height"]}" '
+        f'viewBox="0 0 {layout["width"]} {layout["height"]}" font-family="sans-serif">',
+        '<g stroke="#CBD5E1" stroke-width="1.5">'
+    ]
+    for node in layout["nodes"]:
+        parent = positions.get(node["parent"])
+        if parent is not None:
+            parts.append(f'<line x1="{parent["x"]}" y1="{parent["y"]}" x2="{node["x"]}" y2="{node["y"]}"/>')
+    parts.append('</g>')
+
+    for node in layout["nodes"]:
+        level = node["level"]
+        color = LEVEL_COLORS[min(level, len(LEVEL_COLORS) - 1)]
+        label = node["label"]
+        short = label if len(label) <= SVG_LABEL_LENGTH else label[:SVG_LABEL_LENGTH - 1] + "…"
+        radius = 30 if level == 0 else 24 if level == 1 else 6
+        parts.append(f'<g><title>{escape(label)}</title>')
+        parts.append(f'<circle cx="{node["x"]}" cy="{node["y"]}" r="{radius}" fill="{color}"/>')
+        if level < 2:
+            # Inner nodes are labeled below their circle
+            parts.append(
+                f'<text x="{node["x"]}" y="{node["y"] + radius + 14}" text-anchor="middle" '
+                f'font-size="{14 if level == 0 else 12}" font-weight="bold">{escape(short)}</text>'
+            )
+        else:
+            # Leaves are labeled outwards, away from the center
+            anchor = "start" if node["x"] >= center else "end"
+            offset = radius + 4 if anchor == "start" else -radius - 4
+            parts.append(
+                f'<text x="{round(node["x"] + offset, 1)}" y="{node["y"] + 4}" text-anchor="{anchor}" '
+                f'font-size="11">{escape(short)}</text>'
+            )
+        parts.append('</g>')
+    parts.append('</svg>')
+    return "".join(parts)
@@ -0,0 +1,229 @@
+import os
+import zlib
+import random
+import logging
+from templates import parse_template_sections
+from resilience import LatencyTracker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Model tiers that templates and requests can ask for instead of a model name
+QUALITY = "quality"
+FAST = "fast"
+TIERS = (QUALITY, FAST)
+
+class UnknownModelError(ValueError):
+    """Raised when a request asks for a model that is not configured."""
+
+class ModelRouter:
+    """
+    Pick the model for each analysis.
+
+    Every template goes to the quality tier unless MODEL_<TEMPLATE> names a
+    tier or model for it; a request may also ask for one. When a fast model
+    is configured, templates with few sections go to the fast tier instead. Each analysis gets an ordered
+    list of models to try, the chosen one first and then fallbacks. When the
+    choice was automatic and the chosen model's p95 latency is over the SLO,
+    a fallback that meets it is tried first; a small share of traffic still
+    goes to the slow model so its latency keeps being measured. Which
+    analyses make up that share is decided by their key, so requests for the
+    same analysis are routed alike. Analyses are cached under the preferred
+    model, before that reordering, so the cache does not split with latency.
+    """
+
+    def __init__(self, default_model, fast_model=None, fallback_model=None, slo=20.0,
+                 fast_max_sections=4, max_attempts=2, min_samples=5, probe_rate=0.05):
+        """
+        Initialize the router.
+
+        Args:
+            default_model (str): Model of the quality tier
+            fast_model (str): Model of the fast tier (defaults to default_model)
+            fallback_model (str): First model to fall back to (defaults to fast_model)
+            slo (float): Target p95 latency of an analysis, in seconds
+            fast_max_sections (int): Templates with at most this many sections use the
+                fast tier, when it has a model of its own
+            max_attempts (int): Number of models tried per analysis
+            min_samples (int): Latency samples needed before a model is judged
+            probe_rate (float): Share of traffic kept on a model that misses the SLO
+        """
+        self.default_model = default_model
+        self.fast_model = fast_model or default_model
+        self.fallback_model = fallback_model or self.fast_model
+        self.slo = slo
+        self.fast_max_sections = fast_max_sections
+        self.max_attempts = max(1, max_attempts)
+        self.min_samples = min_samples
+        self.probe_rate = probe_rate
+        self.latencies = LatencyTracker()
+        self._template_models = {}
+
+        self.models = []
+        for model in (self.default_model, self.fast_model, self.fallback_model):
+            if model not in self.models:
+                self.models.append(model)
+
+    def resolve(self, name):
+        """
+        Turn a tier or model name into a configured model.
+
+        Args:
+            name (str): "quality", "fast" or a configured model name
+
+        Returns:
+            str: The model name
+
+        Raises:
+            UnknownModelError: If the name is neither
+        """
+        if name == QUALITY:
+            return self.default_model
+        if name == FAST:
+            return self.fast_model
+        if name in self.models:
+            return name
+        raise UnknownModelError(f"Unknown model: {name} (expected one of {', '.join(TIERS + tuple(self.models))})")
+
+    def template_model(self, compiled):
+        """
+        Get the model a template is routed to by default.
+
+        Args:
+            compiled (CompiledTemplate): The compiled template
+
+        Returns:
+            str: The model name
+        """
+        model = self._template_models.get(compiled.template)
+        if model is None:
+            configured = os.getenv(f"MODEL_{compiled.name.upper()}") if compiled.name else None
+            if configured:
+                model = self.resolve(configured)
+            elif self.fast_model != self.default_model and \
+                    len(parse_template_sections(compiled.template)) <= self.fast_max_sections:
+                model = self.fast_model
+            else:
+                model = self.default_model
+            self._template_models[compiled.template] = model
+        return model
+
+    def preferred(self, compiled, requested=None):
+        """
+        Get the model an analysis is meant for, before latency is considered.
+
+        Args:
+            compiled (CompiledTemplate): The compiled template
+            requested (str): Tier or model asked for by the request, if any
+
+        Returns:
+            str: The model name
+
+        Raises:
+            UnknownModelError: If the requested model is not configured
+        """
+        return self.resolve(requested) if requested else self.template_model(compiled)
+
+    def meets_slo(self, model):
+        """
+        Check whether a model's recent p95 latency is within the SLO.
+
+        Args:
+            model (str): The model name
+
+        Returns:
+            bool: True, or None while there are too few samples to tell
+        """
+        p95 = self.latencies.percentile(model, 95, self.min_samples)
+        if p95 is None:
+            return None
+        return p95 <= self.slo
+
+    def route(self, compiled, requested=None, key=None):
+        """
+        Get the models to try for an analysis, in order.
+
+        Args:
+            compiled (CompiledTemplate): The compiled template
+            requested (str): Tier or model asked for by the request, if any
+            key (str): Identifies the analysis, so repeats are routed alike
+
+        Returns:
+            list: Model names, the preferred one first
+
+        Raises:
+            UnknownModelError: If the requested model is not configured
+        """
+        chosen = self.preferred(compiled, requested)
+        models = [chosen]
+        for model in (self.fallback_model, self.default_model, self.fast_model):
+            if model not in models:
+                models.append(model)
+        models = models[:self.max_attempts]
+
+        if not requested and self.meets_slo(chosen) is False and self._draw(key) >= self.probe_rate:
+            for model in models[1:]:
+                if self.meets_slo(model) is not False:
+                    logger.info(f"Routing to {model}: {chosen} is over the {self.slo:.1f}s latency SLO")
+                    models.remove(model)
+                    models.insert(0, model)
+                    break
+        return models
+
+    @staticmethod
+    def _draw(key):
+        # A number in [0, 1) fixed per key, or random without one
+        if key is None:
+            return random.random()
+        return zlib.crc32(key.encode('utf-8')) / 2 ** 32
+
+    def record(self, model, seconds):
+        """
+        Record the latency of a finished analysis.
+
+        Args:
+            model (str): The model that answered
+            seconds (float): Latency of the call
+        """
+        self.latencies.record(model, seconds)
+
+    def stats(self):
+        """
+        Get routing configuration and per-model latency.
+
+        Returns:
+            dict: Tiers, SLO and p50/p95 per model
+        """
+        latency = self.latencies.stats()
+        return {
+            "default": self.default_model,
+            "fast": self.fast_model,
+            "fallback": self.fallback_model,
+            "sloSeconds": self.slo,
+            "models": {
+                model: dict(latency.get(model, {"count": 0, "p50": 0.0, "p95": 0.0}), meetsSlo=self.meets_slo(model))
+                for model in self.models
+            }
+        }
+
+def create_model_router(default_model):
+    """
+    Create the model router configured in the environment.
+
+    Args:
+        default_model (str): Model of the quality tier (MODEL_NAME)
+
+    Returns:
+        ModelRouter: The router
+    """
+    return ModelRouter(
+        default_model,
+        fast_model=os.getenv('FAST_MODEL_NAME'),
+        fallback_model=os.getenv('FALLBACK_MODEL_NAME'),
+        slo=float(os.getenv('MODEL_LATENCY_SLO', 20)),
+        fast_max_sections=int(os.getenv('FAST_TEMPLATE_MAX_SECTIONS', 4)),
+        max_attempts=int(os.getenv('MODEL_MAX_ATTEMPTS', 2)),
+        min_samples=int(os.getenv('MODEL_MIN_SAMPLES', 5)),
+        probe_rate=float(os.getenv('MODEL_PROBE_RATE', 0.05))
+    )
@@ -0,0 +1,176 @@
+import threading
+import logging
+from langchain_core.prompts import PromptTemplate
+from section_schema import SectionSchema
+from templates import template_fingerprint, get_section_groups, split_template, with_end_marker, stop_sequences
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class CompiledTemplate:
+    """
+    A template with its prompt and runnable pipelines built once.
+
+    Templates configured for section-parallel generation also get one
+    compiled part per section group; their fingerprint covers the parts, so
+    analyses generated in groups are cached apart from single completions.
+
+    Latency, completion budget and hedging statistics are kept under key:
+    the fingerprint, or for a follow-up prompt one key per parent template,
+    however many different follow-ups it gets.
+    """
+
+    def __init__(self, template, llm, name=None, stop=None, parent=None):
+        """
+        Compile a template.
+
+        Args:
+            template (str): Template text with an {idea} placeholder
+            llm: Chat model the pipeline runs on
+            name (str): Registered template name, if any
+            stop (list): Stop sequences (defaults to the end marker)
+            parent (CompiledTemplate): Template this is a follow-up prompt of
+        """
+        self.name = name
+        self.template = template
+        split = split_template(template, get_section_groups(name))
+        self.parts = [
+            CompiledTemplate(part, llm, stop=stop_sequences(following))
+            for part, following in zip(split, split[1:] + [None])
+        ] if len(split) > 1 else []
+        self.fingerprint = template_fingerprint('\0'.join(split))
+        self.parent = parent
+        self.key = f"{parent.key}:followup" if parent is not None else self.fingerprint
+        self.stop = stop or stop_sequences()
+        self.schema = SectionSchema(template)
+        self.llm = llm
+        self.prompt = PromptTemplate(template=with_end_marker(template), input_variables=["idea"])
+        # Pipelines by completion limit; the token budget hands out few
+        # distinct limits, so this stays small
+        self._bound = {}
+
+    def _model(self, max_tokens):
+        bound = self._bound.get(max_tokens)
+        if bound is None:
+            model = self.llm.bind(stop=self.stop, max_tokens=max_tokens)
+            bound = self._bound.setdefault(max_tokens, (model, self.prompt | model))
+        return bound
+
+    def bind(self, max_tokens):
+        """
+        Get the prompt and model with a completion limit, built once per limit.
+
+        Args:
+            max_tokens (int): Completion limit
+
+        Returns:
+            Runnable: Runnable returning the model's AIMessage, with usage
+        """
+        return self._model(max_tokens)[1]
+
+    def invoke(self, idea, max_tokens, timeout=None):
+        """
+        Run the template once.
+
+        Args:
+            idea (str): The idea to analyze
+            max_tokens (int): Completion limit
+            timeout (float): Seconds the provider request may take, if limited
+
+        Returns:
+            AIMessage: The model's answer, with usage
+        """
+        model = self._model(max_tokens)[0]
+        prompt = self.prompt.invoke({"idea": idea})
+        if timeout is None:
+            return model.invoke(prompt)
+        # Passed through to the provider client as the request's own timeout
+        return model.invoke(prompt, timeout=timeout)
+
+    async def ainvoke(self, idea, max_tokens, timeout=None):
+        """Async counterpart of invoke."""
+        model = self._model(max_tokens)[0]
+        prompt = self.prompt.invoke({"idea": idea})
+        if timeout is None:
+            return await model.ainvoke(prompt)
+        return await model.ainvoke(prompt, timeout=timeout)
+
+class PromptRegistry:
+    """
+    Cache of compiled templates keyed by template text.
+
+    Templates are compiled at startup (warm) or when first seen, after which
+    the per-request path is a dictionary lookup: no prompt parsing, chain
+    construction or re-hashing of the template text.
+    """
+
+    def __init__(self, llm):
+        """
+        Initialize the registry.
+
+        Args:
+            llm: Chat model the compiled pipelines run on
+        """
+        self.llm = llm
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def compile(self, template, name=None):
+        """
+        Compile (or recompile) a template.
+
+        Args:
+            template (str): Template text
+            name (str): Registered template name, if any
+
+        Returns:
+            CompiledTemplate: The compiled template
+        """
+        compiled = CompiledTemplate(template, self.llm, name)
+        with self._lock:
+            self._compiled[template] = compiled
+        logger.info(f"Compiled template {name or compiled.fingerprint} ({compiled.fingerprint})")
+        return compiled
+
+    def get(self, template):
+        """
+        Get the compiled form of a template, compiling it on first use.
+
+        Args:
+            template (str): Template text
+
+        Returns:
+            CompiledTemplate: The compiled template
+        """
+        compiled = self._compiled.get(template)
+        if compiled is None:
+            compiled = self.compile(template)
+        return compiled
+
+    def followup(self, compiled, template):
+        """
+        Compile a follow-up prompt of a template, without keeping it.
+
+        Follow-ups vary with what an answer left out, so keeping each would
+        grow the registry without bound; they are rare enough to compile
+        every time.
+
+        Args:
+            compiled (CompiledTemplate): The template being followed up
+            template (str): Follow-up template text
+
+        Returns:
+            CompiledTemplate: The compiled follow-up
+        """
+        return CompiledTemplate(template, self.llm, parent=compiled)
+
+    def warm(self, templates):
+        """
+        Compile a set of named templates.
+
+        Args:
+            templates (dict): Template names mapped to template text
+        """
+        for name, template in templates.items():
+            self.compile(template, name)
@@ -0,0 +1,67 @@
+import os
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Supported LLM providers (selected with LLM_PROVIDER)
+PROVIDERS = ("groq", "fake")
+
+def create_llm(provider, api_key, model_name, temperature, max_tokens,
+               http_client=None, http_async_client=None, request_timeout=None, max_retries=2):
+    """
+    Create a LangChain chat model for the configured provider.
+
+    "groq" talks to the Groq API, or to any compatible server set in
+    GROQ_BASE_URL (such as the fake_llm HTTP server). "fake" uses the
+    in-process FakeChatModel, tuned by the FAKE_LLM_* settings.
+
+    Args:
+        provider (str): Provider name
+        api_key (str): API key for the provider
+        model_name (str): Model to use
+        temperature (float): Sampling temperature
+        max_tokens (int): Maximum completion tokens
+        http_client (httpx.Client): Pooled client for sync calls (groq only)
+        http_async_client (httpx.AsyncClient): Pooled client for async calls (groq only)
+        request_timeout (httpx.Timeout): Per-request timeout (groq only)
+        max_retries (int): Retries performed by the Groq SDK (groq only)
+
+    Returns:
+        BaseChatModel: The chat model
+    """
+    provider = (provider or "groq").lower()
+
+    if provider == "fake":
+        from fake_llm import FakeChatModel
+        return FakeChatModel(
+            model_name=model_name,
+            max_tokens=max_tokens,
+            ttft=float(os.getenv('FAKE_LLM_TTFT', 0.3)),
+            tokens_per_sec=float(os.getenv('FAKE_LLM_TOKENS_PER_SEC', 250)),
+            error_rate=float(os.getenv('FAKE_LLM_ERROR_RATE', 0.0)),
+            jitter=float(os.getenv('FAKE_LLM_JITTER', 0.1)),
+            seed=int(os.getenv('FAKE_LLM_SEED', 0))
+        )
+
+    if provider != "groq":
+        raise ValueError(f"Unknown LLM provider: {provider} (expected one of {', '.join(PROVIDERS)})")
+
+    from langchain_groq import ChatGroq
+    options = {}
+    base_url = os.getenv('GROQ_BASE_URL')
+    if base_url:
+        logger.info(f"Using Groq-compatible endpoint at {base_url}")
+        options["base_url"] = base_url
+    return ChatGroq(
+        api_key=api_key,
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        request_timeout=request_timeout,
+        max_retries=max_retries,
+        **options
+    )
@@ -0,0 +1,506 @@
+import os
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import logging
+from templates import parse_template_sections
+from resilience import LLMError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Priority lanes: interactive requests are always served before batch work
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# How often a waiting caller re-checks the buckets (seconds)
+_POLL_INTERVAL = 0.05
+
+class RateLimitExceeded(LLMError):
+    """Raised when a request cannot be scheduled within its wait budget."""
+
+    status_code = 429
+    error = "Rate limit reached"
+
+    def __init__(self, retry_after, lane=INTERACTIVE):
+        self.lane = lane
+        super().__init__(f"Rate limit reached, retry in {retry_after:.1f} seconds", retry_after)
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of tokens in a text (about 4 characters per token).
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: Estimated token count
+    """
+    return max(1, (len(text) + 3) // 4)
+
+def _take(levels, buckets, now):
+    """
+    Refill buckets and take from all of them, or from none.
+
+    Args:
+        levels (dict): Bucket name mapped to (level, updated_at)
+        buckets (list): (name, capacity, rate, amount, floor) tuples
+        now (float): Current time
+
+    Returns:
+        tuple: (new_levels, wait) where new_levels is None and wait is the
+        number of seconds until the request fits when it does not fit now
+    """
+    refilled = {}
+    wait = 0.0
+    for name, capacity, rate, amount, floor in buckets:
+        level, updated_at = levels.get(name, (capacity, now))
+        level = min(capacity, level + max(0.0, now - updated_at) * rate)
+        refilled[name] = level
+        # A request larger than the bucket can never fit; let it through
+        # when the bucket is full instead of blocking forever
+        needed = min(amount, capacity - floor) + floor
+        if level < needed:
+            wait = max(wait, (needed - level) / rate)
+
+    if wait > 0:
+        return None, wait
+    return {
+        name: (refilled[name] - amount, now) for name, capacity, rate, amount, floor in buckets
+    }, 0.0
+
+class MemoryBucketStore:
+    """Token bucket state shared by the threads of one process."""
+
+    def __init__(self):
+        """Initialize the store."""
+        self._lock = threading.Lock()
+        self._levels = {}
+
+    def take(self, buckets):
+        """
+        Atomically take from a set of buckets.
+
+        Args:
+            buckets (list): (name, capacity, rate, amount, floor) tuples
+
+        Returns:
+            float: 0.0 when granted, otherwise seconds until it would fit
+        """
+        with self._lock:
+            levels, wait = _take(self._levels, buckets, time.time())
+            if levels is not None:
+                self._levels.update(levels)
+            return wait
+
+    def drain(self, names):
+        """
+        Empty buckets, e.g. after the provider rejected a request.
+
+        Args:
+            names (list): Bucket names
+        """
+        now = time.time()
+        with self._lock:
+            for name in names:
+                self._levels[name] = (0.0, now)
+
+    def stats(self):
+        return {"backend": "memory"}
+
+class SQLiteBucketStore:
+    """
+    Token bucket state kept in a local SQLite file.
+
+    Every worker process on a host takes from the same buckets, so the
+    configured quota holds for the whole host rather than per process.
+    While the file cannot be used (locked too long, disk errors), buckets
+    are kept in process memory instead.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        # Used while the file fails
+        self._fallback = MemoryBucketStore()
+        self._lock = threading.Lock()
+        self._errors = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # One connection per thread and process, as in SQLiteCache
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, buckets):
+        """
+        Atomically take from a set of buckets.
+
+        Args:
+            buckets (list): (name, capacity, rate, amount, floor) tuples
+
+        Returns:
+            float: 0.0 when granted, otherwise seconds until it would fit
+        """
+        try:
+            return self._take(buckets)
+        except sqlite3.Error as e:
+            logger.error(f"Shared rate limit store failed, limiting per process: {str(e)}")
+            self._count_error()
+            return self._fallback.take(buckets)
+
+    def _take(self, buckets):
+        conn = self._connect()
+        names = [bucket[0] for bucket in buckets]
+        # BEGIN IMMEDIATE takes the write lock up front so the read-refill-
+        # write cycle is atomic across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT name, level, updated_at FROM buckets WHERE name IN ({','.join('?' * len(names))})",
+                names
+            ).fetchall()
+            levels, wait = _take({name: (level, updated_at) for name, level, updated_at in rows},
+                                 buckets, time.time())
+            if levels is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                    [(name, level, updated_at) for name, (level, updated_at) in levels.items()]
+                )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _count_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def drain(self, names):
+        """
+        Empty buckets, e.g. after the provider rejected a request.
+
+        Args:
+            names (list): Bucket names
+        """
+        now = time.time()
+        self._fallback.drain(names)
+        try:
+            self._connect().executemany(
+                "INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, 0, ?)",
+                [(name, now) for name in names]
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Shared rate limit store failed to drain buckets: {str(e)}")
+            self._count_error()
+
+    def stats(self):
+        with self._lock:
+            errors = self._errors
+        return {"backend": "sqlite", "path": self.path, "errors": errors}
+
+class RateLimiter:
+    """
+    Schedule LLM calls under the provider's requests- and tokens-per-minute quotas.
+
+    Each call takes one request and its estimated prompt + completion tokens
+    from two token buckets that refill continuously at RPM/60 and TPM/60 per
+    second. Callers that do not fit wait for the buckets to refill, with
+    interactive callers always going first: batch callers yield while an
+    interactive caller in the process is waiting, and may not dip into the
+    share of each bucket reserved for interactive traffic.
+
+    Groq applies its quotas per model, so calls for different models take
+    from separate buckets.
+    """
+
+    def __init__(self, rpm=0, tpm=0, store=None, headroom=0.9, batch_reserve=0.2,
+                 max_wait=30, batch_max_wait=300, tokens_per_section=200, max_completion_tokens=4096):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rpm (int): Requests per minute allowed by the provider (0 for no limit)
+            tpm (int): Tokens per minute allowed by the provider (0 for no limit)
+            store: MemoryBucketStore or SQLiteBucketStore holding the buckets
+            headroom (float): Fraction of the quota to use, to stay just under it
+            batch_reserve (float): Fraction of each bucket only interactive calls may use
+            max_wait (float): Longest an interactive call waits before it is rejected
+            batch_max_wait (float): Longest a batch call waits before it is rejected
+            tokens_per_section (int): Estimated completion tokens per template section
+            max_completion_tokens (int): Upper bound of the completion estimate
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.store = store or MemoryBucketStore()
+        self.headroom = headroom
+        self.batch_reserve = batch_reserve
+        self.max_wait = {INTERACTIVE: max_wait, BATCH: batch_max_wait}
+        self.tokens_per_section = tokens_per_section
+        self.max_completion_tokens = max_completion_tokens
+        self.enabled = rpm > 0 or tpm > 0
+
+        self._template_tokens = {}
+        self._lock = threading.Lock()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._granted = {lane: 0 for lane in LANES}
+        self._rejected = {lane: 0 for lane in LANES}
+        self._wait_seconds = {lane: 0.0 for lane in LANES}
+        self._drains = 0
+
+    def estimate(self, template, idea, remember=True):
+        """
+        Estimate the tokens one analysis will use.
+
+        The template's share (its prompt plus a completion budget per section
+        it asks for) is computed once per template.
+
+        Args:
+            template (str): Template text
+            idea (str): The idea to analyze
+            remember (bool): Keep the template's share for next time (off for
+                one-off prompts such as follow-ups)
+
+        Returns:
+            int: Estimated prompt + completion tokens
+        """
+        template_tokens = self._template_tokens.get(template)
+        if template_tokens is None:
+            sections = len(parse_template_sections(template)) or 1
+            completion = min(self.max_completion_tokens, sections * self.tokens_per_section)
+            template_tokens = estimate_tokens(template) + completion
+            if remember:
+                self._template_tokens[template] = template_tokens
+        return template_tokens + estimate_tokens(idea)
+
+    def _buckets(self, tokens, lane, model=None):
+        buckets = []
+        for name, quota, amount in (("requests", self.rpm, 1), ("tokens", self.tpm, tokens)):
+            if quota <= 0:
+                continue
+            if model:
+                name = f"{model}:{name}"
+            capacity = quota * self.headroom
+            floor = capacity * self.batch_reserve if lane == BATCH else 0.0
+            buckets.append((name, capacity, capacity / 60.0, amount, floor))
+        return buckets
+
+    def _try(self, tokens, lane, model):
+        # Batch work yields to any interactive caller waiting in this process
+        if lane == BATCH and self._waiting[INTERACTIVE]:
+            return _POLL_INTERVAL
+        return self.store.take(self._buckets(tokens, lane, model))
+
+    def _enter(self, lane):
+        with self._lock:
+            self._waiting[lane] += 1
+
+    def _leave(self, lane, waited, granted):
+        with self._lock:
+            self._waiting[lane] -= 1
+            self._wait_seconds[lane] += waited
+            if granted:
+                self._granted[lane] += 1
+            else:
+                self._rejected[lane] += 1
+
+    def _wait_limit(self, lane, max_wait):
+        if max_wait is None:
+            return self.max_wait[lane]
+        return min(self.max_wait[lane], max_wait)
+
+    def _check_deadline(self, wait, start, lane, limit):
+        remaining = start + limit - time.time()
+        if wait > remaining:
+            raise RateLimitExceeded(wait, lane)
+        return min(wait, _POLL_INTERVAL)
+
+    def acquire(self, tokens, lane=INTERACTIVE, model=None, max_wait=None):
+        """
+        Wait until a call fits under the quota, then reserve it.
+
+        Args:
+            tokens (int): Estimated tokens of the call
+            lane (str): INTERACTIVE or BATCH
+            model (str): Model the call is for
+            max_wait (float): Longest the caller can wait, if shorter than the lane allows
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the call would wait longer than the lane allows
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.time()
+        limit = self._wait_limit(lane, max_wait)
+        granted = False
+        self._enter(lane)
+        try:
+            while True:
+                wait = self._try(tokens, lane, model)
+                if wait == 0:
+                    granted = True
+                    return time.time() - start
+                time.sleep(self._check_deadline(wait, start, lane, limit))
+        finally:
+            self._leave(lane, time.time() - start, granted)
+
+    async def aacquire(self, tokens, lane=INTERACTIVE, model=None, max_wait=None):
+        """
+        Async counterpart of acquire; waits without blocking the event loop.
+
+        Args:
+            tokens (int): Estimated tokens of the call
+            lane (str): INTERACTIVE or BATCH
+            model (str): Model the call is for
+            max_wait (float): Longest the caller can wait, if shorter than the lane allows
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the call would wait longer than the lane allows
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.time()
+        limit = self._wait_limit(lane, max_wait)
+        granted = False
+        self._enter(lane)
+        try:
+            while True:
+                wait = await asyncio.to_thread(self._try, tokens, lane, model)
+                if wait == 0:
+                    granted = True
+                    return time.time() - start
+                await asyncio.sleep(self._check_deadline(wait, start, lane, limit))
+        finally:
+            self._leave(lane, time.time() - start, granted)
+
+    def drain(self, model=None):
+        """
+        Empty the buckets after the provider answered 429, pausing every worker.
+
+        Args:
+            model (str): Model whose quota was hit
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._drains += 1
+        self.store.drain([name for name, _, _, _, _ in self._buckets(0, INTERACTIVE, model)])
+
+    def stats(self):
+        """
+        Get scheduler statistics.
+
+        Returns:
+            dict: Quotas and per-lane counters
+        """
+        with self._lock:
+            lanes = {
+                lane: {
+                    "waiting": self._waiting[lane],
+                    "granted": self._granted[lane],
+                    "rejected": self._rejected[lane],
+                    "waitSeconds": round(self._wait_seconds[lane], 3)
+                }
+                for lane in LANES
+            }
+            drains = self._drains
+        stats = self.store.stats()
+        stats.update({
+            "enabled": self.enabled,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "headroom": self.headroom,
+            "batchReserve": self.batch_reserve,
+            "drains": drains,
+            "lanes": lanes
+        })
+        return stats
+
+def is_rate_limit_error(error):
+    """
+    Check whether an exception is a provider 429 response.
+
+    Args:
+        error (Exception): The exception
+
+    Returns:
+        bool: True for rate limit errors
+    """
+    return getattr(error, "status_code", None) == 429
+
+def create_rate_limiter(max_completion_tokens=4096):
+    """
+    Create the rate limiter configured in the environment.
+
+    GROQ_RPM and GROQ_TPM set the quotas (unset or 0 disables limiting).
+    RATE_LIMIT_BACKEND selects "sqlite" (shared by all workers on the host,
+    the default) or "memory" (per process).
+
+    Args:
+        max_completion_tokens (int): Upper bound of completion estimates
+
+    Returns:
+        RateLimiter: The rate limiter
+    """
+    rpm = int(os.getenv('GROQ_RPM', 0))
+    tpm = int(os.getenv('GROQ_TPM', 0))
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'sqlite').lower()
+
+    store = None
+    if (rpm > 0 or tpm > 0) and backend != 'memory':
+        if backend != 'sqlite':
+            logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using sqlite")
+        try:
+            store = SQLiteBucketStore(
+                os.getenv('RATE_LIMIT_DB_PATH', os.path.join(tempfile.gettempdir(), 'brainstormer_ratelimit.sqlite3'))
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Failed to open shared rate limit store, limiting per process: {str(e)}")
+
+    limiter = RateLimiter(
+        rpm=rpm,
+        tpm=tpm,
+        store=store or MemoryBucketStore(),
+        headroom=float(os.getenv('RATE_LIMIT_HEADROOM', 0.9)),
+        batch_reserve=float(os.getenv('RATE_LIMIT_BATCH_RESERVE', 0.2)),
+        max_wait=float(os.getenv('RATE_LIMIT_MAX_WAIT', 30)),
+        batch_max_wait=float(os.getenv('RATE_LIMIT_BATCH_MAX_WAIT', 300)),
+        tokens_per_section=int(os.getenv('RATE_LIMIT_TOKENS_PER_SECTION', 200)),
+        max_completion_tokens=max_completion_tokens
+    )
+    if limiter.enabled:
+        logger.info(f"Rate limiting LLM calls to {rpm or 'unlimited'} RPM / {tpm or 'unlimited'} TPM")
+    return limiter
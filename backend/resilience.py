@@ -0,0 +1,632 @@
+import os
+import math
+import time
+import random
+import asyncio
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LLMError(Exception):
+    """An analysis failure with the HTTP status it should be reported as."""
+
+    status_code = 500
+    error = "Failed to analyze idea"
+
+    def __init__(self, message, retry_after=None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+    def to_dict(self):
+        """
+        Get the JSON error body for the failure.
+
+        Returns:
+            dict: error and message fields
+        """
+        return {"error": self.error, "message": str(self)}
+
+    def headers(self):
+        """
+        Get the HTTP headers for the failure.
+
+        Returns:
+            dict: Retry-After when the client should retry later
+        """
+        if self.retry_after is None:
+            return {}
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+class DeadlineExceeded(LLMError):
+    """The LLM did not answer within the template's deadline."""
+
+    status_code = 504
+    error = "Analysis timed out"
+
+class CircuitOpenError(LLMError):
+    """The provider is failing and calls are being rejected without trying."""
+
+    status_code = 503
+    error = "LLM provider unavailable"
+
+class ProviderError(LLMError):
+    """The provider kept failing after all retries."""
+
+    def __init__(self, message, status_code=503, retry_after=None):
+        super().__init__(message, retry_after)
+        self.status_code = status_code
+        self.error = "LLM provider rate limit reached" if status_code == 429 else "LLM provider unavailable"
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_retryable(error):
+    """
+    Check whether a provider call failed in a way worth retrying.
+
+    Args:
+        error (Exception): The exception
+
+    Returns:
+        bool: True for timeouts, connection errors, 408/409/429 and 5xx responses
+    """
+    if isinstance(error, LLMError):
+        # Raised by this service (e.g. the rate limiter), not by the provider
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    # Connection and timeout errors from the Groq SDK, httpx or the socket layer
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError"
+    )
+
+def retry_after(error):
+    """
+    Read the server's requested retry delay from a provider error.
+
+    Args:
+        error (Exception): The exception
+
+    Returns:
+        float: Seconds to wait, or None if the server did not say
+    """
+    value = getattr(error, "retry_after", None)
+    if value is not None:
+        return float(value)
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class LatencyTracker:
+    """Rolling window of call latencies per key, for percentiles."""
+
+    def __init__(self, window=200):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (int): Number of recent samples kept per key
+        """
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        """
+        Record one latency sample.
+
+        Args:
+            key (str): What was measured (e.g. a template)
+            seconds (float): The latency
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key, pct, min_samples=1):
+        """
+        Get a latency percentile (nearest-rank).
+
+        Args:
+            key (str): What was measured
+            pct (float): Percentile in [0, 100]
+            min_samples (int): Samples needed before a value is returned
+
+        Returns:
+            float: The percentile, or None with too few samples
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def stats(self):
+        """
+        Get the p50/p95 latency of every key.
+
+        Returns:
+            dict: Key mapped to sample count, p50 and p95 in seconds
+        """
+        with self._lock:
+            keys = list(self._samples)
+        stats = {}
+        for key in keys:
+            stats[key] = {
+                "count": len(self._samples[key]),
+                "p50": round(self.percentile(key, 50) or 0.0, 3),
+                "p95": round(self.percentile(key, 95) or 0.0, 3)
+            }
+        return stats
+
+class CircuitBreaker:
+    """
+    Stop calling a provider that keeps failing.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are rejected for cooldown seconds. Then a single probe call is let
+    through (half-open): its success closes the circuit, its failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            cooldown (float): Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._opens = 0
+        self._rejected = 0
+
+    def allow(self):
+        """
+        Check that a call may go ahead.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self._opened_at + self.cooldown - time.time()
+            if self._state == self.OPEN and remaining <= 0:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                logger.info("Circuit half-open, probing the LLM provider")
+                return
+            self._rejected += 1
+        raise CircuitOpenError("LLM provider is failing, try again shortly", retry_after=max(1.0, remaining))
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit closed, LLM provider recovered")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def cancel_probe(self):
+        """Let another call probe when a probe ended without reaching the provider."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                logger.warning(f"Circuit opened after {self._failures} consecutive failure(s)")
+                self._state = self.OPEN
+                self._opened_at = time.time()
+                self._probing = False
+                self._opens += 1
+
+    @property
+    def state(self):
+        return self._state
+
+    def stats(self):
+        """
+        Get breaker statistics.
+
+        Returns:
+            dict: State and counters
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutiveFailures": self._failures,
+                "opens": self._opens,
+                "rejected": self._rejected
+            }
+
+class ResilientCaller:
+    """
+    Run LLM calls with a deadline, retries, hedging and a circuit breaker.
+
+    Each call gets the deadline of its template. Retryable failures are
+    retried with exponential backoff and full jitter, waiting at least as
+    long as the provider's Retry-After, as long as the deadline allows.
+    With hedging on, a second identical request is started when the first
+    has been running longer than the p95 latency for its key, and whichever
+    answers first wins. Attempts run on a thread pool so that a slow
+    provider is abandoned at the deadline rather than at the HTTP timeout,
+    and each request is given the time left before the deadline as its own
+    timeout, so abandoned requests stop then too instead of running on.
+    """
+
+    def __init__(self, max_retries=2, backoff_base=0.5, backoff_max=8, default_deadline=60,
+                 hedge=False, hedge_min_samples=20, breaker=None, latencies=None, max_threads=64):
+        """
+        Initialize the caller.
+
+        Args:
+            max_retries (int): Retries after the first attempt
+            backoff_base (float): First backoff delay in seconds
+            backoff_max (float): Longest backoff delay in seconds
+            default_deadline (float): Deadline for templates without their own
+            hedge (bool): Whether to send hedged requests
+            hedge_min_samples (int): Latency samples needed before hedging a key
+            breaker (CircuitBreaker): Circuit breaker guarding the provider
+            latencies (LatencyTracker): Latency history used for hedging
+            max_threads (int): Worker threads for synchronous calls
+        """
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_deadline = default_deadline
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = latencies or LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="llm-call")
+
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "failures": 0,
+            "deadlineExceeded": 0,
+            "hedges": 0,
+            "hedgesWon": 0,
+            "abandoned": 0,
+            "staleServed": 0
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def deadline_for(self, template_name):
+        """
+        Get the deadline of a template.
+
+        LLM_DEADLINE_<NAME> (e.g. LLM_DEADLINE_SWOT) overrides the default.
+
+        Args:
+            template_name (str): Registered template name, or None
+
+        Returns:
+            float: Seconds the whole call, retries included, may take
+        """
+        if template_name:
+            value = os.getenv(f"LLM_DEADLINE_{template_name.upper()}")
+            if value:
+                return float(value)
+        return self.default_deadline
+
+    def _hedge_delay(self, key):
+        if not self.hedge:
+            return None
+        return self.latencies.percentile(key, 95, self.hedge_min_samples)
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        return delay
+
+    def _record_rejection(self, error):
+        if _status_code(error) is not None and not isinstance(error, LLMError):
+            # The provider answered, it just rejected this request
+            self.breaker.record_success()
+        else:
+            self.breaker.cancel_probe()
+
+    def _on_failure(self, error, attempt, end):
+        """
+        Decide what to do after a failed attempt.
+
+        Returns:
+            float: Seconds to wait before retrying
+
+        Raises:
+            The original error if it is not retryable, or ProviderError
+            if no retry is possible
+        """
+        if isinstance(error, DeadlineExceeded):
+            self._count("deadlineExceeded")
+            self._count("failures")
+            self.breaker.record_failure()
+            raise error
+        if not is_retryable(error):
+            self._count("failures")
+            self._record_rejection(error)
+            raise error
+
+        self.breaker.record_failure()
+        delay = self._backoff(attempt, error)
+        if attempt >= self.max_retries or time.time() + delay >= end:
+            self._count("failures")
+            status = 429 if _status_code(error) == 429 else 503
+            raise ProviderError(f"LLM provider failed: {str(error)}", status, retry_after(error)) from error
+
+        logger.warning(f"LLM call failed ({str(error)}), retrying in {delay:.2f} seconds")
+        self._count("retries")
+        return delay
+
+    def call(self, fn, key, deadline):
+        """
+        Run a blocking LLM call.
+
+        Args:
+            fn (callable): Makes one provider request, taking at most the
+                number of seconds it is passed, and returns its result
+            key (str): Latency key for hedging (e.g. the template fingerprint)
+            deadline (float): Seconds the call may take in total
+
+        Returns:
+            The result of fn
+
+        Raises:
+            CircuitOpenError, DeadlineExceeded or ProviderError
+        """
+        self._count("calls")
+        end = time.time() + deadline
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            try:
+                result = self._attempt(fn, key, end)
+            except Exception as e:
+                time.sleep(self._on_failure(e, attempt, end))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _attempt(self, fn, key, end):
+        start = time.time()
+        hedge_at = self._hedge_delay(key)
+        if end - start <= 0:
+            raise DeadlineExceeded("No answer from the LLM before the deadline")
+        # Always run on the thread pool: waiting on the future is what
+        # enforces the deadline, and the request's own timeout is what stops
+        # it once it has been given up on
+        futures = [self._executor.submit(fn, end - start)]
+        hedge = None
+        self._count("attempts")
+        error = None
+        while futures:
+            remaining = end - time.time()
+            if remaining <= 0:
+                self._count("abandoned", len(futures))
+                raise DeadlineExceeded("No answer from the LLM before the deadline")
+            timeout = remaining
+            if hedge_at is not None:
+                timeout = min(timeout, max(0.0, start + hedge_at - time.time()))
+
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                self.latencies.record(key, time.time() - start)
+                if future is hedge:
+                    self._count("hedgesWon")
+                # Losing requests cannot be interrupted; they finish in the
+                # background and their results are dropped
+                for loser in futures:
+                    loser.cancel()
+                return future.result()
+
+            if hedge_at is not None and time.time() >= start + hedge_at and futures:
+                logger.info(f"Hedging LLM call after {hedge_at:.2f} seconds")
+                hedge = self._executor.submit(fn, end - time.time())
+                futures.append(hedge)
+                self._count("attempts")
+                self._count("hedges")
+                hedge_at = None
+        raise error
+
+    async def acall(self, fn, key, deadline):
+        """
+        Async counterpart of call.
+
+        Args:
+            fn (callable): Returns a coroutine making one provider request,
+                taking at most the number of seconds it is passed
+            key (str): Latency key for hedging
+            deadline (float): Seconds the call may take in total
+
+        Returns:
+            The result of the coroutine
+
+        Raises:
+            CircuitOpenError, DeadlineExceeded or ProviderError
+        """
+        self._count("calls")
+        end = time.time() + deadline
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            try:
+                result = await self._aattempt(fn, key, end)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._on_failure(e, attempt, end))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _aattempt(self, fn, key, end):
+        start = time.time()
+        hedge_at = self._hedge_delay(key)
+        tasks = [asyncio.ensure_future(fn(end - start))]
+        hedge = None
+        self._count("attempts")
+        error = None
+        try:
+            while tasks:
+                remaining = end - time.time()
+                if remaining <= 0:
+                    raise DeadlineExceeded("No answer from the LLM before the deadline")
+                timeout = remaining
+                if hedge_at is not None:
+                    timeout = min(timeout, max(0.0, start + hedge_at - time.time()))
+
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self.latencies.record(key, time.time() - start)
+                    if task is hedge:
+                        self._count("hedgesWon")
+                    return task.result()
+
+                if hedge_at is not None and time.time() >= start + hedge_at and tasks:
+                    logger.info(f"Hedging LLM call after {hedge_at:.2f} seconds")
+                    hedge = asyncio.ensure_future(fn(end - time.time()))
+                    tasks.append(hedge)
+                    self._count("attempts")
+                    self._count("hedges")
+                    hedge_at = None
+            raise error
+        finally:
+            # Unlike threads, losing or abandoned requests can be cancelled
+            for task in tasks:
+                task.cancel()
+
+    def guard_stream(self):
+        """
+        Check the breaker before starting a streamed call.
+
+        Streams are not retried or hedged: content reaches the client as it
+        arrives. Report the outcome with stream_succeeded/stream_failed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self._count("calls")
+        self._count("attempts")
+        self.breaker.allow()
+
+    def stream_succeeded(self, key, seconds):
+        """Record a streamed call that completed."""
+        self.latencies.record(key, seconds)
+        self.breaker.record_success()
+
+    def stream_failed(self, error):
+        """Record a streamed call that failed."""
+        self._count("failures")
+        if isinstance(error, DeadlineExceeded):
+            self._count("deadlineExceeded")
+            self.breaker.record_failure()
+        elif is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self._record_rejection(error)
+
+    def record_stale(self):
+        """Record that a stale cached analysis was served instead of failing."""
+        self._count("staleServed")
+
+    def stats(self):
+        """
+        Get resilience counters.
+
+        Returns:
+            dict: Call counters, breaker state and latency percentiles
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats["hedging"] = self.hedge
+        stats["breaker"] = self.breaker.stats()
+        stats["latency"] = self.latencies.stats()
+        return stats
+
+def create_resilient_caller(max_retries=2):
+    """
+    Create the resilience layer configured in the environment.
+
+    Args:
+        max_retries (int): Retries after the first attempt
+
+    Returns:
+        ResilientCaller: The caller
+    """
+    return ResilientCaller(
+        max_retries=max_retries,
+        backoff_base=float(os.getenv('LLM_BACKOFF_BASE', 0.5)),
+        backoff_max=float(os.getenv('LLM_BACKOFF_MAX', 8)),
+        default_deadline=float(os.getenv('LLM_DEADLINE', 60)),
+        hedge=os.getenv('LLM_HEDGE', 'False').lower() in ('true', '1', 't'),
+        hedge_min_samples=int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', 5)),
+            cooldown=float(os.getenv('LLM_BREAKER_COOLDOWN', 30))
+        ),
+        max_threads=int(os.getenv('LLM_CALL_THREADS', 64))
+    )
@@ -0,0 +1,219 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from cache import LRUCache
+from response_encoding import COMPRESSION_MIN_BYTES, brotli, compress, negotiate_encoding
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def response_variant(formats, fields, idea=None):
+    """
+    Describe which form of an analysis response a request asks for.
+
+    Analyses are cached under the normalized idea, but the response echoes
+    the idea as it was sent, so responses including it are told apart by
+    the exact text.
+
+    Args:
+        formats (list): Requested visualization formats
+        fields (set): Selected response fields, or None for all
+        idea (str): The idea as sent in the request
+
+    Returns:
+        str: Variant name, the same for equivalent requests
+    """
+    selected = ','.join(sorted(fields)) if fields is not None else '*'
+    variant = f"{','.join(sorted(set(formats)))}|{selected}"
+    if idea is not None and (fields is None or "idea" in fields):
+        variant += "|" + hashlib.sha256(str(idea).encode('utf-8')).hexdigest()[:16]
+    return variant
+
+class ResponseCache:
+    """
+    Encoded analysis responses, ready to be written out as they are.
+
+    Each entry is the JSON body of one response variant of one analysis.
+    Its compressed forms are entries of their own, so they count against
+    the size budget too, and are dropped along with the body. Bodies depend
+    on keys of the source caches (the analysis in the LLM cache and its
+    stored ID in the analysis store) and are dropped as soon as any of those
+    is evicted, expires or is replaced there.
+    """
+
+    def __init__(self, sources, max_entries=256, max_bytes=32 * 1024 * 1024, ttl=300,
+                 precompress=False):
+        """
+        Initialize the cache and subscribe to the source caches' evictions.
+
+        Args:
+            sources (list): Cache backends holding what responses are built from
+            max_entries (int): Maximum number of cached bodies, compressed forms included
+            max_bytes (int): Maximum estimated size of the cached bodies, compressed
+                forms included
+            ttl (float): Seconds a response stays cached
+            precompress (bool): Compress with every supported coding up front
+                instead of on the first request for each
+        """
+        self.precompress = precompress
+        self.entries = LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, num_shards=4)
+        self.entries.add_eviction_listener(self._forget)
+        # Source cache key -> keys of the responses built from it, and back
+        self._dependents = {}
+        self._dependencies = {}
+        self._lock = threading.Lock()
+        for source in sources:
+            source.add_eviction_listener(self.invalidate)
+
+    def get(self, key, variant, accept_encoding=None):
+        """
+        Get a cached response body.
+
+        Args:
+            key (str): Cache key of the analysis
+            variant (str): See response_variant
+            accept_encoding (str): The request's Accept-Encoding header
+
+        Returns:
+            tuple: (body, headers) or None on a miss
+        """
+        response_key = f"{key}|{variant}"
+        entry = self.entries.get(response_key)
+        if entry is None:
+            return None
+        return self._encoded(response_key, entry, accept_encoding)
+
+    def set(self, key, variant, body, accept_encoding=None, dependencies=(), ttl=None):
+        """
+        Cache a response body.
+
+        Args:
+            key (str): Cache key of the analysis
+            variant (str): See response_variant
+            body (bytes): Uncompressed JSON body
+            accept_encoding (str): Accept-Encoding header of the request the
+                body was built for
+            dependencies (iterable): Further source cache keys the response
+                must not outlive
+            ttl (float): Seconds the analysis stays fresh, if less than the
+                cache's own TTL
+
+        Returns:
+            tuple: (body, headers) to answer the request with
+        """
+        response_key = f"{key}|{variant}"
+        compressible = len(body) >= COMPRESSION_MIN_BYTES
+        if ttl is not None and ttl <= 0:
+            return self._encode(body, compressible, accept_encoding)
+        ttl = self.entries.ttl if ttl is None else min(ttl, self.entries.ttl)
+        entry = {"identity": body, "compressible": compressible, "expires_at": time.time() + ttl}
+
+        self.entries.set(response_key, entry, ttl=ttl)
+        # Registered after the write, which drops the replaced entry's own
+        dependencies = (key,) + tuple(dependencies)
+        with self._lock:
+            self._dependencies[response_key] = dependencies
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(response_key)
+
+        if compressible and self.precompress:
+            for coding in ('gzip', 'br'):
+                if coding != 'br' or brotli is not None:
+                    self._store_encoding(response_key, entry, coding, compress(body, coding))
+        return self._encoded(response_key, entry, accept_encoding)
+
+    def _encode(self, body, compressible, accept_encoding):
+        # Compress a body that is not cached
+        coding = negotiate_encoding(accept_encoding) if compressible else None
+        headers = {"Vary": "Accept-Encoding"}
+        if coding is None:
+            return body, headers
+        headers["Content-Encoding"] = coding
+        return compress(body, coding), headers
+
+    def _encoded(self, response_key, entry, accept_encoding):
+        # The body in the coding the client prefers, compressed on first use
+        coding = negotiate_encoding(accept_encoding) if entry["compressible"] else None
+        headers = {"Vary": "Accept-Encoding"}
+        if coding is None:
+            return entry["identity"], headers
+        body = self.entries.get(f"{response_key}|{coding}")
+        if body is None:
+            body = compress(entry["identity"], coding)
+            self._store_encoding(response_key, entry, coding, body)
+        headers["Content-Encoding"] = coding
+        return body, headers
+
+    def _store_encoding(self, response_key, entry, coding, body):
+        # Compressed bodies are entries of their own, registered as dependents
+        # of the uncompressed body so they go when it goes
+        ttl = entry["expires_at"] - time.time()
+        if ttl <= 0:
+            return
+        encoded_key = f"{response_key}|{coding}"
+        self.entries.set(encoded_key, body, ttl=ttl)
+        with self._lock:
+            self._dependencies[encoded_key] = (response_key,)
+            self._dependents.setdefault(response_key, set()).add(encoded_key)
+
+    def invalidate(self, key):
+        """
+        Drop every response built from a source cache entry.
+
+        Args:
+            key (str): The source cache key that was evicted
+        """
+        with self._lock:
+            response_keys = self._dependents.pop(key, None)
+        if response_keys:
+            logger.info(f"Dropping {len(response_keys)} cached response(s) of evicted entry {key[:16]}")
+            for response_key in response_keys:
+                self.entries.delete(response_key)
+
+    def _forget(self, response_key):
+        # Keep the dependency index in step with the entries, and drop the
+        # compressed forms of a dropped body
+        with self._lock:
+            for dependency in self._dependencies.pop(response_key, ()):
+                dependents = self._dependents.get(dependency)
+                if dependents is not None:
+                    dependents.discard(response_key)
+                    if not dependents:
+                        del self._dependents[dependency]
+            encoded_keys = self._dependents.pop(response_key, ())
+        for encoded_key in encoded_keys:
+            self.entries.delete(encoded_key)
+
+    def stats(self):
+        """
+        Get response cache counters.
+
+        Returns:
+            dict: Hit/miss/eviction counters and size information
+        """
+        stats = self.entries.stats()
+        stats["backend"] = "response"
+        return stats
+
+def create_response_cache(sources):
+    """
+    Create the encoded response cache configured in the environment.
+
+    Args:
+        sources (list): Cache backends holding what responses are built from
+
+    Returns:
+        ResponseCache: The cache, or None if RESPONSE_CACHE is disabled
+    """
+    if os.getenv('RESPONSE_CACHE', 'True').lower() not in ('true', '1', 't'):
+        return None
+    return ResponseCache(
+        sources,
+        max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 256)),
+        max_bytes=int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+        ttl=int(os.getenv('RESPONSE_CACHE_TTL', 300)),
+        precompress=os.getenv('RESPONSE_CACHE_PRECOMPRESS', 'False').lower() in ('true', '1', 't')
+    )
@@ -0,0 +1,159 @@
+import os
+import json
+import gzip
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Compression of JSON responses (brotli needs the optional Brotli package)
+COMPRESSION_ENABLED = os.getenv('RESPONSE_COMPRESSION', 'True').lower() in ('true', '1', 't')
+COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+
+def dumps(payload):
+    """
+    Serialize a payload to compact UTF-8 JSON.
+
+    Uses orjson when it is installed and the standard library otherwise
+    (or for values orjson rejects, such as non-string keys).
+
+    Args:
+        payload: JSON serializable value
+
+    Returns:
+        bytes: The encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def parse_fields(value):
+    """
+    Parse a fields selection from a query string or request body.
+
+    Args:
+        value (str or list): Comma separated names, a list of names, or None
+
+    Returns:
+        set: The selected field names, or None to select every field
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = {str(name).strip() for name in value if str(name).strip()}
+    return fields or None
+
+def select_fields(payload, fields):
+    """
+    Keep only the selected top-level fields of a response.
+
+    Args:
+        payload (dict): The full response
+        fields (set): Field names to keep, or None for all
+
+    Returns:
+        dict: The response with the selected fields
+    """
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+def wants_field(fields, name):
+    """
+    Check whether a field is selected, so unselected ones need not be built.
+
+    Args:
+        fields (set): Selected field names, or None for all
+        name (str): The field
+
+    Returns:
+        bool: True if the field goes in the response
+    """
+    return fields is None or name in fields
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content coding for a response from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The request's Accept-Encoding header
+
+    Returns:
+        str: "br", "gzip" or None for no compression
+    """
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def quality_of(coding):
+        return accepted.get(coding, accepted.get('*', 0.0))
+
+    # Brotli is preferred on ties: smaller output at a similar cost
+    candidates = [coding for coding in ('br', 'gzip') if coding != 'br' or brotli is not None]
+    candidates = [coding for coding in candidates if quality_of(coding) > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda coding: (quality_of(coding), coding == 'br'))
+
+def compress(body, coding):
+    """
+    Compress a response body.
+
+    Args:
+        body (bytes): The body
+        coding (str): "br" or "gzip"
+
+    Returns:
+        bytes: The compressed body
+    """
+    if coding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def encode_json(payload, accept_encoding=None):
+    """
+    Encode a JSON response body, compressed when the client accepts it.
+
+    Args:
+        payload: JSON serializable value
+        accept_encoding (str): The request's Accept-Encoding header
+
+    Returns:
+        tuple: (body, headers) where headers carry Content-Encoding and
+        Vary as needed
+    """
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    coding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESSION_MIN_BYTES else None
+    if coding:
+        body = compress(body, coding)
+        headers["Content-Encoding"] = coding
+    return body, headers
@@ -0,0 +1,201 @@
+import re
+import zlib
+import logging
+from functools import lru_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Map common section names to emojis; the first key found in a name wins
+EMOJI_MAP = {
+    "project title": "🔍",
+    "title": "📝",
+    "goal": "🎯",
+    "goals": "🎯",
+    "project goals": "🎯",
+    "task": "📋",
+    "tasks": "📋",
+    "key tasks": "📋",
+    "stakeholder": "🧑‍🤝‍🧑",
+    "stakeholders": "🧑‍🤝‍🧑",
+    "risk": "⚠️",
+    "risks": "⚠️",
+    "tool": "🛠️",
+    "tools": "🛠️",
+    "technologies": "🛠️",
+    "tools & technologies": "🛠️",
+    "innovation": "💡",
+    "innovations": "💡",
+    "value": "💡",
+    "unique value": "💡",
+    "business model": "💰",
+    "market": "📊",
+    "market opportunity": "📊",
+    "competitor": "🧠",
+    "competitors": "🧠",
+    "top competitors": "🧠",
+    "competitive edge": "🆚",
+    "revenue": "📈",
+    "revenue streams": "📈",
+    "marketing": "📢",
+    "go-to-market": "📢",
+    "strategy": "📢",
+    "feature": "🌱",
+    "features": "🌱",
+    "roadmap": "🌱",
+    "future": "🌱"
+}
+
+# Emojis for sections no key matches, picked by a hash of the name
+GENERIC_EMOJIS = ["📌", "🔖", "📊", "📈", "📉", "📇", "📋", "📑", "📝", "📔", "📕", "📗", "📘", "📙"]
+
+# Section names suggesting a phase or sequence
+SEQUENTIAL_KEYWORDS = ["phase", "step", "stage", "task", "milestone", "timeline", "roadmap"]
+
+# Sections that don't make sense in a timeline built from every section
+EXCLUDED_KEYWORDS = ["competitor", "risk", "threat", "existing"]
+
+# Card categories, matched against a card's title and content
+CATEGORY_KEYWORDS = {
+    "Business": ["business", "model", "revenue", "market", "competitor", "edge", "monetization", "pricing", "cost"],
+    "Technical": ["tools", "technologies", "risks", "technical", "development", "platform", "architecture", "security"],
+    "Planning": ["tasks", "roadmap", "strategy", "features", "timeline", "phase", "implementation", "launch"]
+}
+
+# Timeline roles: part of the sequence, left out of it, or neither
+PHASE = "phase"
+EXCLUDED = "excluded"
+GENERAL = "general"
+
+class SectionClassifier:
+    """
+    Emoji, timeline role and categories of sections, from one keyword index.
+
+    Every keyword of every table goes into a single pattern, compiled once.
+    The pattern finds the longest keyword starting at each position of a
+    lowercased section name. Any shorter keyword starting there is a prefix
+    of that one, so one scan yields every keyword the name contains,
+    overlapping ones included. Results match substring tests against each
+    table, and are cached per name.
+    """
+
+    def __init__(self, emoji_map=None, generic_emojis=None, sequential_keywords=None,
+                 excluded_keywords=None, category_keywords=None):
+        """
+        Build the keyword index.
+
+        Args:
+            emoji_map (dict): Keyword to emoji, in order of priority
+            generic_emojis (list): Emojis for names no keyword matches
+            sequential_keywords (list): Keywords of timeline phases
+            excluded_keywords (list): Keywords of sections kept off timelines
+            category_keywords (dict): Category to its keywords
+        """
+        self.emoji_map = EMOJI_MAP if emoji_map is None else emoji_map
+        self.generic_emojis = GENERIC_EMOJIS if generic_emojis is None else generic_emojis
+        sequential_keywords = SEQUENTIAL_KEYWORDS if sequential_keywords is None else sequential_keywords
+        excluded_keywords = EXCLUDED_KEYWORDS if excluded_keywords is None else excluded_keywords
+        self.category_keywords = CATEGORY_KEYWORDS if category_keywords is None else category_keywords
+
+        # Keyword -> what it stands for in each table
+        roles = {}
+        for priority, (keyword, emoji) in enumerate(self.emoji_map.items()):
+            roles.setdefault(keyword.lower(), {}).setdefault("emoji", (priority, emoji))
+        for keyword in sequential_keywords:
+            roles.setdefault(keyword.lower(), {})["sequential"] = True
+        for keyword in excluded_keywords:
+            roles.setdefault(keyword.lower(), {})["excluded"] = True
+        for category, keywords in self.category_keywords.items():
+            for keyword in keywords:
+                roles.setdefault(keyword.lower(), {}).setdefault("categories", set()).add(category)
+
+        # Each keyword also stands for the keywords that are its prefixes
+        self._matches = {}
+        for keyword in roles:
+            prefixes = [roles[other] for other in roles if keyword.startswith(other)]
+            self._matches[keyword] = prefixes
+
+        alternatives = sorted(roles, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in alternatives) + "))")
+
+        # Section text only needs a yes or no per category, which a search
+        # stopping at the first hit answers much faster than a full scan
+        self._category_patterns = {
+            category: re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+            for category, keywords in self.category_keywords.items()
+        }
+        self._classify_name = lru_cache(maxsize=4096)(self._classify_name_uncached)
+
+    def _scan(self, text):
+        """Yield the roles of every keyword in a text."""
+        for match in self._pattern.finditer(text.lower()):
+            yield from self._matches[match.group(1)]
+
+    def _classify_name_uncached(self, name):
+        emoji = None
+        sequential = excluded = False
+        categories = set()
+        for role in self._scan(name):
+            if "emoji" in role and (emoji is None or role["emoji"][0] < emoji[0]):
+                emoji = role["emoji"]
+            sequential = sequential or role.get("sequential", False)
+            excluded = excluded or role.get("excluded", False)
+            categories.update(role.get("categories", ()))
+
+        if emoji is not None:
+            emoji = emoji[1]
+        else:
+            emoji = self.generic_emojis[zlib.crc32(name.encode('utf-8')) % len(self.generic_emojis)]
+        timeline_role = PHASE if sequential else EXCLUDED if excluded else GENERAL
+        return emoji, timeline_role, frozenset(categories)
+
+    def classify(self, name, text=None):
+        """
+        Classify a section.
+
+        Args:
+            name (str): Section name
+            text (str): Section text to consider for categories as well
+
+        Returns:
+            dict: "emoji", "timelineRole" (phase, excluded or general) and
+            "categories" (in CATEGORY_KEYWORDS order)
+        """
+        emoji, timeline_role, categories = self._classify_name(name)
+        text = text.lower() if text else ""
+        return {
+            "emoji": emoji,
+            "timelineRole": timeline_role,
+            "categories": [
+                category for category, pattern in self._category_patterns.items()
+                if category in categories or pattern.search(text)
+            ]
+        }
+
+    def emoji(self, name):
+        """
+        Get the emoji of a section name.
+
+        Args:
+            name (str): Section name
+
+        Returns:
+            str: The emoji, the same for every call with the same name
+        """
+        return self._classify_name(name)[0]
+
+    def timeline_role(self, name):
+        """
+        Get the timeline role of a section name.
+
+        Args:
+            name (str): Section name
+
+        Returns:
+            str: phase, excluded or general
+        """
+        return self._classify_name(name)[1]
+
+# Shared classifier over the default keyword tables
+section_classifier = SectionClassifier()
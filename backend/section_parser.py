@@ -0,0 +1,187 @@
+import re
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns. None of them can backtrack more than a constant
+# amount per input character, which keeps parsing linear in the input size.
+_EMOJI_CHAR = re.compile(r'[\u2600-\u27BF\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U0001F800-\U0001F8FF\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]')
+_NUMBERED_OPENER = re.compile(r'(?<!\d)\d+\.\s+\*\*')
+_BULLET = re.compile(r'[-*•]\s')
+_BULLET_CHARS = ('-', '*', '•')
+
+def match_header(line):
+    """
+    Match a section header line.
+
+    Equivalent to searching the line for an emoji header
+    ``(emoji).*?\\*\\*(.*?)\\*\\*`` and then a numbered header
+    ``(\\d+)\\.\\s+\\*\\*(.*?)\\*\\*``, but done with one character-class scan
+    and plain substring searches instead of backtracking.
+
+    Args:
+        line (str): A stripped line without newlines
+
+    Returns:
+        tuple: (emoji, section_name) for emoji headers, (None, section_name)
+        for numbered headers, or None if the line is not a header
+    """
+    # The leftmost emoji is the only candidate: if it has no **...** after it,
+    # no later emoji can have one either.
+    emoji_match = _EMOJI_CHAR.search(line)
+    if emoji_match:
+        start = line.find('**', emoji_match.end())
+        if start != -1:
+            end = line.find('**', start + 2)
+            if end != -1:
+                return emoji_match.group(), line[start + 2:end]
+
+    # Likewise only the first "N. **" opener can be closed
+    opener = _NUMBERED_OPENER.search(line)
+    if opener:
+        end = line.find('**', opener.end())
+        if end != -1:
+            return None, line[opener.end():end]
+
+    return None
+
+def process_section_lines(lines):
+    """
+    Turn the content lines of a section into structured data.
+
+    Args:
+        lines (list): Stripped, non-empty content lines
+
+    Returns:
+        str or list or dict: Bullet items, key-value pairs or plain text
+    """
+    # A bullet marker followed by whitespace (or by the line break, when a
+    # lone marker is not the last line) marks the content as a list
+    last = len(lines) - 1
+    if any(_BULLET.match(line) or (line in _BULLET_CHARS and i < last) for i, line in enumerate(lines)):
+        items = []
+        for line in lines:
+            if _BULLET.match(line):
+                parts = line.split(maxsplit=1)
+                items.append(parts[1] if len(parts) > 1 else "")
+        return items
+
+    # Key-value pairs need at least two lines
+    if len(lines) > 1 and any(': ' in line for line in lines):
+        pairs = {}
+        for line in lines:
+            if ': ' in line:
+                key, value = line.split(': ', 1)
+                pairs[key.strip()] = value.strip()
+        return pairs
+
+    # Otherwise plain text
+    return '\n'.join(lines)
+
+class SectionParser:
+    """
+    Push-style parser that turns streamed LLM text into sections.
+
+    Text can be fed in arbitrary chunks; partial lines are held until their
+    line break arrives. Each line is inspected once, so total cost is linear
+    in the size of the input. Completed sections are returned from feed() as
+    soon as the next header closes them, and close() flushes the last one.
+    For a complete response the resulting sections are identical to the
+    original whole-text parser.
+    """
+
+    def __init__(self):
+        """Initialize the parser."""
+        self.sections = {}
+        self._current = None
+        self._content = []
+        self._partial = []
+
+    def feed(self, chunk):
+        """
+        Feed a chunk of text.
+
+        Args:
+            chunk (str): Next piece of the response
+
+        Returns:
+            list: (section_name, section_content) for each section closed
+            by this chunk
+        """
+        completed = []
+        if '\n' not in chunk:
+            if chunk:
+                self._partial.append(chunk)
+            return completed
+
+        lines = chunk.split('\n')
+        self._partial.append(lines[0])
+        self._feed_line(''.join(self._partial), completed)
+        for line in lines[1:-1]:
+            self._feed_line(line, completed)
+        self._partial = [lines[-1]] if lines[-1] else []
+        return completed
+
+    def close(self):
+        """
+        Finish parsing.
+
+        Returns:
+            list: (section_name, section_content) for the sections still open
+        """
+        completed = []
+        if self._partial:
+            self._feed_line(''.join(self._partial), completed)
+            self._partial = []
+
+        if self._current is not None:
+            self._flush(wrap=True)
+            completed.append((self._current, self.sections[self._current]))
+            self._current = None
+        return completed
+
+    def parse(self, content):
+        """
+        Parse a complete response.
+
+        Args:
+            content (str): The full response text
+
+        Returns:
+            dict: Extracted sections
+        """
+        self.feed(content)
+        self.close()
+        return self.sections
+
+    def _flush(self, wrap):
+        # An emoji header replaces the previous section's value outright; a
+        # numbered header (and the end of input) keeps its emoji alongside
+        if self._current and self._content:
+            processed = process_section_lines(self._content)
+            if wrap and isinstance(self.sections[self._current], dict):
+                self.sections[self._current]["content"] = processed
+            else:
+                self.sections[self._current] = processed
+            self._content = []
+
+    def _feed_line(self, line, completed):
+        line = line.strip()
+        if not line:
+            return
+
+        header = match_header(line)
+        if header is None:
+            if self._current:
+                self._content.append(line)
+            return
+
+        emoji, section_name = header
+        if self._current is not None:
+            self._flush(wrap=emoji is None)
+            completed.append((self._current, self.sections[self._current]))
+
+        self._current = section_name.strip()
+        self.sections[self._current] = {"emoji": emoji} if emoji is not None else {}
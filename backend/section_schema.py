@@ -0,0 +1,130 @@
+import re
+import logging
+from templates import parse_template_sections, select_sections
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+def normalize_title(title):
+    """
+    Reduce a section title to lowercase letters and digits for matching.
+
+    Args:
+        title (str): Section title as written by the template or the LLM
+
+    Returns:
+        str: The normalized title
+    """
+    return _NON_ALNUM.sub('', title).lower()
+
+def has_content(value):
+    """
+    Check whether a parsed section has any content besides its emoji.
+
+    Args:
+        value: Parsed section (text, list or dict)
+
+    Returns:
+        bool: True if the section is not empty
+    """
+    if isinstance(value, dict):
+        return any(has_content(item) for key, item in value.items() if key != "emoji")
+    if isinstance(value, list):
+        return any(has_content(item) for item in value)
+    if isinstance(value, str):
+        return bool(value.strip())
+    return value is not None
+
+class SectionSchema:
+    """
+    The sections a template asks for, to check parsed analyses against.
+
+    A section counts as present when the analysis has a section whose title
+    matches the template's ignoring case, spacing and punctuation, and that
+    section has content.
+    """
+
+    def __init__(self, template):
+        """
+        Derive the schema of a template.
+
+        Args:
+            template (str): Template text
+        """
+        self.template = template
+        self.sections = parse_template_sections(template)
+        self.titles = [section["title"] for section in self.sections]
+        self._positions = {normalize_title(title): index for index, title in enumerate(self.titles)}
+
+    def missing(self, structured_data):
+        """
+        Find the sections an analysis lacks.
+
+        Args:
+            structured_data (dict): Parsed sections
+
+        Returns:
+            list: Positions of the missing or empty sections, in template order
+        """
+        present = set()
+        if isinstance(structured_data, dict):
+            for title, value in structured_data.items():
+                index = self._positions.get(normalize_title(str(title)))
+                if index is not None and has_content(value):
+                    present.add(index)
+        return [index for index in range(len(self.titles)) if index not in present]
+
+    def followup_template(self, missing):
+        """
+        Build the template that asks for only the missing sections.
+
+        Args:
+            missing (list): Positions of the missing sections
+
+        Returns:
+            str: Template text
+        """
+        return select_sections(self.template, missing)
+
+    def splice(self, structured_data, answers):
+        """
+        Insert re-asked sections into an analysis, in template order.
+
+        Args:
+            structured_data (dict): Parsed sections of the analysis
+            answers (dict): Parsed sections of the follow-up answer
+
+        Returns:
+            tuple: (structured_data, titles) where titles are the sections that
+            were filled in
+        """
+        found = {}
+        for title, value in answers.items():
+            index = self._positions.get(normalize_title(str(title)))
+            if index is not None and has_content(value):
+                found[index] = (title, value)
+
+        # Sections in template order, keeping the analysis' own titles and
+        # placing any section the template does not know after the section
+        # it followed
+        merged = {}
+        filled = []
+        for title, value in structured_data.items():
+            index = self._positions.get(normalize_title(str(title)))
+            if index is not None:
+                for earlier in sorted(i for i in found if i < index):
+                    merged_title, merged_value = found.pop(earlier)
+                    merged[merged_title] = merged_value
+                    filled.append(merged_title)
+                if index in found:
+                    title, value = found.pop(index)
+                    filled.append(title)
+            merged[title] = value
+        for index in sorted(found):
+            title, value = found[index]
+            merged[title] = value
+            filled.append(title)
+        return merged, filled
@@ -0,0 +1,154 @@
+import threading
+import asyncio
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """An in-flight call that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for the leader and receive the same
+    result, or the same exception.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._leaders = 0
+        self._coalesced = 0
+        self._remote_coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identifier of the work being done
+            fn (callable): Function computing the result
+
+        Returns:
+            tuple: (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._leaders += 1
+                leader = True
+
+        if not leader:
+            logger.info("Waiting for in-flight request with the same key")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def record_remote(self):
+        """Count a request that was served by another worker's in-flight call."""
+        with self._lock:
+            self._remote_coalesced += 1
+
+    def stats(self):
+        """
+        Get single-flight counters.
+
+        Returns:
+            dict: Leader, coalesced and in-flight counts
+        """
+        with self._lock:
+            return {
+                "inFlight": len(self._calls),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "remoteCoalesced": self._remote_coalesced
+            }
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight for coroutines on one event loop.
+
+    The work runs as a task of its own that every caller, the leader
+    included, awaits through a shield: a caller that is cancelled (e.g. its
+    client disconnected) stops waiting, but the work carries on for the
+    others and still finishes (and fills the cache) if nobody is left.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._calls = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Await fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Identifier of the work being done
+            fn (callable): Function returning the awaitable to run
+
+        Returns:
+            tuple: (result, shared) where shared is True for followers
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self._coalesced += 1
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        self._leaders += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key, task):
+        # Later callers start a new flight once this one is over
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved in case nobody else was waiting
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """
+        Get single-flight counters.
+
+        Returns:
+            dict: Leader, coalesced and in-flight counts
+        """
+        return {
+            "inFlight": len(self._calls),
+            "leaders": self._leaders,
+            "coalesced": self._coalesced
+        }
@@ -1,4 +1,7 @@
 # Prompt templates for the LLM analysis
+import os
+import re
+import hashlib
 
 # Business idea analysis template
 BUSINESS_IDEA_TEMPLATE = """
@@ -138,6 +141,9 @@ _TEMPLATES = {
     "product_features": PRODUCT_FEATURE_TEMPLATE
 }
 
+# Callbacks notified when a template is added or updated
+_LISTENERS = []
+
 def get_template(template_name):
     """
     Get a template by name.
@@ -176,4 +182,196 @@ def add_template(name, template):
     """
     is_new = name not in _TEMPLATES
     _TEMPLATES[name] = template
-    return is_new
\ No newline at end of file
+    for listener in _LISTENERS:
+        listener(name, template)
+    return is_new
+
+def get_templates():
+    """
+    Get all registered templates.
+    
+    Returns:
+        dict: Template names mapped to template text
+    """
+    return dict(_TEMPLATES)
+
+def on_template_added(callback):
+    """
+    Register a callback invoked as callback(name, template) by add_template.
+    
+    Args:
+        callback (callable): The callback
+    """
+    _LISTENERS.append(callback)
+
+def template_fingerprint(template):
+    """
+    Get a stable short fingerprint of a template's text.
+    
+    Args:
+        template (str): Template text
+        
+    Returns:
+        str: First 16 hex digits of the text's SHA-256
+    """
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+# Matches section header lines such as "🔍 1. **Project Title**" or "💪 **Strengths**"
+_SECTION_HEADER = re.compile(r'^(\S+)\s+(?:(\d+)\.\s+)?\*\*([^*\n]+)\*\*\s*$', re.MULTILINE)
+
+# Line the LLM is asked to write after the last section. It is also a stop
+# sequence, so generation ends there and the marker is never returned
+END_MARKER = "[END OF ANALYSIS]"
+
+# Templates generated as concurrent section groups, with their number of
+# groups. Off by default: split templates are not streamed incrementally and
+# every group resends the prompt preamble. SECTION_GROUPS_<NAME> opts a
+# template in (e.g. SECTION_GROUPS_BUSINESS_IDEA=4); 0 or 1 turns it off
+_SECTION_GROUPS = {}
+
+def parse_template_sections(template):
+    """
+    Extract the sections a template asks the LLM to produce.
+    
+    Args:
+        template (str): Template text (formatted or not)
+        
+    Returns:
+        list: Dictionaries with the section's emoji, number (or None),
+        title and the bracketed instruction that follows the header
+    """
+    sections = []
+    for match in _SECTION_HEADER.finditer(template):
+        emoji, number, title = match.groups()
+        
+        # The instruction is the next line, e.g. "[List 3-5 potential blockers...]"
+        rest = template[match.end():].lstrip('\n')
+        hint = rest.split('\n', 1)[0].strip()
+        if not (hint.startswith('[') and hint.endswith(']')):
+            hint = ""
+        
+        sections.append({
+            "emoji": emoji,
+            "number": int(number) if number else None,
+            "title": title.strip(),
+            "hint": hint.strip('[]')
+        })
+    return sections
+
+def get_section_groups(name):
+    """
+    Get the number of concurrent section groups a template is generated in.
+    
+    Args:
+        name (str): Template name
+        
+    Returns:
+        int: Number of groups (1 means a single completion)
+    """
+    if not name:
+        return 1
+    configured = os.getenv(f"SECTION_GROUPS_{name.upper()}")
+    groups = int(configured) if configured else _SECTION_GROUPS.get(name, 1)
+    return max(1, groups)
+
+def _section_blocks(template):
+    """
+    Cut a template into its preamble, section blocks and closing instructions.
+    
+    Args:
+        template (str): Template text
+        
+    Returns:
+        tuple: (preamble, blocks, closing) where each block is a section's
+        header and hint line, or None if the template has no sections
+    """
+    headers = list(_SECTION_HEADER.finditer(template))
+    if not headers:
+        return None
+    
+    # Each section runs from its header to the next one; the last ends
+    # after its hint line, where the closing instructions start
+    starts = [match.start() for match in headers]
+    end = headers[-1].end()
+    rest = template[end:]
+    hint = rest.lstrip('\n').split('\n', 1)[0].strip()
+    if hint.startswith('[') and hint.endswith(']'):
+        end += rest.index(hint) + len(hint)
+    bounds = starts + [end]
+    blocks = [template[start:stop].strip('\n') for start, stop in zip(bounds, bounds[1:])]
+    return template[:starts[0]], blocks, template[end:].lstrip('\n')
+
+def split_template(template, groups):
+    """
+    Split a template into templates that each ask for a contiguous group of its sections.
+    
+    Every part keeps the template's preamble (with the {idea} placeholder)
+    and closing instructions, and its sections keep their emojis, numbers
+    and hints, so the parts' answers joined in order parse like the answer
+    to the whole template.
+    
+    Args:
+        template (str): Template text
+        groups (int): Number of groups to split the sections into
+        
+    Returns:
+        list: Template texts, in section order ([template] if it cannot be split)
+    """
+    cut = _section_blocks(template)
+    if cut is None or min(groups, len(cut[1])) <= 1:
+        return [template]
+    preamble, blocks, closing = cut
+    groups = min(groups, len(blocks))
+    
+    # Contiguous groups of near-equal size, the larger ones first
+    size, extra = divmod(len(blocks), groups)
+    parts = []
+    index = 0
+    for group in range(groups):
+        count = size + (1 if group < extra else 0)
+        parts.append(preamble + '\n\n'.join(blocks[index:index + count]) + '\n\n' + closing)
+        index += count
+    return parts
+
+def select_sections(template, indexes):
+    """
+    Build a template that asks for only some of a template's sections.
+    
+    Args:
+        template (str): Template text
+        indexes (list): Positions of the sections to keep, as in parse_template_sections
+        
+    Returns:
+        str: Template text with the same preamble and closing instructions
+    """
+    preamble, blocks, closing = _section_blocks(template)
+    return preamble + '\n\n'.join(blocks[index] for index in sorted(indexes)) + '\n\n' + closing
+
+def with_end_marker(template):
+    """
+    Add the instruction to close the answer with END_MARKER to a template.
+    
+    Args:
+        template (str): Template text
+        
+    Returns:
+        str: The template text sent to the LLM
+    """
+    return template.rstrip('\n') + f"\nWrite {END_MARKER} on its own line right after the last section.\n"
+
+def stop_sequences(following=None):
+    """
+    Get the stop sequences that end a completion once its last section is done.
+    
+    Args:
+        following (str): For a section group, the template of the group
+            after it, whose first section header also ends this one
+        
+    Returns:
+        list: Stop sequences
+    """
+    stops = [END_MARKER]
+    match = _SECTION_HEADER.search(following) if following else None
+    if match:
+        stops.append(match.group(0).strip())
+    return stops
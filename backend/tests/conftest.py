@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+import pytest
+
+# Backend modules import each other by bare name (e.g. "from cache import ...")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# An instant, deterministic fake provider with per-process caches (None unsets)
+FAKE_SETTINGS = {
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_TTFT": "0",
+    "FAKE_LLM_TOKENS_PER_SEC": "0",
+    "FAKE_LLM_JITTER": "0",
+    "FAKE_LLM_ERROR_RATE": "0",
+    "CACHE_BACKEND": "memory",
+    "RATE_LIMIT_BACKEND": "memory",
+    "GROQ_RPM": "0",
+    "GROQ_TPM": "0",
+    "LLM_HEDGE": "False",
+    "FAST_MODEL_NAME": None,
+    "FALLBACK_MODEL_NAME": None
+}
+
+def use_fake_settings(monkeypatch, settings):
+    for name, value in dict(FAKE_SETTINGS, **settings).items():
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, str(value))
+
+@pytest.fixture
+def make_processor(monkeypatch):
+    """Build an LLMProcessor on the fake provider, with settings overridden by keyword."""
+    def make(**settings):
+        use_fake_settings(monkeypatch, settings)
+        from llm_processor import LLMProcessor
+        return LLMProcessor()
+    return make
+
+@pytest.fixture
+def server(monkeypatch):
+    """The Flask and ASGI app modules on the fake provider, imported once per session."""
+    use_fake_settings(monkeypatch, {})
+    import app
+    import asgi
+    return app, asgi
+
+@pytest.fixture
+def fake_server():
+    """Base URL of an instant fake Groq HTTP server."""
+    from fake_llm import create_server, LatencyProfile
+    server = create_server(port=0, profile=LatencyProfile(ttft=0, tokens_per_sec=0, jitter=0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,66 @@
+import pytest
+from cache import LRUCache
+from analysis_store import AnalysisStore, analysis_id
+
+ANALYSIS = {"Goals": ["Ship the pilot", "Find partners"], "Timeline": ["Month 1: pilot", "Month 3: launch"]}
+
+@pytest.fixture
+def store():
+    return AnalysisStore(LRUCache(ttl=60))
+
+def test_ids_are_content_addressed(store):
+    key = store.save("raw", ANALYSIS)
+    assert key == analysis_id("raw", ANALYSIS) and len(key) == 24
+    assert store.save("raw", dict(ANALYSIS)) == key
+    assert store.save("other raw", ANALYSIS) != key
+    assert store.get(key) == ("raw", ANALYSIS, None)
+
+def test_analysis_store_contains_only_saved_ids(store):
+    key = store.save("raw", ANALYSIS)
+    assert store.contains(key)
+    assert not store.contains("0" * 24)
+    assert not store.contains("not-an-id")
+
+def test_visualizations_are_built_once_per_id(store, monkeypatch):
+    import analysis_store
+    key = store.save("raw", ANALYSIS)
+    builds = []
+    build = analysis_store.build_visualizations
+    monkeypatch.setattr(analysis_store, "build_visualizations", lambda *args: builds.append(args) or build(*args))
+
+    cards = store.visualization(key, "cards")
+    assert store.visualization(key, "cards") == cards
+    assert len(builds) == 1
+    assert "layout" in store.visualization(key, "mind_map")
+    assert store.visualization("0" * 24, "cards") is None
+
+@pytest.fixture
+def client(server):
+    return server[0].app.test_client()
+
+def test_visualization_endpoint_revalidates_with_the_etag(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    response = client.get(f"/api/analysis/{key}/cards")
+    assert response.status_code == 200
+    assert response.get_json()["visualization"]["cards"]
+    etag = response.headers["ETag"]
+
+    repeat = client.get(f"/api/analysis/{key}/cards", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304 and repeat.headers["ETag"] == etag
+    assert client.get(f"/api/analysis/{key}/timeline").headers["ETag"] != etag
+
+def test_unknown_analyses_are_404_even_with_a_matching_etag(client, server):
+    unknown = "0" * 24
+    etag = f'"{server[0].analysis_store.etag(unknown, "cards")}"'
+    assert client.get(f"/api/analysis/{unknown}/cards", headers={"If-None-Match": etag}).status_code == 404
+    assert client.get(f"/api/analysis/{unknown}/cards").status_code == 404
+
+def test_unknown_visualization_types_are_rejected(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    assert client.get(f"/api/analysis/{key}/histogram").status_code == 400
+
+def test_analyze_hands_out_ids_for_fetching_visualizations_later(client):
+    data = client.post("/api/analyze", json={"idea": "A tool library", "template": "swot", "formats": []}).get_json()
+    assert data["visualizations"] == {}
+    response = client.get(f"/api/analysis/{data['analysisId']}/timeline")
+    assert response.status_code == 200
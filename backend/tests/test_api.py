@@ -0,0 +1,71 @@
+import gzip
+import json
+import pytest
+from starlette.testclient import TestClient
+
+@pytest.fixture
+def flask_client(server):
+    return server[0].app.test_client()
+
+@pytest.fixture
+def asgi_client(server):
+    with TestClient(server[1].app) as client:
+        yield client
+
+def analyze(client, idea, **body):
+    return client.post("/api/analyze", json=dict(body, idea=idea))
+
+@pytest.mark.parametrize("entry", ["flask", "asgi"])
+def test_analyze_returns_the_analysis_and_its_visualizations(entry, flask_client, asgi_client):
+    client = flask_client if entry == "flask" else asgi_client
+    response = analyze(client, f"A bike repair subscription ({entry})", formats=["mind_map", "cards"])
+    assert response.status_code == 200
+    data = response.json() if entry == "asgi" else response.get_json()
+    assert set(data) == {"title", "idea", "analysisId", "rawAnalysis", "structuredData",
+                         "visualizations", "model", "processingTime"}
+    assert set(data["visualizations"]) == {"mindMap", "cards"}
+    assert data["structuredData"]
+
+@pytest.mark.parametrize("entry", ["flask", "asgi"])
+def test_field_selection_skips_unselected_work(entry, server, flask_client, asgi_client, monkeypatch):
+    client = flask_client if entry == "flask" else asgi_client
+    saved = []
+    monkeypatch.setattr(server[0].analysis_store, "save", lambda *args: saved.append(args))
+    response = client.post("/api/analyze?fields=title,model", json={"idea": f"A seed library ({entry})"})
+    data = response.json() if entry == "asgi" else response.get_json()
+    assert set(data) == {"title", "model"}
+    # No analysis ID was asked for, so nothing is stored
+    assert saved == []
+
+def test_both_entry_points_answer_a_repeat_alike(flask_client, asgi_client):
+    idea = "A shared tool shed for apartment blocks"
+    first = analyze(flask_client, idea, fields=["title", "structuredData", "model"]).get_json()
+    # The repeat comes from the analysis cache and then from the response cache
+    for _ in range(2):
+        assert analyze(asgi_client, idea, fields=["title", "structuredData", "model"]).json() == first
+
+def test_gzip_accepting_clients_get_the_same_json(asgi_client):
+    response = asgi_client.post(
+        "/api/analyze", json={"idea": "A meal-prep coop for night shift workers"},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.content)["idea"] == "A meal-prep coop for night shift workers"
+
+@pytest.mark.parametrize("body, status", [({}, 400), ({"idea": "x", "template": "nope"}, 404),
+                                          ({"idea": "x", "model": "nope"}, 400)])
+def test_bad_requests_are_rejected_alike(body, status, flask_client, asgi_client):
+    assert flask_client.post("/api/analyze", json=body).status_code == status
+    assert asgi_client.post("/api/analyze", json=body).status_code == status
+
+def test_asgi_startup_warms_only_the_async_client(server, monkeypatch):
+    warmed = []
+    processor = server[0].llm_processor
+    monkeypatch.setattr(processor, "warm_up", lambda: warmed.append("sync"))
+
+    async def awarm_up():
+        warmed.append("async")
+    monkeypatch.setattr(processor, "awarm_up", awarm_up)
+    with TestClient(server[1].app):
+        pass
+    assert warmed == ["async"]
@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+import pytest
+
+@pytest.fixture
+def client(server):
+    return server[0].app.test_client()
+
+def batch(client, body):
+    response = client.post("/api/analyze/batch", json=body)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_every_item_gets_a_line_and_bad_items_do_not_fail_the_batch(client):
+    lines = batch(client, {"items": [
+        {"idea": "A tool library", "template": "swot"},
+        {"template": "swot"},
+        {"idea": "A tool library", "template": "nope"},
+        {"idea": "A tool library", "model": "nope"},
+        {"idea": "A seed bank", "template": "swot", "formats": ["cards"]}
+    ]})
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2, 3, 4]
+    assert [by_index[index]["status"] for index in range(5)] == ["ok", "error", "error", "error", "ok"]
+    assert by_index[2]["error"] == "Unknown template: nope"
+    assert "cards" in by_index[4]["result"]["visualizations"]
+    assert by_index[4]["result"]["analysisId"]
+
+def test_cached_items_come_first(client):
+    batch(client, {"items": [{"idea": "A bike kitchen", "template": "swot"}]})
+    lines = batch(client, {"items": [
+        {"idea": "A brand new repair idea", "template": "swot"},
+        {"idea": "A bike kitchen", "template": "swot"}
+    ]})
+    assert [line["index"] for line in lines] == [1, 0]
+
+def test_concurrency_is_bounded(client, server, monkeypatch):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    analyze = server[0].llm_processor.process_idea
+
+    def process_idea(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        try:
+            return analyze(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(server[0].llm_processor, "process_idea", process_idea)
+    lines = batch(client, {"concurrency": 2, "items": [
+        {"idea": f"Bounded batch idea {index}", "template": "swot"} for index in range(6)
+    ]})
+    assert all(line["status"] == "ok" for line in lines)
+    assert peak[0] == 2
+
+def test_llm_failures_are_reported_per_item(client, server, monkeypatch):
+    from rate_limiter import RateLimitExceeded
+
+    def process_idea(*args, **kwargs):
+        raise RateLimitExceeded(2.5)
+
+    monkeypatch.setattr(server[0].llm_processor, "process_idea", process_idea)
+    line, = batch(client, {"items": [{"idea": "A quota-bound batch idea", "template": "swot"}]})
+    assert (line["status"], line["error"], line["retryAfter"]) == ("error", "Rate limit reached", 3)
+
+@pytest.mark.parametrize("body", [{}, {"items": []}, {"items": [{"idea": "x"}], "concurrency": "many"}])
+def test_invalid_batches_are_rejected(client, body):
+    assert client.post("/api/analyze/batch", json=body).status_code == 400
@@ -0,0 +1,105 @@
+import time
+from cache import LRUCache, SQLiteCache, TieredCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=60, num_shards=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_expires_entries():
+    evicted = []
+    cache = LRUCache(ttl=0.01)
+    cache.add_eviction_listener(evicted.append)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a", "gone") == "gone"
+    assert evicted == ["a"]
+
+def test_lru_skips_values_over_the_byte_budget():
+    cache = LRUCache(max_bytes=1024, ttl=60, num_shards=1)
+    cache.set("big", "x" * 4096)
+    assert cache.get("big") is None
+
+def test_lru_shards_add_up_to_the_configured_budget():
+    cache = LRUCache(max_entries=13, max_bytes=1003, num_shards=4)
+    assert sum(shard.max_entries for shard in cache._shards) == 13
+    assert sum(shard.max_bytes for shard in cache._shards) == 1003
+    assert [shard.max_entries for shard in cache._shards] == [4, 3, 3, 3]
+
+def test_lru_small_budget_uses_fewer_shards():
+    cache = LRUCache(max_entries=3, num_shards=8)
+    assert [shard.max_entries for shard in cache._shards] == [1, 1, 1]
+    for key in "abc":
+        cache.set(key, key)
+    assert len(cache) <= 3
+
+def test_contains_sees_live_keys_only(tmp_path):
+    l1 = LRUCache(ttl=60)
+    l2 = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    for cache in (l1, l2, TieredCache(LRUCache(ttl=60), SQLiteCache(str(tmp_path / "tiered.sqlite3"), ttl=60))):
+        cache.set("live", [1, 2])
+        cache.set("expired", [3], ttl=0.01)
+        time.sleep(0.02)
+        assert cache.contains("live")
+        assert not cache.contains("expired")
+        assert not cache.contains("missing")
+
+def test_tiered_contains_falls_back_to_l2(tmp_path):
+    l2 = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    l2.set("shared", {"a": 1})
+    assert TieredCache(LRUCache(ttl=60), l2).contains("shared")
+
+def test_sqlite_corrupt_row_is_a_miss(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.set("key", {"a": 1})
+    cache._connect().execute("UPDATE cache SET value = ? WHERE key = ?", ('{"a": ', "key"))
+
+    assert cache.wait_for("key", 0.1) is None
+    assert not cache.contains("key")
+
+    cache._connect().execute(
+        "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?)", ("key", "[1,", time.time() + 60)
+    )
+    assert cache.get_with_expiry("key") is None
+    assert cache.get("key", "default") == "default"
+    assert not cache.contains("key")
+
+def test_tiered_workers_share_entries_through_l2(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first = TieredCache(LRUCache(ttl=60), SQLiteCache(path, ttl=60))
+    second = TieredCache(LRUCache(ttl=60), SQLiteCache(path, ttl=60))
+    first.set("analysis", ["raw", {"Goals": ["ship"]}])
+
+    assert second.get("analysis") == ["raw", {"Goals": ["ship"]}]
+    # The L2 hit was promoted into the second worker's L1
+    assert second.l1.get("analysis") == ["raw", {"Goals": ["ship"]}]
+
+def test_tiered_promotion_keeps_the_remaining_lifetime(tmp_path):
+    l2 = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    l2.set("short", 1, ttl=0.05)
+    cache = TieredCache(LRUCache(ttl=60), l2)
+    assert cache.get("short") == 1
+    time.sleep(0.1)
+    assert cache.get("short") is None
+
+def test_only_one_worker_holds_a_lease(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first, second = SQLiteCache(path, ttl=60), SQLiteCache(path, ttl=60)
+    assert first.acquire_lease("key", 60)
+    assert not second.acquire_lease("key", 60)
+    first.set("key", "done")
+    assert second.wait_for("key", 1, poll_interval=0.01) == "done"
+
+def test_second_worker_reuses_the_first_workers_analysis(make_processor, tmp_path):
+    from templates import SWOT_ANALYSIS_TEMPLATE
+    settings = dict(CACHE_BACKEND="tiered", CACHE_DB_PATH=str(tmp_path / "analyses.sqlite3"))
+    first, second = make_processor(**settings), make_processor(**settings)
+    analysis = first.process_idea("A repair cafe for laptops", SWOT_ANALYSIS_TEMPLATE)
+
+    assert second.process_idea("A repair cafe for laptops", SWOT_ANALYSIS_TEMPLATE) == analysis
+    assert all(stats["attempts"] == 0 for stats in second.resilience_stats()["models"].values())
@@ -0,0 +1,73 @@
+import json
+import time
+import httpx
+import pytest
+from fake_llm import (FakeChatModel, FakeProviderError, LatencyProfile, apply_limits, create_server,
+                      synthesize_response, tokenize)
+from section_parser import SectionParser
+from templates import END_MARKER, SWOT_ANALYSIS_TEMPLATE, parse_template_sections
+
+PROMPT = SWOT_ANALYSIS_TEMPLATE.replace("{idea}", "A tool library")
+
+def instant(**settings):
+    return FakeChatModel(**dict(dict(ttft=0, tokens_per_sec=0, jitter=0), **settings))
+
+def test_responses_are_deterministic_per_prompt_and_seed():
+    assert synthesize_response(PROMPT) == synthesize_response(PROMPT)
+    assert synthesize_response(PROMPT) != synthesize_response(PROMPT, seed=1)
+    assert synthesize_response(PROMPT) != synthesize_response(PROMPT + " tweak")
+
+def test_responses_follow_the_template_sections():
+    sections = SectionParser().parse(synthesize_response(PROMPT))
+    assert list(sections) == [section["title"] for section in parse_template_sections(PROMPT)]
+
+def test_tokens_concatenate_back_to_the_text():
+    text = synthesize_response(PROMPT)
+    assert "".join(tokenize(text)) == text
+
+def test_limits_cut_at_max_tokens_or_the_stop_sequence():
+    tokens = tokenize("one two three four")
+    assert apply_limits(tokens, max_tokens=2) == (["one", " two"], "length")
+    assert apply_limits(tokens, stop=[" three"]) == (["one", " two"], "stop")
+
+def test_end_marker_is_followed_by_chatter_the_stop_sequence_removes():
+    prompt = PROMPT + "\n" + END_MARKER
+    answer = instant().invoke(prompt, stop=[END_MARKER]).content
+    assert END_MARKER in synthesize_response(prompt)
+    assert END_MARKER not in answer
+    assert answer == synthesize_response(prompt).split(END_MARKER)[0]
+
+def test_stream_and_invoke_agree():
+    model = instant()
+    message = model.invoke(PROMPT)
+    assert "".join(chunk.content for chunk in model.stream(PROMPT)) == message.content
+    assert message.usage_metadata["output_tokens"] == len(tokenize(message.content))
+
+def test_latency_follows_the_profile():
+    model = instant(ttft=0.1, tokens_per_sec=10000)
+    start = time.perf_counter()
+    model.invoke(PROMPT)
+    assert 0.1 <= time.perf_counter() - start < 1.0
+
+def test_error_rate_raises_provider_errors():
+    with pytest.raises(FakeProviderError) as info:
+        instant(error_rate=1.0).invoke(PROMPT)
+    assert info.value.status_code in (429, 503)
+    profile = LatencyProfile(error_rate=0.0)
+    for _ in range(100):
+        profile.maybe_fail()
+
+def test_http_server_speaks_the_chat_completions_api(fake_server):
+    request = {"model": "fake", "messages": [{"role": "user", "content": PROMPT}]}
+    response = httpx.post(f"{fake_server}/openai/v1/chat/completions", json=request)
+    assert response.status_code == 200
+    completion = response.json()
+    assert completion["choices"][0]["message"]["content"] == synthesize_response(PROMPT)
+    assert completion["usage"]["completion_tokens"] == len(tokenize(synthesize_response(PROMPT)))
+
+    url = f"{fake_server}/openai/v1/chat/completions"
+    with httpx.stream("POST", url, json=dict(request, stream=True)) as stream:
+        lines = [line[len("data: "):] for line in stream.iter_lines() if line.startswith("data: ")]
+    assert lines[-1] == "[DONE]"
+    deltas = [json.loads(line)["choices"][0]["delta"] for line in lines[:-1]]
+    assert "".join(delta.get("content", "") for delta in deltas) == synthesize_response(PROMPT)
@@ -0,0 +1,42 @@
+import asyncio
+from http_pool import http_settings_from_env, create_http_clients, warm_up, awarm_up
+
+def settings(monkeypatch, **values):
+    for name, value in values.items():
+        monkeypatch.setenv(name, str(value))
+    return http_settings_from_env()
+
+def test_settings_are_read_from_the_environment(monkeypatch):
+    pool = settings(monkeypatch, GROQ_POOL_SIZE=8, GROQ_READ_TIMEOUT=30, GROQ_HTTP2="true")
+    assert pool["pool_size"] == pool["keepalive_connections"] == 8
+    assert pool["read_timeout"] == 30.0
+    assert pool["http2"] is True
+    assert pool["warmup_connections"] == 0
+
+def test_clients_share_the_configured_limits(monkeypatch):
+    client, async_client = create_http_clients(settings(monkeypatch, GROQ_POOL_SIZE=4, GROQ_READ_TIMEOUT=7))
+    assert client.timeout.read == async_client.timeout.read == 7.0
+    client.close()
+    asyncio.run(async_client.aclose())
+
+def test_warm_up_opens_the_configured_connections(monkeypatch, fake_server):
+    pool = settings(monkeypatch, GROQ_BASE_URL=fake_server, GROQ_POOL_SIZE=3, GROQ_WARMUP_CONNECTIONS=5)
+    client, async_client = create_http_clients(pool)
+    # Never more than the pool holds
+    assert warm_up(client, pool, "key") == 3
+    assert asyncio.run(awarm_up(async_client, pool, "key")) == 3
+    client.close()
+
+def test_warm_up_is_off_by_default_and_survives_an_unreachable_provider(monkeypatch):
+    pool = settings(monkeypatch, GROQ_BASE_URL="http://127.0.0.1:9", GROQ_CONNECT_TIMEOUT=0.5)
+    client, _ = create_http_clients(pool)
+    assert warm_up(client, pool) == 0
+    assert warm_up(client, dict(pool, warmup_connections=2)) == 0
+
+def test_groq_provider_runs_over_the_pooled_client(make_processor, fake_server):
+    from templates import SWOT_ANALYSIS_TEMPLATE
+    processor = make_processor(LLM_PROVIDER="groq", GROQ_API_KEY="test-key", GROQ_BASE_URL=fake_server,
+                               GROQ_WARMUP_CONNECTIONS=2)
+    assert processor.warm_up() == 2
+    raw_analysis, structured_data, _ = processor.process_idea("A tool library", SWOT_ANALYSIS_TEMPLATE)
+    assert list(structured_data) == ["Strengths", "Weaknesses", "Opportunities", "Threats"]
@@ -0,0 +1,121 @@
+import math
+import pytest
+from viz_utils import format_for_mindmap, find_mind_map_node, prune_mind_map
+from mind_map_layout import layout_mind_map, render_mind_map_svg, node_id, RING_SPACING
+
+ANALYSIS = {
+    "Goals": ["Ship the pilot", "Find partners", "Raise a seed round"],
+    "Risks": ["Slow adoption <early>"],
+    "Market": "Students & young professionals"
+}
+
+@pytest.fixture
+def mind_map():
+    return format_for_mindmap(ANALYSIS)
+
+@pytest.fixture
+def client(server):
+    return server[0].app.test_client()
+
+def test_node_ids_follow_the_node_paths():
+    assert node_id("") == "node"
+    assert node_id("2/0") == "node_2_0"
+
+def test_layout_places_every_node_once_depth_first(mind_map):
+    layout = layout_mind_map(mind_map)
+    nodes = layout["nodes"]
+    assert len(nodes) == 1 + 3 + 5
+    assert [node["path"] for node in nodes[:4]] == ["", "0", "0/0", "0/1"]
+    assert len({node["id"] for node in nodes}) == len(nodes)
+    assert nodes[0]["parent"] is None and nodes[1]["parent"] == "node"
+    assert all(0 <= node["x"] <= layout["width"] and 0 <= node["y"] <= layout["height"] for node in nodes)
+
+def test_each_level_sits_on_its_own_ring(mind_map):
+    layout = layout_mind_map(mind_map)
+    center = layout["width"] / 2
+    for node in layout["nodes"]:
+        radius = math.hypot(node["x"] - center, node["y"] - center)
+        assert radius == pytest.approx(node["level"] * RING_SPACING, abs=0.2)
+
+def test_subtrees_are_laid_out_under_their_own_path(mind_map):
+    layout = layout_mind_map(mind_map["children"][0], "0")
+    assert [node["id"] for node in layout["nodes"]] == ["node_0", "node_0_0", "node_0_1", "node_0_2"]
+
+def test_svg_draws_every_node_and_escapes_labels(mind_map):
+    layout = layout_mind_map(mind_map)
+    svg = render_mind_map_svg(layout)
+    assert svg.startswith("<svg") and svg.endswith("</svg>")
+    assert svg.count("<circle") == len(layout["nodes"])
+    assert svg.count("<line") == len(layout["nodes"]) - 1
+    assert "Slow adoption &lt;early&gt;" in svg
+    assert "Students &amp; young professionals" in svg
+
+def test_long_labels_are_shortened_but_kept_in_the_title():
+    label = "A very long goal that does not fit on one line of the drawing"
+    svg = render_mind_map_svg(layout_mind_map(format_for_mindmap({"Goals": [label]})))
+    assert f"<title>{label}</title>" in svg
+    assert f">{label}</text>" not in svg and "…</text>" in svg
+
+def test_svg_endpoint_serves_the_drawing_with_an_etag(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    response = client.get(f"/api/analysis/{key}/mind_map.svg")
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert response.get_data(as_text=True).startswith("<svg")
+    etag = response.headers["ETag"]
+
+    repeat = client.get(f"/api/analysis/{key}/mind_map.svg", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304 and repeat.headers["ETag"] == etag
+    assert client.get(f"/api/analysis/{'0' * 24}/mind_map.svg").status_code == 404
+
+def test_find_mind_map_node_follows_child_positions(mind_map):
+    assert find_mind_map_node(mind_map, "") is mind_map
+    assert find_mind_map_node(mind_map, "0/2")["name"] == "Raise a seed round"
+    assert find_mind_map_node(mind_map, "0/3") is None
+    assert find_mind_map_node(mind_map, "x") is None
+
+def test_pruning_limits_depth_and_marks_cut_nodes(mind_map):
+    pruned = prune_mind_map(mind_map, depth=1)
+    assert [child["children"] for child in pruned["children"]] == [[], [], []]
+    assert pruned["children"][0]["path"] == "0" and pruned["children"][0]["childCount"] == 3
+    assert "path" not in pruned
+    # The stored mind map is left alone
+    assert len(mind_map["children"][0]["children"]) == 3
+
+def test_pruning_limits_children_per_node(mind_map):
+    pruned = prune_mind_map(mind_map, max_children=2)
+    assert len(pruned["children"]) == 2 and pruned["childCount"] == 3 and pruned["path"] == ""
+    assert len(pruned["children"][0]["children"]) == 2
+    assert "childCount" not in pruned["children"][1]
+
+def test_expanded_nodes_show_all_their_children(mind_map):
+    pruned = prune_mind_map(mind_map, depth=1, max_children=1, expand=["", "0"])
+    assert len(pruned["children"]) == 3
+    assert len(pruned["children"][0]["children"]) == 3
+    assert pruned["children"][1]["children"] == []
+
+def test_subtree_endpoint_returns_the_node_laid_out(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    data = client.get(f"/api/analysis/{key}/mindmap/0?maxChildren=1").get_json()
+    visualization = data["visualization"]
+    assert data["path"] == "0"
+    assert visualization["name"].endswith("Goals") and visualization["childCount"] == 3
+    assert [node["id"] for node in visualization["layout"]["nodes"]] == ["node_0", "node_0_0"]
+
+def test_top_levels_endpoint_revalidates_per_view(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    response = client.get(f"/api/analysis/{key}/mindmap?depth=1")
+    assert all(child["children"] == [] for child in response.get_json()["visualization"]["children"])
+    etag = response.headers["ETag"]
+    assert client.get(f"/api/analysis/{key}/mindmap?depth=1", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/analysis/{key}/mindmap?depth=2").headers["ETag"] != etag
+
+@pytest.mark.parametrize("query", ["/x", "/0/-1", "?depth=-1", "?maxChildren=0", "?expand=a"])
+def test_bad_paths_and_limits_are_rejected(query, client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    assert client.get(f"/api/analysis/{key}/mindmap{query}").status_code == 400
+
+def test_unknown_analyses_and_nodes_are_404(client, server):
+    key = server[0].analysis_store.save("raw", ANALYSIS)
+    assert client.get(f"/api/analysis/{key}/mindmap/9").status_code == 404
+    assert client.get(f"/api/analysis/{'0' * 24}/mindmap").status_code == 404
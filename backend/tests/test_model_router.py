@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import pytest
+from model_router import ModelRouter, UnknownModelError, create_model_router
+from templates import BUSINESS_IDEA_TEMPLATE, SWOT_ANALYSIS_TEMPLATE
+
+SWOT = SimpleNamespace(name="swot_analysis", template=SWOT_ANALYSIS_TEMPLATE)
+BUSINESS = SimpleNamespace(name="business_idea", template=BUSINESS_IDEA_TEMPLATE)
+
+def slow_down(router, model, seconds=60.0):
+    for _ in range(router.min_samples):
+        router.record(model, seconds)
+
+def test_fast_routing_is_off_without_a_fast_model(monkeypatch):
+    monkeypatch.delenv("FAST_MODEL_NAME", raising=False)
+    router = create_model_router("quality-model")
+    assert router.fast_model == "quality-model"
+    assert router.route(SWOT) == ["quality-model"]
+
+def test_short_templates_go_to_a_configured_fast_model(monkeypatch):
+    monkeypatch.setenv("FAST_MODEL_NAME", "fast-model")
+    monkeypatch.setenv("FAST_TEMPLATE_MAX_SECTIONS", "4")
+    router = create_model_router("quality-model")
+    assert router.route(SWOT) == ["fast-model", "quality-model"]
+    assert router.route(BUSINESS) == ["quality-model", "fast-model"]
+
+def test_template_setting_and_request_override_the_section_count(monkeypatch):
+    monkeypatch.setenv("MODEL_SWOT_ANALYSIS", "quality")
+    router = ModelRouter("quality-model", fast_model="fast-model")
+    assert router.template_model(SWOT) == "quality-model"
+    assert router.route(BUSINESS, "fast")[0] == "fast-model"
+    with pytest.raises(UnknownModelError):
+        router.route(BUSINESS, "no-such-model")
+
+def test_slow_model_is_tried_after_a_fallback_that_meets_the_slo():
+    router = ModelRouter("quality-model", fast_model="fast-model", slo=1.0, probe_rate=0)
+    slow_down(router, "quality-model")
+    assert router.route(BUSINESS, key="idea") == ["fast-model", "quality-model"]
+    # The analysis is still meant for the quality model
+    assert router.preferred(BUSINESS) == "quality-model"
+    # A model asked for by the request is never swapped out
+    assert router.route(BUSINESS, "quality", key="idea")[0] == "quality-model"
+
+def test_probe_share_is_fixed_per_key():
+    router = ModelRouter("quality-model", fast_model="fast-model", slo=1.0, probe_rate=0.5)
+    slow_down(router, "quality-model")
+    for key in ("one idea", "another idea", "a third idea"):
+        assert len({router.route(BUSINESS, key=key)[0] for _ in range(5)}) == 1
+
+def test_cache_key_follows_the_requested_tier_not_the_latency_pick(make_processor):
+    processor = make_processor(FAST_MODEL_NAME="llama3-8b-8192", MODEL_LATENCY_SLO=1, MODEL_PROBE_RATE=0)
+    idea = "A marketplace for used lab equipment"
+    before = processor.route(idea, BUSINESS_IDEA_TEMPLATE)
+    slow_down(processor.router, processor.model_name)
+    after = processor.route(idea, BUSINESS_IDEA_TEMPLATE)
+    assert (before[1][0], after[1][0]) == (processor.model_name, "llama3-8b-8192")
+    assert after[2] == before[2]
+    assert processor.route(idea, BUSINESS_IDEA_TEMPLATE, "fast")[2] != before[2]
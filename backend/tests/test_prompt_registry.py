@@ -0,0 +1,49 @@
+import templates
+from fake_llm import FakeChatModel
+from prompt_registry import PromptRegistry
+from templates import SWOT_ANALYSIS_TEMPLATE, END_MARKER
+
+def registry():
+    return PromptRegistry(FakeChatModel(ttft=0, tokens_per_sec=0, jitter=0))
+
+def test_templates_are_compiled_once():
+    prompts = registry()
+    prompts.warm({"swot": SWOT_ANALYSIS_TEMPLATE})
+    compiled = prompts.get(SWOT_ANALYSIS_TEMPLATE)
+    assert compiled.name == "swot"
+    assert prompts.get(SWOT_ANALYSIS_TEMPLATE) is compiled
+    assert compiled.bind(512) is compiled.bind(512)
+    assert compiled.bind(512) is not compiled.bind(1024)
+
+def test_unknown_templates_are_compiled_on_first_use():
+    prompts = registry()
+    compiled = prompts.get("💡 **Pitch**\nPitch {idea} in one line.")
+    assert prompts.get("💡 **Pitch**\nPitch {idea} in one line.") is compiled
+    assert compiled.name is None
+
+def test_edited_templates_get_a_new_fingerprint():
+    prompts = registry()
+    original = prompts.get(SWOT_ANALYSIS_TEMPLATE)
+    edited = prompts.get(SWOT_ANALYSIS_TEMPLATE + "\nKeep it short.")
+    assert original.fingerprint != edited.fingerprint
+
+def test_the_prompt_asks_for_the_end_marker_and_stops_there():
+    compiled = registry().get(SWOT_ANALYSIS_TEMPLATE)
+    assert END_MARKER in compiled.prompt.format(idea="A tool library")
+    answer = compiled.invoke("A tool library", 4096).content
+    assert END_MARKER not in answer and answer.strip()
+
+def test_followups_share_their_parents_key_and_are_not_kept():
+    prompts = registry()
+    compiled = prompts.get(SWOT_ANALYSIS_TEMPLATE)
+    first = prompts.followup(compiled, "💪 **Strengths**\nList strengths of {idea}.")
+    second = prompts.followup(compiled, "⚠️ **Threats**\nList threats to {idea}.")
+    assert first.key == second.key == f"{compiled.key}:followup"
+    assert prompts.get("💪 **Strengths**\nList strengths of {idea}.") is not first
+
+def test_updated_templates_are_recompiled_by_the_processor(make_processor, monkeypatch):
+    monkeypatch.setattr(templates, "_TEMPLATES", dict(templates._TEMPLATES))
+    processor = make_processor()
+    templates.add_template("pitch", "💡 **Pitch**\nPitch {idea} in one line.")
+    compiled = processor.prompts[processor.model_name].get(templates.get_template("pitch"))
+    assert compiled.name == "pitch"
@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import pytest
+from rate_limiter import (RateLimiter, RateLimitExceeded, SQLiteBucketStore, INTERACTIVE, BATCH,
+                          estimate_tokens)
+
+def locked():
+    raise sqlite3.OperationalError("database is locked")
+
+def test_sqlite_store_falls_back_to_memory_when_locked(tmp_path):
+    store = SQLiteBucketStore(str(tmp_path / "buckets.sqlite3"))
+    store._connect = locked
+    bucket = [("rpm", 2.0, 1.0, 1.0, 0.0)]
+
+    assert store.take(bucket) == 0.0
+    assert store.take(bucket) == 0.0
+    # The in-memory buckets still enforce the quota
+    assert store.take(bucket) > 0
+    store.drain(["rpm"])
+    assert store.stats()["errors"] == 4
+
+def limiter(**settings):
+    return RateLimiter(**dict(dict(headroom=1.0, batch_reserve=0.0), **settings))
+
+def test_disabled_limiter_never_waits():
+    assert not RateLimiter().enabled
+    assert RateLimiter().acquire(10 ** 9) == 0.0
+
+def test_calls_wait_for_the_bucket_to_refill():
+    rate = limiter(rpm=1200)
+    for _ in range(1200):
+        rate.acquire(1)
+    # Refills at 20 requests a second
+    assert 0.02 <= rate.acquire(1) < 0.5
+
+def test_calls_that_cannot_fit_in_time_are_rejected_with_a_429():
+    rate = limiter(rpm=6, max_wait=0.1)
+    rate.drain()
+    with pytest.raises(RateLimitExceeded) as info:
+        rate.acquire(1)
+    assert info.value.status_code == 429 and info.value.retry_after > 0
+    with pytest.raises(RateLimitExceeded):
+        rate.acquire(1, max_wait=0.05)
+    assert rate.stats()["lanes"][INTERACTIVE]["rejected"] == 2
+
+def test_token_quota_and_models_are_separate():
+    rate = limiter(tpm=1000, max_wait=0)
+    rate.acquire(1000, model="quality")
+    with pytest.raises(RateLimitExceeded):
+        rate.acquire(10, model="quality")
+    assert rate.acquire(1000, model="fast") < 0.05
+
+def test_batch_calls_leave_the_reserve_to_interactive_ones():
+    rate = limiter(rpm=10, batch_reserve=0.5, max_wait=0, batch_max_wait=0)
+    for _ in range(5):
+        rate.acquire(1, BATCH)
+    with pytest.raises(RateLimitExceeded):
+        rate.acquire(1, BATCH)
+    for _ in range(5):
+        rate.acquire(1, INTERACTIVE)
+
+def test_batch_calls_yield_to_waiting_interactive_ones():
+    rate = limiter(rpm=600, batch_max_wait=5)
+    rate.drain()
+    order = []
+
+    def call(lane):
+        rate.acquire(1, lane)
+        order.append(lane)
+
+    interactive = threading.Thread(target=call, args=(INTERACTIVE,))
+    batch = threading.Thread(target=call, args=(BATCH,))
+    interactive.start()
+    time.sleep(0.01)
+    batch.start()
+    interactive.join()
+    batch.join()
+    assert order == [INTERACTIVE, BATCH]
+
+def test_async_acquire_waits_without_blocking_the_loop():
+    rate = limiter(rpm=600)
+    rate.drain()
+
+    async def main():
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        waited, _ = await asyncio.gather(rate.aacquire(1), tick())
+        return waited, ticks
+
+    waited, ticks = asyncio.run(main())
+    assert waited > 0.05 and len(ticks) == 5
+
+def test_workers_share_sqlite_buckets(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    first = limiter(rpm=2, max_wait=0, store=SQLiteBucketStore(path))
+    second = limiter(rpm=2, max_wait=0, store=SQLiteBucketStore(path))
+    first.acquire(1)
+    second.acquire(1)
+    with pytest.raises(RateLimitExceeded):
+        first.acquire(1)
+
+def test_token_estimate_covers_the_prompt_and_a_completion_per_section():
+    from templates import SWOT_ANALYSIS_TEMPLATE
+    rate = limiter(tokens_per_section=100)
+    assert rate.estimate(SWOT_ANALYSIS_TEMPLATE, "") == estimate_tokens(SWOT_ANALYSIS_TEMPLATE) + 400 + 1
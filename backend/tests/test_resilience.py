@@ -0,0 +1,139 @@
+import asyncio
+import time
+import pytest
+from resilience import ResilientCaller, CircuitBreaker, DeadlineExceeded, CircuitOpenError, ProviderError
+from rate_limiter import RateLimitExceeded, INTERACTIVE, BATCH
+from templates import BUSINESS_IDEA_TEMPLATE
+
+def slow_llm(seconds, calls=None):
+    """A fake provider call that takes seconds to answer, like a stalled read."""
+    def invoke(timeout):
+        if calls is not None:
+            calls.append(timeout)
+        time.sleep(seconds)
+        return "late answer"
+    return invoke
+
+class Unavailable(Exception):
+    status_code = 503
+
+def test_template_deadline_bounds_an_unhedged_call(monkeypatch):
+    monkeypatch.setenv("LLM_DEADLINE_SLOW", "0.2")
+    caller = ResilientCaller(max_retries=0, default_deadline=60, hedge=False)
+    deadline = caller.deadline_for("slow")
+    assert deadline == 0.2
+
+    start = time.time()
+    with pytest.raises(DeadlineExceeded):
+        caller.call(slow_llm(2), "slow", deadline)
+    elapsed = time.time() - start
+
+    # Given up at the template deadline, not when the provider answers
+    assert elapsed < 1.0
+    assert caller.stats()["deadlineExceeded"] == 1
+    assert caller.stats()["abandoned"] == 1
+
+def test_call_within_deadline_returns_the_answer():
+    caller = ResilientCaller(max_retries=0, default_deadline=1, hedge=False)
+    assert caller.call(slow_llm(0.01), "fast", caller.deadline_for(None)) == "late answer"
+
+def test_each_attempt_gets_the_time_left_as_its_timeout():
+    calls = []
+    caller = ResilientCaller(max_retries=0, hedge=False)
+    caller.call(slow_llm(0, calls), "key", 5)
+    assert len(calls) == 1 and 4.5 < calls[0] <= 5
+
+def test_retryable_failures_are_retried_then_reported():
+    attempts = []
+    def failing(timeout):
+        attempts.append(timeout)
+        raise Unavailable("down")
+    caller = ResilientCaller(max_retries=2, backoff_base=0.001, backoff_max=0.001, hedge=False)
+    with pytest.raises(ProviderError) as info:
+        caller.call(failing, "key", 5)
+    assert len(attempts) == 3
+    assert info.value.status_code == 503
+
+def test_breaker_opens_after_consecutive_failures():
+    def failing(timeout):
+        raise Unavailable("down")
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    caller = ResilientCaller(max_retries=0, hedge=False, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing, "key", 5)
+    with pytest.raises(CircuitOpenError):
+        caller.call(slow_llm(0), "key", 5)
+
+def test_abandoned_fake_request_stops_at_the_deadline():
+    from fake_llm import FakeChatModel
+    model = FakeChatModel(model_name="fake", ttft=2.0, tokens_per_sec=0, jitter=0)
+    finished = []
+    def invoke(timeout):
+        try:
+            return model.invoke("Describe the idea", timeout=timeout)
+        finally:
+            finished.append(time.time())
+
+    caller = ResilientCaller(max_retries=0, hedge=False)
+    start = time.time()
+    with pytest.raises(DeadlineExceeded):
+        caller.call(invoke, "key", 0.2)
+    time.sleep(0.3)
+    # The request itself gave up at its timeout instead of running for 2s
+    assert finished and finished[0] - start < 1.0
+
+def test_quota_wait_is_a_429_and_not_a_breaker_failure(make_processor):
+    processor = make_processor(GROQ_RPM=1, RATE_LIMIT_HEADROOM=1, LLM_DEADLINE=0.3, LLM_BREAKER_FAILURES=1)
+    for model in processor.router.models:
+        processor.rate_limiter.drain(model)
+    for index in range(3):
+        with pytest.raises(RateLimitExceeded):
+            processor.process_idea(f"A quota-bound idea {index}", BUSINESS_IDEA_TEMPLATE, model="quality")
+    for stats in processor.resilience_stats()["models"].values():
+        assert stats["breaker"]["state"] == "closed"
+        assert stats["attempts"] == 0
+
+def test_quota_wait_is_limited_by_the_deadline_for_interactive_calls(make_processor):
+    processor = make_processor(GROQ_RPM=1, RATE_LIMIT_HEADROOM=1, LLM_DEADLINE=0.3)
+    assert processor._quota_wait(INTERACTIVE, 0.3) == 0.3
+    # Batch work waits up to its own lane limit, then gets the whole deadline
+    assert processor._quota_wait(BATCH, 0.3) is None
+
+def test_a_slow_request_is_hedged_and_the_faster_copy_wins():
+    caller = ResilientCaller(max_retries=0, hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        caller.latencies.record("key", 0.05)
+    delays = iter([1.0, 0.0])
+
+    def invoke(timeout):
+        time.sleep(next(delays))
+        return "answer"
+
+    start = time.time()
+    assert caller.call(invoke, "key", 5) == "answer"
+    assert time.time() - start < 0.5
+    assert caller.stats()["hedges"] == caller.stats()["hedgesWon"] == 1
+
+def test_open_breaker_lets_one_probe_through_after_the_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_async_call_is_bounded_by_the_deadline():
+    caller = ResilientCaller(max_retries=0, hedge=False)
+
+    async def invoke(timeout):
+        await asyncio.sleep(2)
+
+    start = time.time()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(caller.acall(invoke, "key", 0.1))
+    assert time.time() - start < 1.0
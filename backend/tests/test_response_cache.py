@@ -0,0 +1,59 @@
+import gzip
+import time
+from cache import LRUCache
+from response_cache import ResponseCache, response_variant
+
+BODY = b'{"rawAnalysis":"' + b"market users growth " * 100 + b'"}'
+
+def test_variants_tell_apart_formats_fields_and_the_echoed_idea():
+    assert response_variant(["cards", "mind_map"], None, "A") == \
+        response_variant(["mind_map", "cards"], None, "A")
+    assert response_variant(["cards"], None, "A") != response_variant(["cards"], None, "a")
+    # Responses without the idea do not depend on how it was written
+    assert response_variant([], {"title"}, "A") == response_variant([], {"title"}, "a")
+    assert response_variant([], {"title"}) != response_variant([], None)
+
+def test_cached_bodies_are_served_in_the_clients_coding():
+    cache = ResponseCache([])
+    assert cache.get("analysis", "v") is None
+    cache.set("analysis", "v", BODY)
+    assert cache.get("analysis", "v") == (BODY, {"Vary": "Accept-Encoding"})
+    body, headers = cache.get("analysis", "v", "gzip")
+    assert headers["Content-Encoding"] == "gzip" and gzip.decompress(body) == BODY
+    # The compressed form is kept next to the body
+    assert cache.entries.get("analysis|v|gzip") == body
+
+def test_responses_are_dropped_with_the_analysis_they_were_built_from():
+    source = LRUCache(ttl=60)
+    cache = ResponseCache([source])
+    source.set("analysis", ["raw", {}])
+    source.set("analysis:id", ["raw", {}])
+    cache.set("analysis", "v", BODY, "gzip", dependencies=["analysis:id"])
+
+    source.delete("analysis:id")
+    assert cache.get("analysis", "v") is None
+    assert cache.entries.get("analysis|v|gzip") is None
+
+def test_stale_analyses_are_not_cached_and_fresh_ones_not_beyond_their_ttl():
+    cache = ResponseCache([], ttl=60)
+    assert cache.set("stale", "v", BODY, ttl=0)[0] == BODY
+    assert cache.get("stale", "v") is None
+    cache.set("fresh", "v", BODY, ttl=0.05)
+    time.sleep(0.06)
+    assert cache.get("fresh", "v") is None
+
+def test_precompression_stores_every_coding_up_front():
+    cache = ResponseCache([], precompress=True)
+    cache.set("analysis", "v", BODY)
+    assert cache.entries.get("analysis|v|gzip") is not None
+
+def test_repeat_analyze_requests_are_answered_from_the_response_cache(server):
+    client = server[0].app.test_client()
+    request = {"idea": "A repair cafe on wheels", "template": "swot"}
+    first = client.post("/api/analyze", json=request)
+    second = client.post("/api/analyze", json=request)
+    hits = server[0].response_cache.stats()["hits"]
+    third = client.post("/api/analyze", json=request)
+    assert server[0].response_cache.stats()["hits"] == hits + 1
+    assert second.get_data() == third.get_data()
+    assert first.get_json()["structuredData"] == third.get_json()["structuredData"]
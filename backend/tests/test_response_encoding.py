@@ -0,0 +1,46 @@
+import gzip
+import json
+import pytest
+import response_encoding
+from response_encoding import dumps, encode_json, negotiate_encoding, parse_fields, select_fields, wants_field
+
+def test_dumps_is_compact_utf8_json():
+    assert dumps({"idea": "Café", "n": [1, 2]}) == '{"idea":"Café","n":[1,2]}'.encode('utf-8')
+    # Non-string keys are left to the standard library
+    assert json.loads(dumps({1: "a"})) == {"1": "a"}
+
+def test_fields_selection():
+    assert parse_fields("title, model,,") == {"title", "model"}
+    assert parse_fields(["title"]) == {"title"}
+    assert parse_fields("") is None and parse_fields(None) is None
+    assert select_fields({"title": 1, "idea": 2}, {"title"}) == {"title": 1}
+    assert select_fields({"title": 1}, None) == {"title": 1}
+    assert wants_field(None, "visualizations") and not wants_field({"title"}, "visualizations")
+
+@pytest.mark.parametrize("header, coding", [
+    (None, None), ("identity", None), ("gzip", "gzip"), ("gzip;q=0, deflate", None),
+    ("br;q=0.5, gzip", "gzip"), ("*", "br" if response_encoding.brotli else "gzip")
+])
+def test_encoding_negotiation(header, coding):
+    assert negotiate_encoding(header) == coding
+
+def test_only_large_bodies_are_compressed():
+    small_body, small_headers = encode_json({"a": 1}, "gzip")
+    assert small_body == b'{"a":1}' and "Content-Encoding" not in small_headers
+
+    payload = {"rawAnalysis": "market users growth " * 200}
+    body, headers = encode_json(payload, "gzip")
+    assert headers == {"Vary": "Accept-Encoding", "Content-Encoding": "gzip"}
+    assert json.loads(gzip.decompress(body)) == payload
+    assert len(body) < len(dumps(payload)) / 4
+
+def test_compression_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(response_encoding, "COMPRESSION_ENABLED", False)
+    assert negotiate_encoding("gzip") is None
+
+def test_analyze_response_is_gzipped_for_clients_that_accept_it(server):
+    client = server[0].app.test_client()
+    response = client.post("/api/analyze", json={"idea": "A tool library", "template": "swot"},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.get_data()))["idea"] == "A tool library"
@@ -0,0 +1,55 @@
+from section_classifier import (SectionClassifier, section_classifier, EMOJI_MAP, GENERIC_EMOJIS,
+                                SEQUENTIAL_KEYWORDS, EXCLUDED_KEYWORDS, CATEGORY_KEYWORDS,
+                                PHASE, EXCLUDED, GENERAL)
+
+NAMES = ["Project Title", "Key Tasks", "Top Competitors", "Risks", "Phase 1: Build", "Go-To-Market Strategy",
+         "Tools & Technologies", "Revenue Streams", "Roadmap", "Milestone Risks", "Executive Summary", "Threats"]
+
+def naive_emoji(name):
+    lower = name.lower()
+    return next((emoji for keyword, emoji in EMOJI_MAP.items() if keyword in lower), None)
+
+def naive_role(name):
+    lower = name.lower()
+    if any(keyword in lower for keyword in SEQUENTIAL_KEYWORDS):
+        return PHASE
+    if any(keyword in lower for keyword in EXCLUDED_KEYWORDS):
+        return EXCLUDED
+    return GENERAL
+
+def test_one_scan_matches_substring_tests_against_each_table():
+    for name in NAMES:
+        expected = naive_emoji(name)
+        if expected is not None:
+            assert section_classifier.emoji(name) == expected, name
+        assert section_classifier.timeline_role(name) == naive_role(name), name
+
+def test_overlapping_keywords_are_all_found():
+    # "key tasks", "tasks" and "task" overlap; each still counts for its own tables
+    assert section_classifier.timeline_role("Key Tasks") == PHASE
+    assert section_classifier.classify("Key Tasks")["categories"] == ["Planning"]
+    assert section_classifier.emoji("Top Competitors") == "🧠"
+    assert section_classifier.timeline_role("Top Competitors") == EXCLUDED
+
+def test_unmatched_names_get_a_stable_generic_emoji():
+    emoji = section_classifier.emoji("Executive Summary")
+    assert emoji in GENERIC_EMOJIS
+    assert SectionClassifier().emoji("Executive Summary") == emoji
+
+def test_categories_come_from_the_name_and_text_in_table_order():
+    result = section_classifier.classify("Roadmap", "We need a secure platform to grow revenue")
+    assert result["categories"] == list(CATEGORY_KEYWORDS)
+    assert result["timelineRole"] == PHASE
+    assert section_classifier.classify("Executive Summary", "")["categories"] == []
+
+def test_card_categories_agree_with_the_timeline_role():
+    for name in NAMES:
+        result = section_classifier.classify(name)
+        assert result["timelineRole"] == section_classifier.timeline_role(name)
+        assert result["emoji"] == section_classifier.emoji(name)
+
+def test_custom_tables_replace_the_defaults():
+    classifier = SectionClassifier(emoji_map={"sprint": "🏃"}, generic_emojis=["❔"], sequential_keywords=["sprint"],
+                                   excluded_keywords=[], category_keywords={"Agile": ["sprint"]})
+    assert classifier.classify("Sprint Plan") == {"emoji": "🏃", "timelineRole": PHASE, "categories": ["Agile"]}
+    assert classifier.classify("Risks") == {"emoji": "❔", "timelineRole": GENERAL, "categories": []}
@@ -0,0 +1,56 @@
+import time
+from prompt_registry import CompiledTemplate
+from fake_llm import FakeChatModel
+from section_parser import SectionParser
+from templates import (BUSINESS_IDEA_TEMPLATE, SWOT_ANALYSIS_TEMPLATE, END_MARKER, get_section_groups,
+                       parse_template_sections, split_template, stop_sequences)
+
+def titles(template):
+    return [section["title"] for section in parse_template_sections(template)]
+
+def test_parts_cover_the_sections_in_order_in_near_equal_groups():
+    parts = split_template(BUSINESS_IDEA_TEMPLATE, 4)
+    assert [len(titles(part)) for part in parts] == [4, 4, 3, 3]
+    assert sum((titles(part) for part in parts), []) == titles(BUSINESS_IDEA_TEMPLATE)
+
+def test_every_part_keeps_the_preamble_and_closing_instructions():
+    first_header = "**" + titles(BUSINESS_IDEA_TEMPLATE)[0] + "**"
+    preamble = BUSINESS_IDEA_TEMPLATE[:BUSINESS_IDEA_TEMPLATE.index(first_header)].rsplit("\n", 1)[0]
+    closing = BUSINESS_IDEA_TEMPLATE.rstrip("\n")[-40:]
+    for part in split_template(BUSINESS_IDEA_TEMPLATE, 3):
+        assert part.startswith(preamble) and "{idea}" in part
+        assert part.rstrip("\n").endswith(closing)
+
+def test_templates_that_cannot_be_split_stay_whole():
+    assert split_template(SWOT_ANALYSIS_TEMPLATE, 1) == [SWOT_ANALYSIS_TEMPLATE]
+    assert split_template("Describe {idea}.", 4) == ["Describe {idea}."]
+    assert len(split_template(SWOT_ANALYSIS_TEMPLATE, 10)) == 4
+
+def test_groups_are_opt_in_per_template(monkeypatch):
+    assert get_section_groups("business_idea") == 1
+    monkeypatch.setenv("SECTION_GROUPS_BUSINESS_IDEA", "4")
+    assert get_section_groups("business_idea") == 4
+    assert get_section_groups(None) == 1
+
+def test_each_group_stops_at_the_next_groups_first_header():
+    parts = split_template(SWOT_ANALYSIS_TEMPLATE, 2)
+    stops = stop_sequences(parts[1])
+    assert stops[0] == END_MARKER
+    assert "**Opportunities**" in stops[1]
+
+def test_grouped_fingerprint_differs_from_a_single_completion(monkeypatch):
+    llm = FakeChatModel(ttft=0, tokens_per_sec=0, jitter=0)
+    whole = CompiledTemplate(SWOT_ANALYSIS_TEMPLATE, llm, "swot")
+    monkeypatch.setenv("SECTION_GROUPS_SWOT", "2")
+    grouped = CompiledTemplate(SWOT_ANALYSIS_TEMPLATE, llm, "swot")
+    assert len(grouped.parts) == 2 and whole.parts == []
+    assert grouped.fingerprint != whole.fingerprint
+
+def test_groups_run_concurrently_and_join_like_one_answer(make_processor):
+    processor = make_processor(FAKE_LLM_TTFT="0.3", SECTION_GROUPS_BUSINESS_IDEA="4")
+    start = time.time()
+    raw_analysis, structured_data, _ = processor.process_idea("A tool library", BUSINESS_IDEA_TEMPLATE)
+    # Four groups of 0.3s each, run side by side
+    assert time.time() - start < 0.9
+    assert list(structured_data) == titles(BUSINESS_IDEA_TEMPLATE)
+    assert SectionParser().parse(raw_analysis) == structured_data
@@ -0,0 +1,83 @@
+import re
+import time
+import pytest
+from section_parser import SectionParser, match_header, process_section_lines
+
+# The header patterns of the original whole-text parser
+EMOJI_HEADER = re.compile(r'([\u2600-\u27BF\U0001F300-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U0001F800-\U0001F8FF\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]).*?\*\*(.*?)\*\*')
+NUMBERED_HEADER = re.compile(r'(\d+)\.\s+\*\*(.*?)\*\*')
+
+ANALYSIS = """Here is the analysis.
+
+🚀 **Executive Summary**
+A subscription for bike repairs.
+
+1. **Target Market**
+- Commuters
+- Students
+
+📈 **Revenue Model**
+Price: 12 per month
+Churn: 3 percent
+
+2. **Risks**
+Competition from shops.
+"""
+
+def reference_header(line):
+    match = EMOJI_HEADER.search(line)
+    if match:
+        return match.groups()
+    match = NUMBERED_HEADER.search(line)
+    return (None, match.group(2)) if match else None
+
+@pytest.mark.parametrize("line", [
+    "🚀 **Executive Summary**", "1. **Target Market**", "12.  **Long Title** extra", "🚀 no header",
+    "🚀 text 1. **Numbered after emoji**", "a1. **Not a number**", "** 1. **", "plain text",
+    "📈 first 🚀 **Second emoji**", "1. **unclosed", "🚀 **unclosed 2. **Numbered**"
+])
+def test_header_matching_agrees_with_the_original_patterns(line):
+    assert match_header(line) == reference_header(line)
+
+def test_sections_and_their_content_shapes():
+    # As in the original parser, a numbered header or the end of the text
+    # keeps the open section's header dict and adds its content to it, while
+    # an emoji header replaces the open section's value with its content
+    sections = SectionParser().parse(ANALYSIS)
+    assert sections == {
+        "Executive Summary": {"emoji": "🚀", "content": "A subscription for bike repairs."},
+        "Target Market": ["Commuters", "Students"],
+        "Revenue Model": {"emoji": "📈", "content": {"Price": "12 per month", "Churn": "3 percent"}},
+        "Risks": {"content": "Competition from shops."}
+    }
+
+def test_a_section_without_content_keeps_its_header_only():
+    assert SectionParser().parse("🚀 **Summary**\n1. **Market**\n- Students") == {
+        "Summary": {"emoji": "🚀"}, "Market": {"content": ["Students"]}
+    }
+
+@pytest.mark.parametrize("size", [1, 3, 7, 50])
+def test_chunked_feed_matches_a_whole_parse(size):
+    parser = SectionParser()
+    streamed = []
+    for start in range(0, len(ANALYSIS), size):
+        streamed.extend(parser.feed(ANALYSIS[start:start + size]))
+    streamed.extend(parser.close())
+    assert dict(streamed) == parser.sections == SectionParser().parse(ANALYSIS)
+    assert [name for name, _ in streamed] == list(parser.sections)
+
+def test_sections_are_emitted_when_the_next_header_arrives():
+    parser = SectionParser()
+    assert parser.feed("🚀 **Summary**\nShort.\n") == []
+    assert parser.feed("1. **Market**\n") == [("Summary", {"emoji": "🚀", "content": "Short."})]
+
+def test_lone_bullet_marker_makes_a_list():
+    # The marker and its line break matched the original bullet pattern
+    assert process_section_lines(["-", "Students"]) == []
+    assert process_section_lines(["Students", "-"]) == "Students\n-"
+
+def test_pathological_lines_parse_in_linear_time():
+    line = "🚀" + " **" * 20000
+    start = time.perf_counter()
+    SectionParser().parse("\n".join([line, "1. " + "**" * 20000, "1." * 20000]))
+    assert time.perf_counter() - start < 1.0
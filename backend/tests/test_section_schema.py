@@ -0,0 +1,62 @@
+from section_schema import SectionSchema, has_content, normalize_title
+from section_parser import SectionParser
+from templates import SWOT_ANALYSIS_TEMPLATE
+
+SCHEMA = SectionSchema(SWOT_ANALYSIS_TEMPLATE)
+
+def test_titles_match_ignoring_case_spacing_and_punctuation():
+    assert normalize_title("Go-to-Market  Strategy!") == normalize_title("go to market strategy")
+
+def test_missing_and_empty_sections_are_reported_in_template_order():
+    analysis = {"strengths": ["Cheap"], "Weaknesses": {"emoji": "⚠️"}, "Threats": "  ", "Extra": "x"}
+    assert SCHEMA.missing(analysis) == [1, 2, 3]
+    assert SCHEMA.missing({title: "text" for title in SCHEMA.titles}) == []
+    assert SCHEMA.missing("not a dict") == [0, 1, 2, 3]
+
+def test_content_check_looks_past_the_emoji():
+    assert not has_content({"emoji": "💪", "content": []})
+    assert has_content({"emoji": "💪", "content": ["Cheap"]})
+
+def test_followup_asks_for_only_the_missing_sections():
+    followup = SCHEMA.followup_template([1, 3])
+    sections = SectionSchema(followup).titles
+    assert sections == ["Weaknesses", "Threats"]
+    assert "{idea}" in followup
+
+def test_splice_puts_answers_in_template_order_and_keeps_unknown_sections():
+    analysis = {"Strengths": ["Cheap"], "Notes": "kept", "Opportunities": ["Growth"]}
+    answers = {"weaknesses": ["Small"], "Threats": ["Rivals"], "Strengths": ["ignored"], "Junk": "x"}
+    merged, filled = SCHEMA.splice(analysis, answers)
+    assert list(merged) == ["Strengths", "Notes", "weaknesses", "Opportunities", "Threats"]
+    assert merged["Strengths"] == ["ignored"]
+    assert filled == ["Strengths", "weaknesses", "Threats"]
+
+def test_processor_re_asks_for_only_the_sections_an_answer_left_out(make_processor, monkeypatch):
+    processor = make_processor()
+    generate = processor._generate
+
+    def drop_threats(compiled, idea, lane, model):
+        answer = generate(compiled, idea, lane, model)
+        return answer[:answer.index("**Threats**")].rsplit("\n", 1)[0]
+
+    prompts = []
+    call = processor._call
+
+    def spy(caller, compiled, *args):
+        prompts.append(compiled.template)
+        return call(caller, compiled, *args)
+
+    monkeypatch.setattr(processor, "_generate", drop_threats)
+    monkeypatch.setattr(processor, "_call", spy)
+    raw_analysis, structured_data, _ = processor.process_idea("A tool library", SWOT_ANALYSIS_TEMPLATE)
+
+    assert list(structured_data) == SCHEMA.titles
+    # The whole template once, then a follow-up for the missing section
+    assert [SectionSchema(prompt).titles for prompt in prompts] == [SCHEMA.titles, ["Threats"]]
+    assert SectionParser().parse(raw_analysis).keys() == structured_data.keys()
+
+def test_re_ask_can_be_turned_off(make_processor, monkeypatch):
+    processor = make_processor(SECTION_REASK="False")
+    monkeypatch.setattr(processor, "_generate", lambda *args: "💪 **Strengths**\n- Cheap\n")
+    _, structured_data, _ = processor.process_idea("A tool library", SWOT_ANALYSIS_TEMPLATE)
+    assert list(structured_data) == ["Strengths"]
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from singleflight import SingleFlight, AsyncSingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "analysis"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(group.do, "key", work)
+        started.wait()
+        followers = [executor.submit(group.do, "key", work) for _ in range(4)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert calls == [1]
+    assert results[0] == ("analysis", False)
+    assert all(result == ("analysis", True) for result in results[1:])
+    assert group.stats() == {"inFlight": 0, "leaders": 1, "coalesced": 4, "remoteCoalesced": 0}
+
+def test_followers_get_the_leaders_exception():
+    group = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(group.do, "key", fail)
+        started.wait()
+        follower = executor.submit(group.do, "key", fail)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+def test_a_finished_flight_is_not_reused():
+    group = SingleFlight()
+    assert group.do("key", lambda: 1) == (1, False)
+    assert group.do("key", lambda: 2) == (2, False)
+
+def test_async_callers_share_one_task_and_survive_a_cancelled_leader():
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "analysis"
+
+    async def main():
+        leader = asyncio.ensure_future(group.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("key", work))
+        await asyncio.sleep(0)
+        # The leader's client goes away; the work carries on for the follower
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == ("analysis", True)
+    assert calls == [1]
+
+def test_identical_analyses_in_flight_call_the_llm_once(make_processor):
+    from templates import SWOT_ANALYSIS_TEMPLATE
+    processor = make_processor(FAKE_LLM_TTFT="0.2")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(
+            lambda _: processor.process_idea("A bakery for dog treats", SWOT_ANALYSIS_TEMPLATE), range(3)
+        ))
+    assert results[0] == results[1] == results[2]
+    assert processor.single_flight.stats()["leaders"] == 1
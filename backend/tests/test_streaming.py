@@ -0,0 +1,72 @@
+import json
+import pytest
+from starlette.testclient import TestClient
+from templates import SWOT_ANALYSIS_TEMPLATE
+
+def parse_sse(text):
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for message in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def stream(server, entry, body):
+    if entry == "flask":
+        response = server[0].app.test_client().post("/api/analyze/stream", json=body)
+        return response.status_code, response.headers, response.get_data(as_text=True)
+    with TestClient(server[1].app) as client:
+        response = client.post("/api/analyze/stream", json=body)
+        return response.status_code, response.headers, response.text
+
+@pytest.mark.parametrize("entry", ["flask", "asgi"])
+def test_sections_stream_before_the_full_analysis(entry, server):
+    status, headers, body = stream(server, entry, {
+        "idea": f"Community solar for renters ({entry})", "template": "swot", "formats": ["cards"]
+    })
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/event-stream")
+
+    events = parse_sse(body)
+    sections = [data for event, data in events if event == "section"]
+    assert [event for event, _ in events] == ["section"] * len(sections) + ["done"]
+    assert [section["index"] for section in sections] == list(range(len(sections)))
+    assert all("card" in section for section in sections)
+
+    done = events[-1][1]
+    assert [section["name"] for section in sections] == list(done["structuredData"])
+    assert done["analysisId"] and "cards" in done["visualizations"]
+
+def test_a_cached_analysis_is_replayed_section_by_section(make_processor):
+    processor = make_processor()
+    idea = "A library of things for a small town"
+    raw_analysis, structured_data, model = processor.process_idea(idea, SWOT_ANALYSIS_TEMPLATE)
+
+    events = list(processor.stream_idea(idea, SWOT_ANALYSIS_TEMPLATE))
+    assert [event[1] for event in events[:-1]] == list(structured_data)
+    assert events[-1] == ("done", raw_analysis, structured_data, model)
+
+@pytest.mark.parametrize("entry", ["flask", "asgi"])
+def test_bad_stream_requests_fail_before_streaming(entry, server):
+    assert stream(server, entry, {"idea": "x", "template": "nope"})[0] == 404
+    assert stream(server, entry, {})[0] == 400
+
+@pytest.mark.parametrize("entry", ["flask", "asgi"])
+def test_failures_after_the_stream_started_are_an_error_event(entry, server, monkeypatch):
+    from rate_limiter import RateLimitExceeded
+
+    def fail(*args, **kwargs):
+        raise RateLimitExceeded(7)
+        yield
+
+    async def afail(*args, **kwargs):
+        raise RateLimitExceeded(7)
+        yield
+
+    monkeypatch.setattr(server[0].llm_processor, "stream_idea", fail)
+    monkeypatch.setattr(server[0].llm_processor, "astream_idea", afail)
+    status, _, body = stream(server, entry, {"idea": "A night market app", "template": "swot"})
+    assert status == 200
+    (event, data), = parse_sse(body)
+    assert event == "error"
+    assert (data["status"], data["retryAfter"]) == (429, 7)
@@ -0,0 +1,49 @@
+from token_budget import TokenBudget, completion_usage
+from templates import SWOT_ANALYSIS_TEMPLATE
+
+def test_limit_stays_at_the_maximum_until_there_are_enough_samples():
+    budget = TokenBudget(4096, min_samples=3)
+    budget.record("swot", 500)
+    budget.record("swot", 500)
+    assert budget.limit("swot") == 4096
+
+def test_limit_is_a_rounded_percentile_with_headroom():
+    budget = TokenBudget(4096, min_samples=3, headroom=1.25, step=128)
+    for tokens in (400, 500, 600):
+        budget.record("swot", tokens)
+    # About 600 * 1.25 = 750, rounded up to a multiple of 128
+    assert budget.limit("swot") == 768
+    assert budget.limit("other") == 4096
+
+def test_limit_is_kept_between_the_floor_and_the_maximum():
+    budget = TokenBudget(1024, min_samples=1, floor=256)
+    budget.record("tiny", 10)
+    budget.record("huge", 5000)
+    assert budget.limit("tiny") == 256
+    assert budget.limit("huge") == 1024
+
+def test_truncated_completions_let_the_limit_grow():
+    budget = TokenBudget(4096, min_samples=1, step=1, headroom=1.25, percentile=100)
+    budget.record("swot", 512)
+    limit = budget.limit("swot")
+    budget.record("swot", limit, truncated=True)
+    assert budget.limit("swot") > limit
+    assert budget.stats()["truncated"] == 1
+
+def test_disabled_budget_always_uses_the_maximum():
+    budget = TokenBudget(4096, enabled=False, min_samples=1)
+    budget.record("swot", 100)
+    assert budget.limit("swot") == 4096
+
+def test_usage_falls_back_to_an_estimate_from_the_text():
+    assert completion_usage("x" * 400, {"output_tokens": 90}, "stop") == (90, False)
+    assert completion_usage("x" * 400, None, "length") == (100, True)
+
+def test_processor_learns_a_limit_per_template_and_model(make_processor):
+    processor = make_processor(MAX_TOKENS_MIN_SAMPLES="2")
+    for index in range(2):
+        processor.process_idea(f"A tool library number {index}", SWOT_ANALYSIS_TEMPLATE)
+    limits = processor.model_stats()["tokenBudget"]["limits"]
+    (key, learned), = limits.items()
+    assert key.startswith(processor.model_name + ":")
+    assert learned["count"] == 2 and learned["limit"] < processor.token_budget.max_tokens
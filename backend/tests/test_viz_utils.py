@@ -0,0 +1,42 @@
+import bench_viz_baseline as baseline
+from viz_utils import format_visualizations, VISUALIZATION_FIELDS
+
+# Sections carry their own emoji, so both implementations agree on every field
+ANALYSIS = {
+    "Executive Summary": {"emoji": "📝", "content": "A meal kit for students."},
+    "Strengths": {"emoji": "💪", "content": ["Cheap", "Fast"]},
+    "Phase 1: Build": {"emoji": "🔨", "content": "- Recipes\n- Suppliers"},
+    "Phase 2: Launch": {"emoji": "🚀", "content": ["Campus pilot", "Referral scheme"]},
+    "Market": {"emoji": "📊", "content": "Large market. Many students."}
+}
+
+def without_color(cards):
+    return [{key: card[key] for key in ("id", "title", "emoji", "content")} for card in cards]
+
+def test_single_pass_matches_the_per_format_functions():
+    visualizations = format_visualizations(ANALYSIS, ["mind_map", "cards", "timeline"])
+    assert visualizations["mindMap"] == baseline.format_for_mindmap(ANALYSIS)
+    assert visualizations["timeline"] == baseline.format_for_timeline(ANALYSIS)
+    assert without_color(visualizations["cards"]["cards"]) == \
+        without_color(baseline.format_for_cards(ANALYSIS)["cards"])
+
+def test_only_the_requested_formats_are_built_in_response_order():
+    visualizations = format_visualizations(ANALYSIS, ["timeline", "mind_map"])
+    assert list(visualizations) == ["mindMap", "timeline"]
+    assert format_visualizations(ANALYSIS, []) == {}
+    assert format_visualizations(ANALYSIS, ["unknown"]) == {}
+
+def test_every_format_is_keyed_by_its_response_field():
+    visualizations = format_visualizations(ANALYSIS, list(VISUALIZATION_FIELDS))
+    assert list(visualizations) == list(VISUALIZATION_FIELDS.values())
+
+def test_card_colors_do_not_depend_on_the_other_formats():
+    alone = format_visualizations(ANALYSIS, ["cards"])["cards"]["cards"]
+    together = format_visualizations(ANALYSIS, ["mind_map", "cards", "timeline"])["cards"]["cards"]
+    assert [card["color"] for card in alone] == [card["color"] for card in together]
+
+def test_timeline_falls_back_to_the_task_section():
+    data = {"Summary": {"emoji": "📝", "content": "s"}, "Key Tasks": ["Design", "Build"], "Risks": ["Cost"]}
+    timeline = format_visualizations(data, ["timeline"])["timeline"]
+    assert timeline == baseline.format_for_timeline(data)
+    assert [event["content"] for event in timeline["events"]] == ["Design", "Build"]
@@ -0,0 +1,134 @@
+import os
+import math
+import logging
+from resilience import LatencyTracker
+from rate_limiter import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def completion_usage(text, usage=None, finish_reason=None):
+    """
+    Get the size of a completion and whether it was cut off.
+
+    Args:
+        text (str): Completion text
+        usage (dict): The message's usage_metadata, if the provider sent it
+        finish_reason (str): Why the provider stopped generating
+
+    Returns:
+        tuple: (output_tokens, truncated), estimated from the text when the
+        provider reported no usage
+    """
+    tokens = (usage or {}).get('output_tokens') or estimate_tokens(text)
+    return tokens, finish_reason == 'length'
+
+class TokenBudget:
+    """
+    Completion limits learned from the sizes of past completions.
+
+    Completion sizes are kept per template and model. Once there are enough
+    of them, max_tokens is a high percentile of the history plus headroom,
+    never above MAX_TOKENS or below a floor. A truncated completion is
+    recorded at its limit, so the headroom lets the next limit grow.
+    Limits are rounded up to a multiple of a step, so only a few distinct
+    values are ever requested.
+    """
+
+    def __init__(self, max_tokens, enabled=True, percentile=99, headroom=1.25,
+                 min_samples=20, floor=256, window=200, step=128):
+        """
+        Initialize the budget.
+
+        Args:
+            max_tokens (int): Largest limit ever used (MAX_TOKENS)
+            enabled (bool): Whether limits adapt at all
+            percentile (float): Percentile of past completion sizes used
+            headroom (float): Factor applied on top of the percentile
+            min_samples (int): Completions needed before the limit adapts
+            floor (int): Smallest limit ever used
+            window (int): Recent completions kept per template and model
+            step (int): Granularity of the limits
+        """
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.floor = min(floor, max_tokens)
+        self.step = max(1, step)
+        self.sizes = LatencyTracker(window)
+        self.truncated = 0
+
+    def limit(self, key):
+        """
+        Get the max_tokens to request.
+
+        Args:
+            key (str): Template and model the completion is for
+
+        Returns:
+            int: The completion limit
+        """
+        if not self.enabled:
+            return self.max_tokens
+        size = self.sizes.percentile(key, self.percentile, self.min_samples)
+        if size is None:
+            return self.max_tokens
+        limit = math.ceil(size * self.headroom / self.step) * self.step
+        return max(self.floor, min(self.max_tokens, limit))
+
+    def record(self, key, tokens, truncated=False):
+        """
+        Record the size of a finished completion.
+
+        Args:
+            key (str): Template and model the completion was for
+            tokens (int): Output tokens of the completion
+            truncated (bool): Whether it stopped at max_tokens
+        """
+        if truncated:
+            self.truncated += 1
+            logger.warning(f"Completion for {key} was cut off at {tokens} tokens")
+        self.sizes.record(key, tokens)
+
+    def stats(self):
+        """
+        Get the learned limits.
+
+        Returns:
+            dict: Settings, truncation count and the size percentiles and
+            current limit per template and model
+        """
+        sizes = self.sizes.stats()
+        return {
+            "enabled": self.enabled,
+            "maxTokens": self.max_tokens,
+            "percentile": self.percentile,
+            "truncated": self.truncated,
+            "limits": {
+                key: {"count": size["count"], "p50": size["p50"], "p95": size["p95"], "limit": self.limit(key)}
+                for key, size in sizes.items()
+            }
+        }
+
+def create_token_budget(max_tokens):
+    """
+    Create the completion budget configured in the environment.
+
+    Args:
+        max_tokens (int): Largest limit ever used (MAX_TOKENS)
+
+    Returns:
+        TokenBudget: The budget
+    """
+    return TokenBudget(
+        max_tokens,
+        enabled=os.getenv('ADAPTIVE_MAX_TOKENS', 'True').lower() in ('true', '1', 't'),
+        percentile=float(os.getenv('MAX_TOKENS_PERCENTILE', 99)),
+        headroom=float(os.getenv('MAX_TOKENS_HEADROOM', 1.25)),
+        min_samples=int(os.getenv('MAX_TOKENS_MIN_SAMPLES', 20)),
+        floor=int(os.getenv('MAX_TOKENS_FLOOR', 256)),
+        step=int(os.getenv('MAX_TOKENS_STEP', 128))
+    )
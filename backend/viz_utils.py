@@ -1,93 +1,230 @@
 import random
 import re
 import logging
+from section_classifier import section_classifier, PHASE, EXCLUDED
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def format_for_mindmap(data):
+# Response field of each visualization, in response order
+VISUALIZATION_FIELDS = {
+    "mind_map": "mindMap",
+    "cards": "cards",
+    "timeline": "timeline"
+}
+
+# Sections a timeline falls back to when no name suggests a sequence
+TIMELINE_FALLBACK_SECTIONS = ["Key Tasks", "Tasks", "Steps", "Implementation"]
+
+class SectionRecord:
     """
-    Format data as a mind map visualization.
+    One section of an analysis, normalized once for every visualization.
+    
+    The mind map and cards take the emoji and content of sections that
+    carry an emoji; the timeline those of sections that carry content.
+    Either falls back to the section value itself and an emoji chosen by
+    name.
+    """
+    
+    def __init__(self, name, value):
+        """
+        Normalize a section.
+        
+        Args:
+            name (str): Section name
+            value: Parsed section content
+        """
+        self.name = name
+        self.value = value
+        self.timeline_role = section_classifier.timeline_role(name)
+        self.sequential = self.timeline_role == PHASE
+        self.excluded = self.timeline_role == EXCLUDED
+    
+    @property
+    def name_emoji(self):
+        """Emoji chosen by section name."""
+        return section_classifier.emoji(self.name)
+    
+    @property
+    def emoji(self):
+        """Emoji of the mind map node and card."""
+        if isinstance(self.value, dict) and "emoji" in self.value:
+            return self.value["emoji"]
+        return self.name_emoji
+    
+    @property
+    def content(self):
+        """Content of the mind map node and card."""
+        if isinstance(self.value, dict) and "emoji" in self.value:
+            return self.value.get("content", "")
+        return self.value
+    
+    @property
+    def timeline_emoji(self):
+        """Emoji of the timeline events."""
+        if isinstance(self.value, dict) and "content" in self.value:
+            return self.value.get("emoji", "📅")
+        return self.name_emoji
+    
+    @property
+    def timeline_content(self):
+        """Content of the timeline events."""
+        if isinstance(self.value, dict) and "content" in self.value:
+            return self.value["content"]
+        return self.value
+
+def format_visualizations(data, formats):
+    """
+    Format data as any set of visualizations in one pass over its sections.
     
     Args:
         data (dict): Structured data with sections
+        formats (iterable): Visualizations to build (mind_map, cards, timeline)
         
     Returns:
-        dict: Mind map data structure
+        dict: Visualizations keyed by their response field name
     """
-    mind_map = {
-        "name": "Idea Analysis",
-        "children": []
-    }
-    
-    # Add each section as a child node
-    for section_name, section_content in data.items():
-        # Get emoji for the section
-        if isinstance(section_content, dict) and "emoji" in section_content:
-            emoji = section_content["emoji"]
-            node_content = section_content.get("content", "")
-        else:
-            emoji = get_emoji_for_section(section_name)
-            node_content = section_content
+    formats = [fmt for fmt in VISUALIZATION_FIELDS if fmt in formats]
+    mind_map_nodes = [] if "mind_map" in formats else None
+    cards = [] if "cards" in formats else None
+    timeline = "timeline" in formats
+    colors = generate_colors(len(data)) if cards is not None else None
+    
+    records = {}
+    sequential = []
+    not_excluded = []
+    for i, (section_name, section_content) in enumerate(data.items()):
+        record = SectionRecord(section_name, section_content)
         
-        # Create child nodes based on content type
-        child_nodes = create_child_nodes(node_content)
+        if mind_map_nodes is not None:
+            mind_map_nodes.append({
+                "name": f"{record.emoji} {section_name}",
+                "children": create_child_nodes(record.content)
+            })
         
-        # Create section node
-        section_node = {
-            "name": f"{emoji} {section_name}",
-            "children": child_nodes
-        }
+        if cards is not None:
+            content = format_card_content(record.content)
+            cards.append({
+                "id": i + 1,
+                "title": section_name,
+                "emoji": record.emoji,
+                "content": content,
+                "color": colors[i],
+                "categories": section_classifier.classify(section_name, content)["categories"],
+                "timelineRole": record.timeline_role
+            })
         
-        mind_map["children"].append(section_node)
+        if timeline:
+            records[section_name] = record
+            if record.sequential:
+                sequential.append(record)
+            if not record.excluded:
+                not_excluded.append(record)
     
-    return mind_map
+    visualizations = {}
+    if mind_map_nodes is not None:
+        visualizations["mindMap"] = {"name": "Idea Analysis", "children": mind_map_nodes}
+    if cards is not None:
+        visualizations["cards"] = {"cards": cards}
+    if timeline:
+        timeline_sections = sequential
+        if not timeline_sections:
+            fallback = next((name for name in TIMELINE_FALLBACK_SECTIONS if name in records), None)
+            timeline_sections = [records[fallback]] if fallback is not None else not_excluded
+        visualizations["timeline"] = {"events": create_timeline_events(timeline_sections)}
+    return visualizations
 
-def format_for_cards(data):
+def format_for_mindmap(data, depth=None, max_children=None):
     """
-    Format data as cards for display.
+    Format data as a mind map visualization.
     
     Args:
         data (dict): Structured data with sections
+        depth (int): Levels below the root to include, or None for all
+        max_children (int): Children to include per node, or None for all
         
     Returns:
-        dict: Card layout data structure
+        dict: Mind map data structure (see prune_mind_map for limited ones)
     """
-    cards = []
-    
-    # Get colors for the cards
-    colors = generate_colors(len(data))
+    mind_map = format_visualizations(data, ["mind_map"])["mindMap"]
+    if depth is None and max_children is None:
+        return mind_map
+    return prune_mind_map(mind_map, depth, max_children)
+
+def find_mind_map_node(mind_map, path):
+    """
+    Find a node of a mind map by its path.
     
-    for i, (section_name, section_content) in enumerate(data.items()):
-        # Get emoji for the section
-        if isinstance(section_content, dict) and "emoji" in section_content:
-            emoji = section_content["emoji"]
-            content = section_content.get("content", "")
-        else:
-            emoji = get_emoji_for_section(section_name)
-            content = section_content
+    Args:
+        mind_map (dict): Mind map data structure
+        path (str): Child positions from the root separated by "/" ("" for the root)
         
-        # Format content based on type
-        if isinstance(content, list):
-            formatted_content = "\n".join([f"• {item}" for item in content])
-        elif isinstance(content, dict):
-            formatted_content = "\n".join([f"**{key}**: {value}" for key, value in content.items()])
-        else:
-            formatted_content = str(content)
+    Returns:
+        dict: The node, or None if there is no node at that path
+    """
+    node = mind_map
+    for part in filter(None, path.split("/")):
+        children = node.get("children") or []
+        if not part.isdigit() or int(part) >= len(children):
+            return None
+        node = children[int(part)]
+    return node
+
+def prune_mind_map(node, depth=None, max_children=None, path="", expand=()):
+    """
+    Copy a mind map (or a subtree of one) with limited depth and breadth.
+    
+    A node whose children are not all included gets its "path", to fetch
+    or expand it by, and its total "childCount".
+    
+    Args:
+        node (dict): Root of the mind map or subtree
+        depth (int): Levels below the node to include, or None for all
+        max_children (int): Children to include per node, or None for all
+        path (str): Path of the node (see find_mind_map_node)
+        expand (iterable): Paths of nodes to include all children of, past
+            the limits
         
-        # Create card
-        card = {
-            "id": i + 1,
-            "title": section_name,
-            "emoji": emoji,
-            "content": formatted_content,
-            "color": colors[i]
-        }
+    Returns:
+        dict: The limited mind map
+    """
+    expand = set(expand)
+    
+    def prune(node, path, level):
+        pruned = {key: value for key, value in node.items() if key != "children"}
+        children = node.get("children")
+        if children is None:
+            return pruned
         
-        cards.append(card)
+        visible = children
+        if path not in expand:
+            if depth is not None and level >= depth:
+                visible = []
+            elif max_children is not None:
+                visible = children[:max_children]
+        pruned["children"] = [
+            prune(child, f"{path}/{i}" if path else str(i), level + 1)
+            for i, child in enumerate(visible)
+        ]
+        if len(visible) < len(children):
+            pruned["path"] = path
+            pruned["childCount"] = len(children)
+        return pruned
+    
+    return prune(node, path, 0)
+
+def format_for_cards(data):
+    """
+    Format data as cards for display.
     
-    return {"cards": cards}
+    Args:
+        data (dict): Structured data with sections
+        
+    Returns:
+        dict: Card layout data structure
+    """
+    return format_visualizations(data, ["cards"])["cards"]
 
 def format_for_timeline(data):
     """
@@ -99,46 +236,46 @@ def format_for_timeline(data):
     Returns:
         dict: Timeline data structure
     """
-    # Find sections that might be sequential
-    timeline_sections = []
-    for section_name, section_content in data.items():
-        # Check if section name suggests a phase or sequence
-        if any(keyword in section_name.lower() for keyword in 
-               ["phase", "step", "stage", "task", "milestone", "timeline", "roadmap"]):
-            timeline_sections.append((section_name, section_content))
-    
-    # If no timeline sections found, look for "Key Tasks" or similar
-    if not timeline_sections:
-        for key_section in ["Key Tasks", "Tasks", "Steps", "Implementation"]:
-            if key_section in data:
-                timeline_sections = [(key_section, data[key_section])]
-                break
-    
-    # If still no timeline sections, use all sections
-    if not timeline_sections:
-        # Skip some sections that don't make sense in a timeline
-        timeline_sections = [(name, content) for name, content in data.items()
-                           if not any(keyword in name.lower() for keyword in 
-                                     ["competitor", "risk", "threat", "existing"])]
-    
-    # Create timeline events
+    return format_visualizations(data, ["timeline"])["timeline"]
+
+def format_card_content(content):
+    """
+    Format section content as card text.
+    
+    Args:
+        content: Section content
+        
+    Returns:
+        str: Card text
+    """
+    if isinstance(content, list):
+        return "\n".join([f"• {item}" for item in content])
+    elif isinstance(content, dict):
+        return "\n".join([f"**{key}**: {value}" for key, value in content.items()])
+    else:
+        return str(content)
+
+def create_timeline_events(records):
+    """
+    Create timeline events for the sections picked for the timeline.
+    
+    Args:
+        records (list): SectionRecord of each timeline section, in order
+        
+    Returns:
+        list: Timeline events
+    """
     events = []
-    for i, (section_name, section_content) in enumerate(timeline_sections):
-        # Extract content based on structure
-        if isinstance(section_content, dict) and "content" in section_content:
-            content = section_content["content"]
-            emoji = section_content.get("emoji", "📅")
-        else:
-            content = section_content
-            emoji = get_emoji_for_section(section_name)
+    for i, record in enumerate(records):
+        emoji = record.timeline_emoji
+        content = record.timeline_content
         
-        # Format content based on type
         if isinstance(content, list):
             # For lists, create an event for each item
             for j, item in enumerate(content):
                 events.append({
                     "id": len(events) + 1,
-                    "title": f"{emoji} {section_name} - Step {j+1}",
+                    "title": f"{emoji} {record.name} - Step {j+1}",
                     "content": item,
                     "date": f"Phase {i+1}.{j+1}"
                 })
@@ -146,12 +283,11 @@ def format_for_timeline(data):
             # For non-lists, create a single event
             events.append({
                 "id": len(events) + 1,
-                "title": f"{emoji} {section_name}",
+                "title": f"{emoji} {record.name}",
                 "content": str(content),
                 "date": f"Phase {i+1}"
             })
-    
-    return {"events": events}
+    return events
 
 def create_child_nodes(content):
     """
@@ -184,61 +320,18 @@ def get_emoji_for_section(section_name):
         section_name (str): The name of the section
         
     Returns:
-        str: An emoji character
+        str: An emoji character, the same one every time for a name
     """
-    # Map common section names to emojis
-    emoji_map = {
-        "project title": "🔍",
-        "title": "📝",
-        "goal": "🎯",
-        "goals": "🎯",
-        "project goals": "🎯",
-        "task": "📋",
-        "tasks": "📋",
-        "key tasks": "📋",
-        "stakeholder": "🧑‍🤝‍🧑",
-        "stakeholders": "🧑‍🤝‍🧑",
-        "risk": "⚠️",
-        "risks": "⚠️",
-        "tool": "🛠️",
-        "tools": "🛠️",
-        "technologies": "🛠️",
-        "tools & technologies": "🛠️",
-        "innovation": "💡",
-        "innovations": "💡",
-        "value": "💡",
-        "unique value": "💡",
-        "business model": "💰",
-        "market": "📊",
-        "market opportunity": "📊",
-        "competitor": "🧠",
-        "competitors": "🧠",
-        "top competitors": "🧠",
-        "competitive edge": "🆚",
-        "revenue": "📈",
-        "revenue streams": "📈",
-        "marketing": "📢",
-        "go-to-market": "📢",
-        "strategy": "📢",
-        "feature": "🌱",
-        "features": "🌱",
-        "roadmap": "🌱",
-        "future": "🌱"
-    }
-    
-    # Try to find a matching emoji
-    for key, emoji in emoji_map.items():
-        if key.lower() in section_name.lower():
-            return emoji
-    
-    # Generic emojis for random assignment
-    generic_emojis = ["📌", "🔖", "📊", "📈", "📉", "📇", "📋", "📑", "📝", "📔", "📕", "📗", "📘", "📙"]
-    return random.choice(generic_emojis)
+    return section_classifier.emoji(section_name)
 
 def generate_colors(num_colors=10):
     """
     Generate a list of visually distinct colors.
     
+    Colors past the base set are variations drawn from a fixed seed, so the
+    list is the same on every call and each prefix of it is the shorter list
+    (a streamed card gets the color of its place in the full set).
+    
     Args:
         num_colors (int): Number of colors to generate
         
@@ -267,25 +360,28 @@ def generate_colors(num_colors=10):
     
     # Otherwise, generate additional colors
     results = base_colors.copy()
+    seen = set(results)
+    rng = random.Random(0)
     
     while len(results) < num_colors:
         # Take a random color and modify it slightly
-        base = random.choice(base_colors)
+        base = rng.choice(base_colors)
         # Convert hex to RGB
         r = int(base[1:3], 16)
         g = int(base[3:5], 16)
         b = int(base[5:7], 16)
         
         # Modify the color slightly
-        r = max(0, min(255, r + random.randint(-20, 20)))
-        g = max(0, min(255, g + random.randint(-20, 20)))
-        b = max(0, min(255, b + random.randint(-20, 20)))
+        r = max(0, min(255, r + rng.randint(-20, 20)))
+        g = max(0, min(255, g + rng.randint(-20, 20)))
+        b = max(0, min(255, b + rng.randint(-20, 20)))
         
         # Convert back to hex
         new_color = f"#{r:02x}{g:02x}{b:02x}"
         
         # Add to results if it's not already there
-        if new_color not in results:
+        if new_color not in seen:
+            seen.add(new_color)
             results.append(new_color)
     
     return results
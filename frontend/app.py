@@ -10,7 +10,7 @@ from components.timeline_view import render_timeline
 from components.raw_view import render_raw_analysis
 
 # Import utilities
-from utils.api import analyze_idea, get_templates
+from utils.api import analyze_idea, get_templates, get_visualization, get_mind_map
 
 # Set page configuration
 st.set_page_config(
@@ -20,6 +20,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Mind map levels shown before any section is expanded
+MIND_MAP_DEPTH = 1
+
 # Load custom CSS
 def load_css():
     with open(os.path.join("styles", "custom.css")) as f:
@@ -39,6 +42,8 @@ def reset_analysis():
     """Reset the analysis state"""
     st.session_state.analysis = None
     st.session_state.expanded_sections = set()
+    st.session_state.visualizations = {}
+    st.session_state.mind_map_expand = []
 
 def main():
     # Load CSS
@@ -70,10 +75,13 @@ def main():
         if analyze_button and idea:
             with st.spinner("Analyzing your idea... This may take up to 60 seconds."):
                 try:
+                    # Visualizations are fetched by analysis ID when first viewed,
+                    # and only the fields the page shows are downloaded
                     response = analyze_idea(
                         idea, 
                         st.session_state.template_type,
-                        ["mind_map", "cards", "timeline"]
+                        [],
+                        ["title", "analysisId", "rawAnalysis", "processingTime"]
                     )
                     st.session_state.analysis = response
                     st.rerun()
@@ -96,14 +104,19 @@ def main():
         # Display current visualization
         current_view = st.session_state.current_view
         
-        if current_view == "mind_map":
-            render_mind_map(analysis.get("visualizations", {}).get("mindMap", {}))
-        elif current_view == "cards":
-            render_cards(analysis.get("visualizations", {}).get("cards", {}))
-        elif current_view == "timeline":
-            render_timeline(analysis.get("visualizations", {}).get("timeline", {}))
-        elif current_view == "raw":
-            render_raw_analysis(analysis.get("rawAnalysis", ""))
+        try:
+            if current_view == "mind_map":
+                render_mind_map(get_mind_map(
+                    analysis, depth=MIND_MAP_DEPTH, expand=st.session_state.get("mind_map_expand", [])
+                ), analysis)
+            elif current_view == "cards":
+                render_cards(get_visualization(analysis, "cards"))
+            elif current_view == "timeline":
+                render_timeline(get_visualization(analysis, "timeline"))
+            elif current_view == "raw":
+                render_raw_analysis(analysis.get("rawAnalysis", ""))
+        except Exception as e:
+            st.error(f"Error loading visualization: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,211 @@
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+from functools import partial
+import streamlit as st
+from streamlit.testing.v1 import AppTest, local_script_runner
+from utils.api import get_sample_analysis
+
+# Server time of one interaction with each view, with the views' st.fragment
+# regions (the widget reruns only its fragment) and without them (every
+# interaction reruns the whole page, as before):
+#
+#     python bench_reruns.py --scale 1 10 --repeat 20
+#
+# Runs app.py against the sample analysis, so no backend is needed.
+#
+# The public AppTest API always reruns the whole page, so fragment reruns are
+# driven through two of its internals: the fragment storage (to find a
+# fragment's id) and local_script_runner.RerunData (to queue that id). Both
+# can change in any release, which is why requirements.txt pins Streamlit
+# (TESTED_STREAMLIT) and the benchmark refuses to run on another version.
+
+FRONTEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Streamlit release whose AppTest internals this benchmark was written against
+TESTED_STREAMLIT = "1.65.0"
+
+# (view, fragment function holding the widget, widget kind, widget key,
+# values to alternate between)
+INTERACTIONS = [
+    ("cards", "render_card_grid", "text_input", "card_search", ["market", "users"]),
+    ("timeline", "render_phases", "button", None, ["phase_1", "phase_0"]),
+    ("raw", "render_raw_search", "text_input", "raw_search", ["market", "users"])
+]
+
+def scaled_analysis(scale):
+    """
+    Build the sample analysis with every visualization repeated
+
+    Args:
+        scale (int): Number of copies of the cards, events and text
+
+    Returns:
+        dict: Analysis with its visualizations included
+    """
+    analysis = get_sample_analysis()
+    visualizations = analysis["visualizations"]
+    visualizations["cards"]["cards"] = [
+        copy.deepcopy(card) for _ in range(scale) for card in visualizations["cards"]["cards"]
+    ]
+    visualizations["timeline"]["events"] = [
+        copy.deepcopy(event) for _ in range(scale) for event in visualizations["timeline"]["events"]
+    ]
+    analysis["rawAnalysis"] = "\n\n".join([analysis["rawAnalysis"]] * scale)
+    return analysis
+
+def fragment_id(at, function_name):
+    """
+    Find the id Streamlit registered for a fragment function
+
+    Args:
+        at (AppTest): The app, already run once
+        function_name (str): Name of the @st.fragment function
+
+    Returns:
+        str: The fragment id, or None if the fragment was not rendered
+    """
+    for fragment, wrapper in at._fragment_storage._fragments.items():
+        for cell in wrapper.__closure__ or ():
+            if getattr(cell.cell_contents, "__name__", None) == function_name:
+                return fragment
+    return None
+
+def rerun(at, fragment=None):
+    """
+    Rerun an AppTest, like the browser does after a widget changes
+
+    AppTest.run always reruns the whole page. A widget inside a fragment
+    makes the browser ask for a rerun of just that fragment, which is done
+    here by queueing the fragment id on the rerun request.
+
+    Args:
+        at (AppTest): The app
+        fragment (str): Fragment holding the widget, or None for a full rerun
+    """
+    if fragment is None:
+        at.run()
+        return
+    rerun_data = local_script_runner.RerunData
+    local_script_runner.RerunData = partial(rerun_data, fragment_id_queue=[fragment])
+    try:
+        at.run()
+    finally:
+        local_script_runner.RerunData = rerun_data
+
+def interact(at, kind, key, values, step, fragment=None):
+    """
+    Change a widget of an AppTest and rerun it
+
+    Args:
+        at (AppTest): The app
+        kind (str): "text_input" or "button"
+        key (str): Widget key (text inputs)
+        values (list): Values (text inputs) or button keys to alternate between
+        step (int): Interaction number
+        fragment (str): Fragment holding the widget, or None for a full rerun
+    """
+    if kind == "button":
+        at.button(key=values[step % len(values)]).click()
+    else:
+        at.text_input(key=key).input(values[step % len(values)])
+    rerun(at, fragment)
+
+def measure(analysis, view, function_name, kind, key, values, repeat, fragments):
+    """
+    Time interactions with a widget of a view
+
+    Args:
+        analysis (dict): Analysis shown by the app
+        view (str): View to open
+        function_name (str): Fragment function holding the widget
+        kind (str): "text_input" or "button"
+        key (str): Widget key (text inputs)
+        values (list): Values (text inputs) or button keys to alternate between
+        repeat (int): Number of interactions
+        fragments (bool): Whether to rerun only the widget's fragment
+
+    Returns:
+        float: Median milliseconds per interaction
+    """
+    at = AppTest.from_file(os.path.join(FRONTEND_DIR, "app.py"), default_timeout=60)
+    at.session_state.analysis = analysis
+    at.session_state.current_view = view
+    at.run()
+    fragment = fragment_id(at, function_name) if fragments else None
+    if fragments and fragment is None:
+        raise RuntimeError(f"{function_name} is not a rendered fragment")
+
+    interact(at, kind, key, values, 0, fragment)
+    timings = []
+    for step in range(repeat):
+        start = time.perf_counter()
+        interact(at, kind, key, values, step + 1, fragment)
+        timings.append((time.perf_counter() - start) * 1e3)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return statistics.median(timings)
+
+def disable_fragments():
+    """
+    Make st.fragment a no-op, so every interaction reruns the whole page
+
+    The views are imported again so their functions lose the decorator.
+    st.rerun(scope="fragment") becomes a full rerun, as it was before.
+    """
+    def fragment(func=None, **kwargs):
+        return func if func is not None else (lambda inner: inner)
+
+    full_rerun = st.rerun
+    st.fragment = fragment
+    st.rerun = lambda *args, **kwargs: full_rerun()
+    for name in list(sys.modules):
+        if name == "components" or name.startswith("components."):
+            del sys.modules[name]
+
+def check_streamlit_version(force=False):
+    """
+    Stop unless Streamlit is the release the AppTest internals were checked on
+
+    Args:
+        force (bool): Only warn on another release
+    """
+    if st.__version__ == TESTED_STREAMLIT:
+        return
+    message = (
+        f"bench_reruns.py relies on AppTest internals of Streamlit {TESTED_STREAMLIT}, "
+        f"found {st.__version__}"
+    )
+    if not force:
+        raise SystemExit(message + " (pass --force to try anyway)")
+    print(f"Warning: {message}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit reruns per interaction")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10], help="Copies of the sample data")
+    parser.add_argument("--repeat", type=int, default=20, help="Interactions per measurement")
+    parser.add_argument("--force", action="store_true", help="Run on an untested Streamlit release")
+    args = parser.parse_args()
+    check_streamlit_version(args.force)
+
+    os.chdir(FRONTEND_DIR)
+    cases = [(scale, interaction) for scale in args.scale for interaction in INTERACTIONS]
+    analyses = {scale: scaled_analysis(scale) for scale in args.scale}
+
+    with_fragments = [
+        measure(analyses[scale], *interaction, args.repeat, fragments=True) for scale, interaction in cases
+    ]
+    disable_fragments()
+    without_fragments = [
+        measure(analyses[scale], *interaction, args.repeat, fragments=False) for scale, interaction in cases
+    ]
+
+    print(f"{'view':>10}{'scale':>7}{'full page ms':>15}{'fragment ms':>14}{'speedup':>9}")
+    for (scale, interaction), full, partial_ms in zip(cases, without_fragments, with_fragments):
+        print(f"{interaction[0]:>10}{scale:>7}{full:>15.2f}{partial_ms:>14.2f}{full / partial_ms:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
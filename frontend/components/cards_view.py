@@ -1,6 +1,5 @@
 import streamlit as st
-import json
-import pandas as pd
+from components.view_models import content_key, filter_cards, cards_csv, json_export
 
 def render_cards(data):
     """
@@ -25,6 +24,25 @@ def render_cards(data):
     Use the search and filter options below to focus on specific aspects of your analysis.
     """)
     
+    # Searching and exporting rerun only their own part of the page
+    key = content_key(cards)
+    render_card_grid(key, cards)
+    render_cards_export(key, cards)
+
+def clear_card_filters():
+    """Reset the card search and category filter"""
+    st.session_state.card_search = ""
+    st.session_state.card_filter = "All"
+
+@st.fragment
+def render_card_grid(key, cards):
+    """
+    Render the card search, filter and grid
+    
+    Args:
+        key (str): content_key of the cards
+        cards (list): Cards from API
+    """
     # Search and filter layout
     col1, col2 = st.columns([3, 1])
     
@@ -35,34 +53,9 @@ def render_cards(data):
         filter_options = ["All", "Business", "Technical", "Planning"]
         selected_filter = st.selectbox("Category", filter_options, key="card_filter")
     
-    # Filter cards
-    filtered_cards = cards
-    
-    # Apply category filter
-    if selected_filter != "All":
-        category_keywords = {
-            "Business": ["business", "model", "revenue", "market", "competitor", "edge", "monetization", "pricing", "cost"],
-            "Technical": ["tools", "technologies", "risks", "technical", "development", "platform", "architecture", "security"],
-            "Planning": ["tasks", "roadmap", "strategy", "features", "timeline", "phase", "implementation", "launch"]
-        }
-        
-        keywords = category_keywords.get(selected_filter, [])
-        if keywords:
-            filtered_cards = [
-                card for card in cards
-                if any(keyword in card.get("title", "").lower() or 
-                       keyword in card.get("content", "").lower() 
-                       for keyword in keywords)
-            ]
-    
-    # Apply search filter
-    if search_term:
-        search_term = search_term.lower()
-        filtered_cards = [
-            card for card in filtered_cards
-            if search_term in card.get("title", "").lower() or 
-               search_term in card.get("content", "").lower()
-        ]
+    # Filter cards (categories are tagged by the backend); results are
+    # cached per search so retyping a term does not scan the cards again
+    filtered_cards = [cards[i] for i in filter_cards(key, cards, selected_filter, search_term)]
     
     # Show count
     st.caption(f"Showing {len(filtered_cards)} of {len(cards)} cards")
@@ -70,10 +63,7 @@ def render_cards(data):
     # No results
     if not filtered_cards:
         st.warning(f"No cards match your search for '{search_term}'")
-        if st.button("Clear filters", key="clear_filters_button"):
-            st.session_state.card_search = ""
-            st.session_state.card_filter = "All"
-            st.rerun()
+        st.button("Clear filters", key="clear_filters_button", on_click=clear_card_filters)
         return
     
     # Display cards in a grid (3 columns)
@@ -106,30 +96,28 @@ def render_cards(data):
                                 st.write(line)
                     else:
                         st.write(content)
+
+@st.fragment
+def render_cards_export(key, cards):
+    """
+    Render the card export options
     
-    # Add export options
+    Args:
+        key (str): content_key of the cards
+        cards (list): Cards from API
+    """
     with st.expander("Export Options"):
-        # Create a dataframe from cards for CSV export
-        cards_df = pd.DataFrame([
-            {
-                "Emoji": card.get("emoji", ""),
-                "Title": card.get("title", ""),
-                "Content": card.get("content", "").replace("\n", " ")
-            }
-            for card in cards
-        ])
-        
         # Download as CSV
         st.download_button(
             label="Download Cards (CSV)",
-            data=cards_df.to_csv(index=False).encode('utf-8'),
+            data=cards_csv(key, cards),
             file_name="idea_cards.csv",
             mime="text/csv",
             key="download_cards_csv"
         )
         
         # Download as JSON
-        json_str = json.dumps({"cards": cards}, indent=2)
+        json_str = json_export(key, cards, "cards")
         st.download_button(
             label="Download Cards (JSON)",
             data=json_str,
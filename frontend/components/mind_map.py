@@ -1,14 +1,19 @@
 import streamlit as st
-import json
-import random
-from streamlit_agraph import agraph, Node, Edge, Config
+from streamlit_agraph import agraph, Config
+from utils.api import get_mind_map_svg
+from components.view_models import content_key, mind_map_graph, json_export
 
-def render_mind_map(data):
+def render_mind_map(data, analysis=None):
     """
     Render a mind map visualization using streamlit-agraph
     
+    Mind maps fetched by analysis ID come with a layout computed by the
+    backend and are drawn at those positions with physics off; others
+    are laid out by the browser.
+    
     Args:
         data (dict): Mind map data from API
+        analysis (dict): The analysis the mind map belongs to, for the SVG export
     """
     st.subheader("Mind Map Visualization")
     
@@ -26,56 +31,30 @@ def render_mind_map(data):
     - **Zoom and pan** to explore complex relationships
     """)
     
-    # Create graph
-    nodes = []
-    edges = []
-    
-    # Create a unique ID for each node
-    node_counter = 0
-    
-    # Colors for different levels
-    colors = ["#4F46E5", "#10B981", "#F59E0B", "#EC4899", "#6366F1"]
-    
-    def process_node(node_data, parent_id=None, level=0):
-        nonlocal node_counter
-        
-        # Create unique ID for this node
-        node_id = f"node_{node_counter}"
-        node_counter += 1
-        
-        # Extract emoji if present
-        label = node_data.get("name", "")
-        
-        # Add node
-        size = 30 if level == 0 else 24 if level == 1 else 20
-        nodes.append(Node(
-            id=node_id, 
-            label=label,
-            size=size,
-            color=colors[min(level, len(colors)-1)],
-            shape="circle" if level < 2 else "box"
-        ))
-        
-        # Add edge if this isn't the root
-        if parent_id:
-            edges.append(Edge(source=parent_id, target=node_id))
-        
-        # Process children
-        children = node_data.get("children", [])
-        for child in children:
-            process_node(child, node_id, level + 1)
-            
-        return node_id
+    # Sections start collapsed; expanding one fetches its detail
+    layout = data.get("layout")
+    layout_nodes = (layout or {}).get("nodes", [])
+    labels = {node["path"]: node["label"] for node in layout_nodes}
+    selected = [path for path in st.session_state.get("mind_map_expand", []) if path in labels]
+    expandable = [node["path"] for node in layout_nodes if node.get("childCount") or node["path"] in selected]
+    if expandable:
+        st.multiselect(
+            "Expand sections",
+            options=expandable,
+            format_func=lambda path: labels[path],
+            key="mind_map_expand"
+        )
     
-    # Process the root node and all children
-    root_id = process_node(data, level=0)
+    # Build the graph once per mind map, not on every rerun
+    key = content_key(data)
+    nodes, edges, has_layout = mind_map_graph(key, data)
     
     # Create config for the graph
     config = Config(
         width=800,
         height=600,
         directed=False,
-        physics=True,
+        physics=not has_layout,
         hierarchical=False,
         nodeHighlightBehavior=True,
         highlightColor="#F7A7A6",
@@ -94,10 +73,22 @@ def render_mind_map(data):
         st.error(f"Could not render mind map visualization: {str(e)}")
         st.json(data)
     
-    # Add export options
+    # Exporting reruns only the export panel
+    render_mind_map_export(key, data, analysis)
+
+@st.fragment
+def render_mind_map_export(key, data, analysis):
+    """
+    Render the mind map export options
+    
+    Args:
+        key (str): content_key of the mind map
+        data (dict): Mind map data from API
+        analysis (dict): The analysis the mind map belongs to, for the SVG export
+    """
     with st.expander("Export Options"):
         # Download as JSON
-        json_str = json.dumps(data, indent=2)
+        json_str = json_export(key, data)
         st.download_button(
             label="Download Mind Map (JSON)",
             data=json_str,
@@ -105,5 +96,15 @@ def render_mind_map(data):
             mime="application/json"
         )
         
+        # Download as SVG, drawn by the backend
+        svg = get_mind_map_svg(analysis) if analysis else None
+        if svg:
+            st.download_button(
+                label="Download Mind Map (SVG)",
+                data=svg,
+                file_name="mind_map.svg",
+                mime="image/svg+xml"
+            )
+        
         # View raw data
         st.json(data)
\ No newline at end of file
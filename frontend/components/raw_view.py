@@ -1,5 +1,6 @@
 import streamlit as st
 import re
+from components.view_models import content_key
 
 def render_raw_analysis(raw_text):
     """
@@ -20,24 +21,12 @@ def render_raw_analysis(raw_text):
     search for specific content, or download it for later reference.
     """)
     
-    # Add search functionality
-    search_term = st.text_input("Search analysis", key="raw_search")
-    
-    # Process and display the raw text
-    if search_term:
-        # Highlight the search term
-        highlighted_text = highlight_search_term(raw_text, search_term)
-        st.markdown(highlighted_text, unsafe_allow_html=True)
-        
-        # Show occurrences
-        occurrences = len(re.findall(re.escape(search_term), raw_text, re.IGNORECASE))
-        st.caption(f"Found {occurrences} occurrences of '{search_term}'")
-    else:
-        # Show the raw text in a markdown area
-        st.markdown(raw_text)
+    # Searching reruns only the text below the search box
+    key = content_key(raw_text)
+    render_raw_search(key, raw_text)
     
     # Extract sections for structured navigation
-    sections = parse_raw_analysis(raw_text)
+    sections = raw_analysis_sections(key, raw_text)
     
     if sections:
         with st.expander("Jump to section", expanded=False):
@@ -63,6 +52,60 @@ def render_raw_analysis(raw_text):
         key="download_raw"
     )
 
+@st.fragment
+def render_raw_search(key, raw_text):
+    """
+    Render the analysis search box and the text, highlighting matches
+    
+    Args:
+        key (str): content_key of the text
+        raw_text (str): Raw analysis text
+    """
+    # Add search functionality
+    search_term = st.text_input("Search analysis", key="raw_search")
+    
+    # Process and display the raw text
+    if search_term:
+        # Highlight the search term
+        highlighted_text, occurrences = search_raw_analysis(key, raw_text, search_term)
+        st.markdown(highlighted_text, unsafe_allow_html=True)
+        
+        # Show occurrences
+        st.caption(f"Found {occurrences} occurrences of '{search_term}'")
+    else:
+        # Show the raw text in a markdown area
+        st.markdown(raw_text)
+
+@st.cache_data(max_entries=32)
+def raw_analysis_sections(key, _raw_text):
+    """
+    Parse raw analysis text into sections, once per analysis
+    
+    Args:
+        key (str): content_key of the text
+        _raw_text (str): Raw analysis text
+        
+    Returns:
+        list: List of section dictionaries
+    """
+    return parse_raw_analysis(_raw_text)
+
+@st.cache_data(max_entries=256)
+def search_raw_analysis(key, _raw_text, search_term):
+    """
+    Highlight and count the occurrences of a search term, once per term
+    
+    Args:
+        key (str): content_key of the text
+        _raw_text (str): Raw analysis text
+        search_term (str): Term to search for
+        
+    Returns:
+        tuple: (HTML with highlighted search terms, number of occurrences)
+    """
+    occurrences = len(re.findall(re.escape(search_term), _raw_text, re.IGNORECASE))
+    return highlight_search_term(_raw_text, search_term), occurrences
+
 def parse_raw_analysis(raw_text):
     """
     Parse raw analysis text into sections with emoji and content
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-import json
+from components.view_models import content_key, timeline_phases, timeline_csv, json_export
 
 def render_timeline(data):
     """
@@ -26,13 +25,21 @@ def render_timeline(data):
     """)
     
     # Group events by phase
-    phases = {}
-    for event in events:
-        phase = event.get("date", "").split('.')[0]  # Extract phase from date
-        if phase not in phases:
-            phases[phase] = []
-        phases[phase].append(event)
+    key = content_key(events)
+    phases = timeline_phases(key, events)
     
+    # Switching phases and exporting rerun only their own part of the page
+    render_phases(phases)
+    render_timeline_export(key, events)
+
+@st.fragment
+def render_phases(phases):
+    """
+    Render the phase navigation and the events of each phase
+    
+    Args:
+        phases (dict): Phase name to its events (see timeline_phases)
+    """
     # Create phase navigation
     st.write("Jump to phase:")
     
@@ -51,7 +58,7 @@ def render_timeline(data):
             button_type = "primary" if st.session_state.active_phase == phase else "secondary"
             if st.button(phase, key=f"phase_{i}", type=button_type):
                 st.session_state.active_phase = phase
-                st.rerun()
+                st.rerun(scope="fragment")
     
     # Display timeline with active phase expanded
     for phase, phase_events in phases.items():
@@ -86,31 +93,28 @@ def render_timeline(data):
                     
                     st.markdown("</div>", unsafe_allow_html=True)
                     st.markdown("---")
+
+@st.fragment
+def render_timeline_export(key, events):
+    """
+    Render the timeline export options
     
-    # Add export options
+    Args:
+        key (str): content_key of the events
+        events (list): Timeline events from API
+    """
     with st.expander("Export Options"):
-        # Create a dataframe from events for CSV export
-        events_df = pd.DataFrame([
-            {
-                "Phase": event.get("date", "").split('.')[0],
-                "Date": event.get("date", ""),
-                "Title": event.get("title", ""),
-                "Content": event.get("content", "").replace("\n", " ")
-            }
-            for event in events
-        ])
-        
         # Download as CSV
         st.download_button(
             label="Download Timeline (CSV)",
-            data=events_df.to_csv(index=False).encode('utf-8'),
+            data=timeline_csv(key, events),
             file_name="implementation_timeline.csv",
             mime="text/csv",
             key="download_timeline_csv"
         )
         
         # Download as JSON
-        json_str = json.dumps({"events": events}, indent=2)
+        json_str = json_export(key, events, "events")
         st.download_button(
             label="Download Timeline (JSON)",
             data=json_str,
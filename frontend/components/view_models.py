@@ -0,0 +1,210 @@
+import streamlit as st
+import hashlib
+import json
+import pandas as pd
+from streamlit_agraph import Node, Edge
+
+# View models of the visualizations, built once per analysis
+#
+# Every Streamlit interaction reruns the script, so anything derived from the
+# API data (graph nodes, search indexes, grouped events, export files) would
+# be rebuilt on each keystroke or click. The builders below are cached on a
+# content hash of the data they are given; the data itself is passed as an
+# underscore argument so Streamlit does not hash it again on every call.
+
+# Colors for different mind map levels
+LEVEL_COLORS = ["#4F46E5", "#10B981", "#F59E0B", "#EC4899", "#6366F1"]
+
+# Content hashes of the most recently seen data objects
+MAX_CONTENT_KEYS = 32
+
+def content_key(data):
+    """
+    Get the content hash of API data
+    
+    API data stays the same object across reruns (it lives in the session
+    state), so the hash is computed once per object.
+    
+    Args:
+        data: JSON-like data (dict, list or str)
+    
+    Returns:
+        str: Hex digest identifying the content
+    """
+    if 'view_model_keys' not in st.session_state:
+        st.session_state.view_model_keys = {}
+    keys = st.session_state.view_model_keys
+    
+    entry = keys.get(id(data))
+    if entry is None or entry[0] is not data:
+        encoded = data if isinstance(data, str) else json.dumps(data, sort_keys=True, default=str)
+        entry = (data, hashlib.sha256(encoded.encode('utf-8')).hexdigest())
+        keys[id(data)] = entry
+        while len(keys) > MAX_CONTENT_KEYS:
+            del keys[next(iter(keys))]
+    return entry[1]
+
+@st.cache_data(max_entries=32)
+def mind_map_graph(key, _data):
+    """
+    Build the agraph nodes and edges of a mind map
+    
+    Args:
+        key (str): content_key of the mind map
+        _data (dict): Mind map data from API
+    
+    Returns:
+        tuple: (nodes, edges, has_layout) where has_layout tells whether the
+        nodes carry positions computed by the backend
+    """
+    nodes = []
+    edges = []
+    
+    def add_node(node_id, label, level, **position):
+        size = 30 if level == 0 else 24 if level == 1 else 20
+        nodes.append(Node(
+            id=node_id,
+            label=label,
+            size=size,
+            color=LEVEL_COLORS[min(level, len(LEVEL_COLORS)-1)],
+            shape="circle" if level < 2 else "box",
+            **position
+        ))
+    
+    layout = _data.get("layout")
+    if layout:
+        # Use the positions computed by the backend
+        for node in layout.get("nodes", []):
+            add_node(node["id"], node["label"], node["level"], x=node["x"], y=node["y"])
+            if node.get("parent"):
+                edges.append(Edge(source=node["parent"], target=node["id"]))
+        return nodes, edges, True
+    
+    # Walk the tree, naming nodes by their path as the backend layout does
+    # ("node" for the root, "node_3_0" for the first child of the fourth)
+    stack = [(_data, None, 0, "node")]
+    while stack:
+        node_data, parent_id, level, node_id = stack.pop()
+        add_node(node_id, node_data.get("name", ""), level)
+        if parent_id:
+            edges.append(Edge(source=parent_id, target=node_id))
+        children = node_data.get("children", [])
+        for position in range(len(children) - 1, -1, -1):
+            stack.append((children[position], node_id, level + 1, f"{node_id}_{position}"))
+    return nodes, edges, False
+
+@st.cache_data(max_entries=32)
+def json_export(key, _data, wrap=None):
+    """
+    Serialize data for a JSON download
+    
+    Args:
+        key (str): content_key of the data
+        _data: Data to serialize
+        wrap (str): Key to wrap the data in, if any
+    
+    Returns:
+        str: Indented JSON
+    """
+    return json.dumps({wrap: _data} if wrap else _data, indent=2)
+
+@st.cache_data(max_entries=32)
+def card_index(key, _cards):
+    """
+    Build the search index of a set of cards
+    
+    Args:
+        key (str): content_key of the cards
+        _cards (list): Cards from API
+    
+    Returns:
+        list: (lowercased title, lowercased content, categories) per card
+    """
+    return [
+        (card.get("title", "").lower(), card.get("content", "").lower(), tuple(card.get("categories", [])))
+        for card in _cards
+    ]
+
+@st.cache_data(max_entries=256)
+def filter_cards(key, _cards, category, search_term):
+    """
+    Find the cards in a category that match a search
+    
+    Args:
+        key (str): content_key of the cards
+        _cards (list): Cards from API
+        category (str): Category to keep, or "All"
+        search_term (str): Text to search titles and content for
+    
+    Returns:
+        list: Positions of the matching cards
+    """
+    search_term = search_term.lower()
+    return [
+        i for i, (title, content, categories) in enumerate(card_index(key, _cards))
+        if (category == "All" or category in categories)
+        and (not search_term or search_term in title or search_term in content)
+    ]
+
+@st.cache_data(max_entries=32)
+def cards_csv(key, _cards):
+    """
+    Build the CSV download of a set of cards
+    
+    Args:
+        key (str): content_key of the cards
+        _cards (list): Cards from API
+    
+    Returns:
+        bytes: UTF-8 CSV
+    """
+    cards_df = pd.DataFrame([
+        {
+            "Emoji": card.get("emoji", ""),
+            "Title": card.get("title", ""),
+            "Content": card.get("content", "").replace("\n", " ")
+        }
+        for card in _cards
+    ])
+    return cards_df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(max_entries=32)
+def timeline_phases(key, _events):
+    """
+    Group timeline events by phase
+    
+    Args:
+        key (str): content_key of the events
+        _events (list): Timeline events from API
+    
+    Returns:
+        dict: Phase name to its events, in timeline order
+    """
+    phases = {}
+    for event in _events:
+        phase = event.get("date", "").split('.')[0]  # Extract phase from date
+        phases.setdefault(phase, []).append(event)
+    return phases
+
+@st.cache_data(max_entries=32)
+def timeline_csv(key, _events):
+    """
+    Build the CSV download of a timeline
+    
+    Args:
+        key (str): content_key of the events
+        _events (list): Timeline events from API
+    
+    Returns:
+        bytes: UTF-8 CSV
+    """
+    events_df = pd.DataFrame([
+        {
+            "Phase": event.get("date", "").split('.')[0],
+            "Date": event.get("date", ""),
+            "Title": event.get("title", ""),
+            "Content": event.get("content", "").replace("\n", " ")
+        }
+        for event in _events
+    ])
+    return events_df.to_csv(index=False).encode('utf-8')
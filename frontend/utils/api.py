@@ -6,6 +6,13 @@ import time
 # API endpoint
 BASE_URL = "https://brainstormer-groq.onrender.com/api"
 
+# Visualization types and their field in the analysis response
+VISUALIZATION_FIELDS = {
+    "mind_map": "mindMap",
+    "cards": "cards",
+    "timeline": "timeline"
+}
+
 @st.cache_data(ttl=3600)
 def get_templates():
     """
@@ -33,7 +40,7 @@ def get_templates():
             "product_features": "Product Feature Analysis"
         }
 
-def analyze_idea(idea, template_type, formats):
+def analyze_idea(idea, template_type, formats, fields=None):
     """
     Send idea to backend for analysis
     
@@ -41,6 +48,7 @@ def analyze_idea(idea, template_type, formats):
         idea (str): The idea text
         template_type (str): Template type (business_idea, swot, etc.)
         formats (list): List of visualization formats to generate
+        fields (list): Response fields to return (all if None)
         
     Returns:
         dict: Analysis results
@@ -50,6 +58,7 @@ def analyze_idea(idea, template_type, formats):
     try:
         response = requests.post(
             f"{BASE_URL}/analyze",
+            params={"fields": ",".join(fields)} if fields else None,
             json={
                 "idea": idea,
                 "template": template_type,
@@ -78,6 +87,116 @@ def analyze_idea(idea, template_type, formats):
     except requests.RequestException as e:
         raise Exception(f"Request error: {str(e)}")
 
+def fetch_revalidated(path, params=None, text=False):
+    """
+    GET an analysis resource, revalidating the copy kept in the session
+    
+    Fetched resources are kept in the session with their ETag. Later
+    requests send it as If-None-Match, so an unchanged resource costs a
+    304 instead of a rebuild and a full download.
+    
+    Args:
+        path (str): Path below the API root
+        params (dict): Query parameters
+        text (bool): Return the body as text instead of its "visualization"
+        
+    Returns:
+        The visualization data (or the text body)
+    """
+    if 'visualizations' not in st.session_state:
+        st.session_state.visualizations = {}
+    key = (path, tuple(sorted((params or {}).items())))
+    etag, cached = st.session_state.visualizations.get(key, (None, None))
+    
+    try:
+        response = requests.get(
+            f"{BASE_URL}/{path}",
+            params=params,
+            headers={"If-None-Match": etag} if etag else {},
+            timeout=60
+        )
+        
+        if response.status_code == 304 and cached is not None:
+            return cached
+        
+        if response.status_code != 200:
+            error_msg = f"API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                if "error" in error_data:
+                    error_msg = error_data["error"]
+            except:
+                pass
+            raise Exception(error_msg)
+        
+        result = response.text if text else response.json().get("visualization", {})
+        st.session_state.visualizations[key] = (response.headers.get("ETag"), result)
+        return result
+    except requests.RequestException as e:
+        raise Exception(f"Request error: {str(e)}")
+
+def get_visualization(analysis, visualization_type):
+    """
+    Get a visualization of an analysis, fetching it by analysis ID when needed
+    
+    Args:
+        analysis (dict): Analysis results from analyze_idea
+        visualization_type (str): Type of visualization (mind_map, cards or timeline)
+        
+    Returns:
+        dict: Visualization data
+    """
+    field = VISUALIZATION_FIELDS[visualization_type]
+    included = analysis.get("visualizations", {}).get(field)
+    if included is not None:
+        return included
+    
+    analysis_id = analysis.get("analysisId")
+    if not analysis_id:
+        return {}
+    return fetch_revalidated(f"analysis/{analysis_id}/{visualization_type}")
+
+def get_mind_map(analysis, depth=None, expand=()):
+    """
+    Get the mind map of an analysis, laid out by the backend and limited in depth
+    
+    Nodes whose children were left out carry "path" and "childCount";
+    pass their paths as expand to include their children.
+    
+    Args:
+        analysis (dict): Analysis results from analyze_idea
+        depth (int): Levels below the root to include, or None for all
+        expand (list): Paths of nodes to include all children of
+        
+    Returns:
+        dict: Mind map data
+    """
+    analysis_id = analysis.get("analysisId")
+    if not analysis_id:
+        return get_visualization(analysis, "mind_map")
+    
+    params = {}
+    if depth is not None:
+        params["depth"] = depth
+    if expand:
+        params["expand"] = ",".join(sorted(expand))
+    return fetch_revalidated(f"analysis/{analysis_id}/mindmap", params)
+
+def get_mind_map_svg(analysis):
+    """
+    Get the mind map of an analysis drawn as SVG by the backend
+    
+    Args:
+        analysis (dict): Analysis results from analyze_idea
+        
+    Returns:
+        str: The SVG document, or None if the analysis has no ID
+    """
+    analysis_id = analysis.get("analysisId")
+    if not analysis_id:
+        return None
+    return fetch_revalidated(f"analysis/{analysis_id}/mind_map.svg", text=True)
+
 def visualize_content(content, content_type, visualization_type):
     """
     Generate visualization for content
@@ -172,32 +291,44 @@ def get_sample_analysis():
                     {
                         "emoji": "💼",
                         "title": "Revenue Streams",
-                        "content": "• Freemium model with basic features free\n• Premium subscription ($9.99/month)\n• Healthcare provider partnerships\n• Insurance company data sharing\n• Enterprise solutions for remote monitoring"
+                        "content": "• Freemium model with basic features free\n• Premium subscription ($9.99/month)\n• Healthcare provider partnerships\n• Insurance company data sharing\n• Enterprise solutions for remote monitoring",
+                        "categories": ["Business", "Planning"],
+                        "timelineRole": "general"
                     },
                     {
                         "emoji": "🏆",
                         "title": "Competitive Edge",
-                        "content": "• Medical-grade accuracy vs. consumer fitness apps\n• AI-driven predictive health insights\n• Integration with healthcare systems\n• Multi-device compatibility\n• Focus on actionable recommendations"
+                        "content": "• Medical-grade accuracy vs. consumer fitness apps\n• AI-driven predictive health insights\n• Integration with healthcare systems\n• Multi-device compatibility\n• Focus on actionable recommendations",
+                        "categories": ["Business"],
+                        "timelineRole": "general"
                     },
                     {
                         "emoji": "🔧",
                         "title": "Required Technologies",
-                        "content": "• Machine learning for health data analysis\n• Secure cloud storage (HIPAA compliant)\n• Mobile app development\n• API integration with wearables\n• Data visualization tools"
+                        "content": "• Machine learning for health data analysis\n• Secure cloud storage (HIPAA compliant)\n• Mobile app development\n• API integration with wearables\n• Data visualization tools",
+                        "categories": ["Technical"],
+                        "timelineRole": "general"
                     },
                     {
                         "emoji": "📊",
                         "title": "Market Opportunity",
-                        "content": "The global digital health market is projected to reach $380 billion by 2025, with health monitoring apps representing a $47 billion segment. Aging populations and rising healthcare costs are driving demand for preventative and remote monitoring solutions."
+                        "content": "The global digital health market is projected to reach $380 billion by 2025, with health monitoring apps representing a $47 billion segment. Aging populations and rising healthcare costs are driving demand for preventative and remote monitoring solutions.",
+                        "categories": ["Business"],
+                        "timelineRole": "general"
                     },
                     {
                         "emoji": "⚠️",
                         "title": "Key Challenges",
-                        "content": "• Regulatory approval in multiple markets\n• Ensuring data privacy and security\n• Achieving medical-grade accuracy\n• Healthcare system integration\n• User retention and engagement"
+                        "content": "• Regulatory approval in multiple markets\n• Ensuring data privacy and security\n• Achieving medical-grade accuracy\n• Healthcare system integration\n• User retention and engagement",
+                        "categories": ["Business", "Technical"],
+                        "timelineRole": "general"
                     },
                     {
                         "emoji": "📱",
                         "title": "Core Features",
-                        "content": "• Vital signs monitoring\n• Sleep analysis\n• Activity tracking\n• Personalized health insights\n• Early warning detection\n• Healthcare provider connection\n• Medication reminders"
+                        "content": "• Vital signs monitoring\n• Sleep analysis\n• Activity tracking\n• Personalized health insights\n• Early warning detection\n• Healthcare provider connection\n• Medication reminders",
+                        "categories": ["Planning"],
+                        "timelineRole": "general"
                     }
                 ]
             },